@@ -1,5 +1,6 @@
 
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -9,10 +10,20 @@ from api_routers import budget
 from api_routers import debts   
 from api_routers import loans   
 from api_routers import reports 
+from src import dependencies
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cria apenas os gestores configurados (FINANCAS_WARM_MANAGERS); os restantes no primeiro uso
+    dependencies.startup()
+    yield
+    # Fecha as conexões partilhadas do pool ao desligar o servidor
+    dependencies.shutdown()
 
 app = FastAPI(
     title="API de Finanças Pessoais",
-    description="Backend modularizado para o gerenciador financeiro."
+    description="Backend modularizado para o gerenciador financeiro.",
+    lifespan=lifespan
 )
 
 app.add_middleware(
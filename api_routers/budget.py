@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
 from pydantic import BaseModel
 from typing import List
-import pandas as pd
 
 from src.modules.budget import BudgetManager
 from src.dependencies import get_budget_manager 
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path
 from pydantic import BaseModel
-from src.dependencies import category_manager
+
+from src.modules.categories import CategoryManager
+from src.dependencies import get_category_manager
 
 router = APIRouter(
     prefix="/api/categorias",
@@ -13,7 +15,9 @@ class CategoriaPayload(BaseModel):
 
 
 @router.get("/")
-def obter_categorias():
+def obter_categorias(
+    category_manager: CategoryManager = Depends(get_category_manager)
+):
     """
     Endpoint para obter a lista de todas as categorias.
     """
@@ -25,7 +29,10 @@ def obter_categorias():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/")
-def adicionar_categoria(payload: CategoriaPayload):
+def adicionar_categoria(
+    payload: CategoriaPayload,
+    category_manager: CategoryManager = Depends(get_category_manager)
+):
     """
     Endpoint para adicionar uma nova categoria.
     Recebe o nome da categoria no corpo (body) da requisição.
@@ -51,7 +58,8 @@ def adicionar_categoria(payload: CategoriaPayload):
 
 @router.delete("/{category_name}")
 def remover_categoria(
-    category_name: str = Path(..., title="O nome da categoria a ser removida", min_length=1)
+    category_name: str = Path(..., title="O nome da categoria a ser removida", min_length=1),
+    category_manager: CategoryManager = Depends(get_category_manager)
 ):
     """
     Endpoint para remover uma categoria específica.
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from pydantic import BaseModel, Field
-from typing import List, Optional
-import pandas as pd
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 from datetime import date
 
 from src.modules.debts import DebtManager
@@ -34,6 +33,44 @@ class DebtResponse(BaseModel):
 class DebtPay(BaseModel):
     current_month_year_for_transaction: str
 
+class DebtFilter(BaseModel):
+    """Seleção de dívidas pelos mesmos filtros de '/list/' (alternativa a uma lista de IDs)."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    month_year_filter: Optional[str] = Field(None, pattern=r"^\d{2}-\d{4}$")
+    start_date: Optional[date] = Field(None, alias="from")
+    end_date: Optional[date] = Field(None, alias="to")
+    status: Optional[str] = None
+    category: Optional[str] = None
+
+class DebtBulkPay(BaseModel):
+    debt_ids: Optional[List[str]] = None
+    filter: Optional[DebtFilter] = None
+    current_month_year_for_transaction: str
+    payment_method: str = "Conta"
+
+class DebtBulkChanges(BaseModel):
+    description: Optional[str] = None
+    value: Optional[float] = Field(None, gt=0)
+    due_date: Optional[date] = None
+    status: Optional[str] = None
+    category: Optional[str] = None
+
+class DebtBulkEdit(BaseModel):
+    debt_ids: Optional[List[str]] = None
+    filter: Optional[DebtFilter] = None
+    changes: DebtBulkChanges
+
+class AgingBucket(BaseModel):
+    Total: float
+    Quantidade: int
+    Por_Categoria: Dict[str, float]
+
+class AgingResponse(BaseModel):
+    Data: date
+    Faixas: Dict[str, AgingBucket]
+    Total_Em_Aberto: float
+
 @router.post("/add/", status_code=201)
 def add_new_debt(
     debt_data: DebtCreate,
@@ -55,9 +92,15 @@ def add_new_debt(
 @router.get("/list/", response_model=List[DebtResponse])
 def get_debts_list(
     month_year_filter: Optional[str] = Query(None, pattern=r"^\d{2}-\d{4}$"),
+    start_date: Optional[date] = Query(None, alias="from", description="Vencimento a partir de (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, alias="to", description="Vencimento até (YYYY-MM-DD, inclusive)"),
+    status: Optional[str] = Query(None, description="Ex.: Aberto, Atrasado, Pago"),
+    category: Optional[str] = None,
     manager: DebtManager = Depends(get_debt_manager) 
 ):
-    debts_df = manager.get_all_debts(month_year_filter)
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="'from' não pode ser posterior a 'to'.")
+    debts_df = manager.get_all_debts(month_year_filter, start_date, end_date, status, category)
     if debts_df.empty:
         return []
     debts_df['ID'] = debts_df['ID'].astype(str)
@@ -74,6 +117,77 @@ def get_dashboard_debts(
     debts_df['ID'] = debts_df['ID'].astype(str)
     return debts_df.to_dict(orient='records')
 
+@router.get("/aging/", response_model=AgingResponse)
+def get_debts_aging(
+    manager: DebtManager = Depends(get_debt_manager)
+):
+    report = manager.get_debt_aging()
+    if report is None:
+        raise HTTPException(status_code=500, detail="Erro ao calcular a antiguidade das dívidas.")
+    return report
+
+def _select_debt_ids(manager: DebtManager, debt_ids: Optional[List[str]], debt_filter: Optional[DebtFilter],
+                     exclude_paid: bool = False):
+    """IDs do lote: a lista recebida ou as dívidas selecionadas pelo filtro (exatamente um dos dois)."""
+    if (debt_ids is None) == (debt_filter is None):
+        raise HTTPException(status_code=400, detail="Indique 'debt_ids' ou 'filter' (exatamente um dos dois).")
+    if debt_ids is not None:
+        if not debt_ids:
+            raise HTTPException(status_code=400, detail="'debt_ids' não pode ser vazio.")
+        return debt_ids
+    if debt_filter.start_date and debt_filter.end_date and debt_filter.start_date > debt_filter.end_date:
+        raise HTTPException(status_code=400, detail="'from' não pode ser posterior a 'to'.")
+    debts_df = manager.get_all_debts(debt_filter.month_year_filter, debt_filter.start_date, debt_filter.end_date,
+                                     debt_filter.status, debt_filter.category)
+    if exclude_paid and not debts_df.empty:
+        debts_df = debts_df[debts_df['Status'].astype(str).str.lower() != 'pago']
+    return debts_df['ID'].astype(str).tolist() if not debts_df.empty else []
+
+@router.put("/pay/bulk/", status_code=200)
+def pay_debts_bulk(
+    payload: DebtBulkPay,
+    manager: DebtManager = Depends(get_debt_manager)
+):
+    """
+    Marca várias dívidas como pagas (por IDs ou por filtro) e regista os lançamentos
+    dos pagamentos numa única transação do banco. Dívidas inválidas são reportadas
+    individualmente sem abortar o lote.
+    (Declarado antes de '/pay/{debt_id}/' para não ser capturado por essa rota.)
+    """
+    debt_ids = _select_debt_ids(manager, payload.debt_ids, payload.filter, exclude_paid=True)
+    resultados = manager.mark_debts_as_paid(debt_ids, payload.current_month_year_for_transaction, payload.payment_method)
+    pagas = sum(1 for r in resultados if r['sucesso'])
+    return {
+        "sucesso": pagas == len(resultados),
+        "pagas": pagas,
+        "com_erro": len(resultados) - pagas,
+        "resultados": resultados
+    }
+
+@router.put("/edit/bulk/", status_code=200)
+def edit_debts_bulk(
+    payload: DebtBulkEdit,
+    manager: DebtManager = Depends(get_debt_manager)
+):
+    """
+    Aplica as mesmas alterações a várias dívidas (por IDs ou por filtro) numa única
+    transação do banco. Dívidas inexistentes são reportadas individualmente.
+    """
+    columns = {'description': 'Descricao', 'value': 'Valor', 'due_date': 'DataVencimento',
+               'status': 'Status', 'category': 'Categoria'}
+    new_data = {columns[key]: value for key, value in payload.changes.model_dump(exclude_none=True).items()}
+    if not new_data:
+        raise HTTPException(status_code=400, detail="Nenhuma alteração indicada em 'changes'.")
+    debt_ids = _select_debt_ids(manager, payload.debt_ids, payload.filter)
+    resultados = manager.update_debts(debt_ids, new_data)
+    atualizadas = sum(1 for r in resultados if r['sucesso'])
+    return {
+        "sucesso": atualizadas == len(resultados),
+        "atualizadas": atualizadas,
+        "com_erro": len(resultados) - atualizadas,
+        "resultados": resultados
+    }
+
 @router.put("/pay/{debt_id}/", status_code=200)
 def pay_debt(
     debt_id: str,
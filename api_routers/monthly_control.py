@@ -1,10 +1,12 @@
 
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
 
-from src.dependencies import monthly_control_manager
+from src.modules.monthly_control import MonthlyControlManager
+from src.dependencies import get_monthly_control_manager
 
 router = APIRouter(
     prefix="/api", 
@@ -15,7 +17,7 @@ router = APIRouter(
 
 class TransacaoPayload(BaseModel):
     """Define a "forma" dos dados que o frontend vai enviar."""
-    Data: str
+    Data: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
     Tipo: Literal['Ganho', 'Despesa']
     Descricao: str
     Categoria: str
@@ -23,9 +25,102 @@ class TransacaoPayload(BaseModel):
     MeioPagamento: str
 
 
+class TransacaoLotePayload(BaseModel):
+    """Um item de um lote de transações. MesAno é derivado de Data se omitido."""
+    Data: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
+    Tipo: Literal['Ganho', 'Despesa']
+    Descricao: str
+    Categoria: str
+    Valor: float
+    MeioPagamento: str = "Conta"
+    MesAno: Optional[str] = Field(None, pattern=r"^\d{2}-\d{4}$")
+
+
+class ExtratoPayload(BaseModel):
+    """Extrato bancário enviado como texto (conteúdo do ficheiro CSV ou OFX)."""
+    formato: Literal['csv', 'ofx']
+    conteudo: str
+    Categoria: Optional[str] = None
+    MeioPagamento: str = "Conta"
+
+
+
+@router.get("/transacoes")
+def listar_transacoes(
+    inicio: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    fim: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    tipo: Optional[Literal['Ganho', 'Despesa']] = None,
+    categoria: Optional[str] = None,
+    meio: Optional[str] = Query(None, description="Meio de pagamento"),
+    valor_min: Optional[float] = Query(None, ge=0),
+    valor_max: Optional[float] = Query(None, ge=0),
+    ordem: Literal['data_desc', 'data_asc', 'valor_desc', 'valor_asc'] = 'data_desc',
+    limite: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Valor de 'proximo_cursor' da página anterior"),
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
+    """
+    Endpoint para LISTAR transações de qualquer período, com filtros e paginação por cursor.
+    Para obter a página seguinte, repita o pedido com os mesmos filtros e cursor=proximo_cursor.
+    """
+    for valor in (inicio, fim):
+        if valor is not None:
+            try:
+                datetime.strptime(valor, "%Y-%m-%d")
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Formato de data inválido. Use YYYY-MM-DD.")
+
+    try:
+        resultado = monthly_control_manager.list_transactions(
+            inicio, fim, tipo, categoria, meio, valor_min, valor_max, ordem, limite, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if resultado is None:
+        raise HTTPException(status_code=500, detail="Erro interno ao listar transações.")
+
+    transacoes, proximo_cursor = resultado
+    return {"transacoes": transacoes, "proximo_cursor": proximo_cursor, "limite": limite}
+
+@router.get("/transacoes/search")
+def pesquisar_transacoes(
+    q: str = Query(..., min_length=1, description="Palavras a procurar na descrição ou categoria"),
+    inicio: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    fim: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    categoria: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=200),
+    pagina: int = Query(1, ge=1),
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
+    """
+    Endpoint para PESQUISAR transações por texto, das mais relevantes às menos relevantes.
+    (Declarado antes de '/transacoes/{month_year}' para não ser capturado por essa rota.)
+    """
+    for valor in (inicio, fim):
+        if valor is not None:
+            try:
+                datetime.strptime(valor, "%Y-%m-%d")
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Formato de data inválido. Use YYYY-MM-DD.")
+
+    # Pede um resultado a mais para saber se existe uma próxima página
+    resultados = monthly_control_manager.search_transactions(
+        q, inicio, fim, categoria, limit=limite + 1, offset=(pagina - 1) * limite
+    )
+    if resultados is None:
+        raise HTTPException(status_code=500, detail="Erro interno ao pesquisar transações.")
+    return {
+        "resultados": resultados[:limite],
+        "pagina": pagina,
+        "limite": limite,
+        "tem_mais": len(resultados) > limite
+    }
 
 @router.get("/transacoes/{month_year}")
-def obter_transacoes_mensais(month_year: str):
+def obter_transacoes_mensais(
+    month_year: str,
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
     """
     Endpoint para obter todas as transações de um mês específico (MM-YYYY).
     """
@@ -38,21 +133,22 @@ def obter_transacoes_mensais(month_year: str):
         raise HTTPException(status_code=500, detail=f"Erro interno ao buscar transações: {str(e)}")
 
 @router.get("/saldos/{month_year}")
-def obter_saldos_mensais(month_year: str):
+def obter_saldos_mensais(
+    month_year: str,
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
     """
     Endpoint para obter os saldos de um mês específico (MM-YYYY).
     """
     try:
-        _, _, balance_conta = monthly_control_manager.calculate_detailed_balance(month_year, "Conta")
-        _, _, balance_maos = monthly_control_manager.calculate_detailed_balance(month_year, "Dinheiro em Mãos")
-        total_gains, total_expenses, total_balance = monthly_control_manager.calculate_monthly_balance(month_year)
+        balances = monthly_control_manager.get_monthly_balances(month_year)
 
         saldos = {
-            "saldo_conta": float(balance_conta),
-            "saldo_maos": float(balance_maos),
-            "ganhos_mes": float(total_gains),
-            "despesas_mes": float(total_expenses),
-            "saldo_liquido": float(total_balance)
+            "saldo_conta": balances['Saldo em Conta'],
+            "saldo_maos": balances['Saldo em Mãos'],
+            "ganhos_mes": balances['Ganhos'],
+            "despesas_mes": balances['Despesas'],
+            "saldo_liquido": balances['Saldo Liquido']
         }
         return {"saldos": saldos}
     
@@ -60,8 +156,86 @@ def obter_saldos_mensais(month_year: str):
         print(f"Erro ao buscar saldos: {e}")
         raise HTTPException(status_code=500, detail=f"Erro interno ao buscar saldos: {str(e)}")
 
+@router.get("/saldos/acumulado/{data}")
+def obter_saldo_acumulado(
+    data: str,
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
+    """
+    Endpoint para obter o saldo acumulado de cada meio de pagamento até uma data (YYYY-MM-DD).
+    """
+    try:
+        datetime.strptime(data, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Formato de data inválido. Use YYYY-MM-DD.")
+
+    try:
+        saldo = monthly_control_manager.get_running_balance(data)
+        if saldo is None:
+            raise HTTPException(status_code=500, detail="Erro interno ao calcular saldo acumulado.")
+        return {
+            "data": saldo['Data'],
+            "saldo_conta": saldo['Saldos'].get("Conta", 0.0),
+            "saldo_maos": saldo['Saldos'].get("Dinheiro em Mãos", 0.0),
+            "saldos_por_meio": saldo['Saldos'],
+            "saldo_total": saldo['Total']
+        }
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        print(f"Erro ao buscar saldo acumulado: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro interno ao buscar saldo acumulado: {str(e)}")
+
+@router.post("/transacoes/bulk")
+def adicionar_transacoes_em_lote(
+    transacoes: List[TransacaoLotePayload],
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
+    """
+    Endpoint para ADICIONAR várias transações de uma vez, numa única transação do banco.
+    Linhas inválidas são reportadas individualmente sem abortar o lote.
+    (Declarado antes de '/transacoes/{month_year}' para não ser capturado por essa rota.)
+    """
+    try:
+        resultados = monthly_control_manager.add_transactions_bulk([t.model_dump() for t in transacoes])
+        inseridas = sum(1 for r in resultados if r['sucesso'])
+        return {
+            "sucesso": inseridas == len(resultados),
+            "inseridas": inseridas,
+            "com_erro": len(resultados) - inseridas,
+            "resultados": resultados
+        }
+    except Exception as e:
+        print(f"Erro ao adicionar lote de transações: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/transacoes/importar")
+def importar_extrato(
+    payload: ExtratoPayload,
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
+    """
+    Endpoint para IMPORTAR um extrato bancário (CSV ou OFX). O 'MesAno' de cada linha
+    é derivado da sua data; linhas já importadas anteriormente são ignoradas.
+    (Declarado antes de '/transacoes/{month_year}' para não ser capturado por essa rota.)
+    """
+    try:
+        resultado = monthly_control_manager.import_statement(
+            payload.conteudo, payload.formato, payload.Categoria, payload.MeioPagamento
+        )
+        return {"sucesso": resultado['erros'] == 0, **resultado}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Erro ao importar extrato: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/transacoes/{month_year}")
-def adicionar_transacao(month_year: str, transacao: TransacaoPayload):
+def adicionar_transacao(
+    month_year: str,
+    transacao: TransacaoPayload,
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
     """
     Endpoint para ADICIONAR uma nova transação a um mês.
     """
@@ -86,7 +260,11 @@ def adicionar_transacao(month_year: str, transacao: TransacaoPayload):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/transacoes/{month_year}/{transaction_id}")
-def excluir_transacao(month_year: str, transaction_id: str):
+def excluir_transacao(
+    month_year: str,
+    transaction_id: str,
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
     """
     Endpoint para EXCLUIR uma transação específica.
     """
@@ -106,7 +284,12 @@ def excluir_transacao(month_year: str, transaction_id: str):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.put("/transacoes/{month_year}/{transaction_id}")
-def atualizar_transacao(month_year: str, transaction_id: str, transacao: TransacaoPayload):
+def atualizar_transacao(
+    month_year: str,
+    transaction_id: str,
+    transacao: TransacaoPayload,
+    monthly_control_manager: MonthlyControlManager = Depends(get_monthly_control_manager)
+):
     """
     Endpoint para ATUALIZAR uma transação existente.
     Recebe os novos dados da transação no "corpo" (body) do request.
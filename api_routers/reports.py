@@ -91,4 +91,34 @@ def export_summary_csv(
         path=f"data/{csv_filename}",
         media_type='text/csv',
         filename=csv_filename
-    )
\ No newline at end of file
+    )
+
+@router.post("/aggregates/rebuild/", status_code=200)
+def rebuild_monthly_aggregates(
+    manager: ReportManager = Depends(get_report_manager)
+):
+    """Reconstrói as tabelas derivadas (MonthlyAggregates, SaldosAcumulados e TransacoesBusca) a partir das transações."""
+    if (not manager.core.rebuild_monthly_aggregates() or not manager.core.rebuild_running_balances()
+            or not manager.core.rebuild_search_index()):
+        raise HTTPException(status_code=500, detail="Falha ao reconstruir os agregados mensais.")
+    return {"message": "Agregados mensais, saldos acumulados e índice de pesquisa reconstruídos com sucesso."}
+
+@router.get("/aggregates/verify/")
+def verify_monthly_aggregates(
+    manager: ReportManager = Depends(get_report_manager)
+):
+    """
+    Verifica se MonthlyAggregates coincide com os totais recalculados das transações
+    e se o ValorCentavos de cada transação corresponde ao seu Valor.
+    """
+    divergent_rows = manager.core.verify_monthly_aggregates()
+    if divergent_rows is None:
+        raise HTTPException(status_code=500, detail="Falha ao verificar os agregados mensais.")
+    return {"consistente": divergent_rows == 0, "linhas_divergentes": divergent_rows}
+
+@router.get("/cache/stats/")
+def get_cache_stats(
+    manager: ReportManager = Depends(get_report_manager)
+):
+    """Retorna os contadores da cache de leituras do CoreManager (hits, misses, entradas)."""
+    return manager.core.get_cache_stats()
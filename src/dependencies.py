@@ -3,47 +3,152 @@
 """
 Este ficheiro centraliza a inicialização dos nossos gestores (lógica de negócio).
 Qualquer parte da API (qualquer router) que precisar de aceder à lógica
-de negócio irá importar estas instâncias.
+de negócio obtém as instâncias através das funções get_*_manager().
 
 Isto garante que temos apenas UMA instância de cada gestor (Singleton)
-a ser partilhada por toda a aplicação.
+a ser partilhada por toda a aplicação. Os gestores são criados na primeira
+utilização (e não na importação deste módulo), de forma segura entre threads.
+startup() pré-carrega os gestores configurados em FINANCAS_WARM_MANAGERS e
+shutdown() fecha as conexões do pool; ambos são chamados no lifespan da API.
 """
 
-from src.modules.core import CoreManager
-from src.modules.categories import CategoryManager
-from src.modules.monthly_control import MonthlyControlManager
-from src.modules.loans import LoanManager
-from src.modules.debts import DebtManager
-from src.modules.budget import BudgetManager
-from src.modules.reports import ReportManager
+import os
+import threading
 
-# 1. Inicializa o Core
-core_manager = CoreManager()
+WARM_ENV_VAR = 'FINANCAS_WARM_MANAGERS' # ex.: "core,monthly_control", "all" ou "" (nenhum)
+DEFAULT_WARM_MANAGERS = 'core' # aplica as migrações antes do primeiro pedido
 
-# 2. Inicializa todos os outros gestores que dependem do Core
-# (Estamos a recriar o que o teu app.py antigo fazia, mas para a API)
-category_manager = CategoryManager(core_manager)
-monthly_control_manager = MonthlyControlManager(core_manager)
-loan_manager = LoanManager(core_manager, monthly_control_manager)
-debt_manager = DebtManager(core_manager, monthly_control_manager)
-budget_manager = BudgetManager(core_manager, monthly_control_manager)
-report_manager = ReportManager(core_manager, monthly_control_manager)
+_lock = threading.RLock() # reentrante: um gestor pede o Core enquanto é criado
+_instances = {}
 
-print("Dependências (Managers) inicializadas com sucesso.")
 
+def _build_core():
+    from src.modules.core import CoreManager
+    return CoreManager()
+
+def _build_category():
+    from src.modules.categories import CategoryManager
+    return CategoryManager(get_core_manager())
+
+def _build_monthly_control():
+    from src.modules.monthly_control import MonthlyControlManager
+    return MonthlyControlManager(get_core_manager())
+
+def _build_loan():
+    from src.modules.loans import LoanManager
+    return LoanManager(get_core_manager(), get_monthly_control_manager())
+
+def _build_debt():
+    from src.modules.debts import DebtManager
+    return DebtManager(get_core_manager(), get_monthly_control_manager())
+
+def _build_budget():
+    from src.modules.budget import BudgetManager
+    return BudgetManager(get_core_manager(), get_monthly_control_manager())
+
+def _build_report():
+    from src.modules.reports import ReportManager
+    return ReportManager(get_core_manager(), get_monthly_control_manager())
+
+
+# Nome curto -> função que cria o gestor (os que dependem do Core pedem-no ao container)
+_FACTORIES = {
+    'core': _build_core,
+    'category': _build_category,
+    'monthly_control': _build_monthly_control,
+    'loan': _build_loan,
+    'debt': _build_debt,
+    'budget': _build_budget,
+    'report': _build_report,
+}
+
+
+def _get(name: str):
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = _FACTORIES[name]()
+                _instances[name] = instance
+    return instance
+
+
+def get_core_manager():
+    """Retorna a instância singleton do CoreManager."""
+    return _get('core')
+
+def get_category_manager():
+    """Retorna a instância singleton do CategoryManager."""
+    return _get('category')
+
+def get_monthly_control_manager():
+    """Retorna a instância singleton do MonthlyControlManager."""
+    return _get('monthly_control')
 
 def get_budget_manager():
     """Retorna a instância singleton do BudgetManager."""
-    return budget_manager
+    return _get('budget')
 
 def get_debt_manager():
     """Retorna a instância singleton do DebtManager."""
-    return debt_manager
+    return _get('debt')
 
 def get_loan_manager():
     """Retorna a instância singleton do LoanManager."""
-    return loan_manager
+    return _get('loan')
 
 def get_report_manager():
     """Retorna a instância singleton do ReportManager."""
-    return report_manager
\ No newline at end of file
+    return _get('report')
+
+
+def get_warm_managers():
+    """Retorna os nomes dos gestores a pré-carregar, lidos da variável de ambiente (ou o padrão)."""
+    value = os.environ.get(WARM_ENV_VAR, DEFAULT_WARM_MANAGERS).strip().lower()
+    parts = [part.strip() for part in value.split(',') if part.strip()]
+    if 'all' in parts:
+        return list(_FACTORIES)
+    names = []
+    for name in parts:
+        if name not in _FACTORIES:
+            print(f"Aviso: gestor '{name}' desconhecido em {WARM_ENV_VAR}. Ignorado.")
+            continue
+        names.append(name)
+    return names
+
+
+def startup(names=None):
+    """Cria os gestores indicados (por padrão, os configurados em FINANCAS_WARM_MANAGERS)."""
+    names = get_warm_managers() if names is None else names
+    for name in names:
+        _get(name)
+    if names:
+        print(f"Dependências (Managers) inicializadas com sucesso: {', '.join(names)}.")
+
+
+def shutdown():
+    """Fecha as conexões do CoreManager (se tiver sido criado) e descarta todas as instâncias."""
+    with _lock:
+        core = _instances.get('core')
+        _instances.clear()
+    if core is not None:
+        core.close()
+
+
+# Nomes antigos (ex.: 'from src.dependencies import core_manager') continuam a
+# funcionar, mas criam o gestor no momento da importação; prefira get_*_manager().
+_LEGACY_NAMES = {
+    'core_manager': 'core',
+    'category_manager': 'category',
+    'monthly_control_manager': 'monthly_control',
+    'loan_manager': 'loan',
+    'debt_manager': 'debt',
+    'budget_manager': 'budget',
+    'report_manager': 'report',
+}
+
+def __getattr__(name):
+    if name in _LEGACY_NAMES:
+        return _get(_LEGACY_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
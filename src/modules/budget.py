@@ -1,5 +1,4 @@
 from .core import CoreManager, DEFAULT_BUDGET_SHEET
-import pandas as pd
 
 class BudgetManager:
     def __init__(self, core_manager: CoreManager, monthly_control_manager):
@@ -18,11 +17,12 @@ class BudgetManager:
 
     def get_budgets_for_month(self, month_year: str):
         """Retorna os orçamentos definidos para um mês específico."""
-        df = self.core.get_budgets()
+        import pandas as pd
+        df = self.core.get_budgets(month_year)
         if not df.empty:
             df['MesAno'] = df['MesAno'].astype(str)
             df['Categoria'] = df['Categoria'].astype(str)
-            return df[df['MesAno'] == month_year]
+            return df
         return pd.DataFrame(columns=['MesAno', 'Categoria', 'Limite'])
 
     def check_budget_exceeded(self, month_year: str):
@@ -0,0 +1,108 @@
+# src/modules/cache.py
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 256
+CACHE_SIZE_ENV_VAR = 'FINANCAS_CACHE_SIZE' # 0 desativa a cache
+
+
+def get_cache_size():
+    """Retorna o número máximo de entradas configurado na variável de ambiente (ou o padrão)."""
+    try:
+        return max(0, int(os.environ.get(CACHE_SIZE_ENV_VAR, DEFAULT_CACHE_SIZE)))
+    except ValueError:
+        print(f"Aviso: valor inválido em {CACHE_SIZE_ENV_VAR}. Usando {DEFAULT_CACHE_SIZE}.")
+        return DEFAULT_CACHE_SIZE
+
+
+class QueryCache:
+    """
+    Cache read-through (LRU) para os resultados de leitura do CoreManager.
+
+    Cada entrada é identificada pelo nome da consulta e pelos seus parâmetros e
+    guarda a "geração" das tabelas de que depende. Cada escrita incrementa a
+    geração da tabela alterada, e as entradas com gerações antigas deixam de ser
+    servidas. Os resultados são copiados à entrada e à saída, para que o chamador
+    possa alterar o valor recebido (DataFrame, lista de dicionários...) sem afetar a cache.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = get_cache_size() if max_entries is None else max_entries
+        self._entries = OrderedDict() # (nome, parâmetros) -> (gerações, valor)
+        self._generations = {}
+        self._epoch = 0 # incrementado por invalidate_all()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _current_generations(self, tables):
+        return (self._epoch,) + tuple(self._generations.get(table, 0) for table in tables)
+
+    def _copy(self, value):
+        # Listas e dicionários podem conter linhas (dicionários) mutáveis: cópia profunda.
+        # DataFrame.copy() já copia os dados; tuplas, números e strings são imutáveis.
+        if isinstance(value, (list, dict, set)):
+            return copy.deepcopy(value)
+        return value.copy() if hasattr(value, 'copy') else value
+
+    def get_or_load(self, name: str, params: tuple, tables: tuple, loader):
+        """
+        Retorna o valor em cache para (name, params) ou chama loader() e guarda o resultado.
+        Exceções do loader são propagadas e nada é guardado.
+        """
+        key = (name, params)
+        with self._lock:
+            generations = self._current_generations(tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generations:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[1])
+            self.misses += 1
+
+        # As gerações são lidas antes da consulta: se uma escrita terminar durante
+        # o carregamento, a entrada já nasce desatualizada e será recarregada.
+        value = loader()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = (generations, self._copy(value))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def generations(self, *tables):
+        """Retorna um valor que muda sempre que uma das tabelas é escrita (ou toda a cache é descartada)."""
+        with self._lock:
+            return self._current_generations(tables)
+
+    def invalidate(self, *tables):
+        """Incrementa a geração das tabelas indicadas (chamado após cada escrita)."""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def invalidate_all(self):
+        """Descarta todas as entradas (ex.: o banco foi alterado por outro processo)."""
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def stats(self):
+        """Contadores para monitorização."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'generations': dict(self._generations),
+            }
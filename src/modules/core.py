@@ -1,9 +1,19 @@
-import pandas as pd
+import base64
+import json
 import sqlite3
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
 import os
 import uuid 
 import sys 
+import threading
+import time
+from contextlib import contextmanager
+
+from .database import ConnectionPool
+from .cache import QueryCache
+from .migrations import (apply_migrations, SCHEMA_VERSION, MONTHLY_AGGREGATES_SOURCE_QUERY,
+                         RUNNING_BALANCES_SOURCE_QUERY, SEARCH_INDEX_SOURCE_QUERY)
 
 if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
     _base_path = sys._MEIPASS
@@ -12,16 +22,469 @@ else:
 
 DB_DIR = 'data' 
 DB_FILE_NAME = 'financas.db'
-DB_FILE = os.path.join(_base_path, DB_DIR, DB_FILE_NAME)
+DB_FILE_ENV_VAR = 'FINANCAS_DB_FILE' # permite apontar para outra base (ex.: benchmarks)
+DB_FILE = os.environ.get(DB_FILE_ENV_VAR) or os.path.join(_base_path, DB_DIR, DB_FILE_NAME)
+WORKBOOK_FILE_NAME = 'financas_pessoais.xlsx' # planilha da versão antiga (ver src/modules/importer.py)
+WORKBOOK_FILE = os.path.join(_base_path, DB_DIR, WORKBOOK_FILE_NAME)
 
 DEFAULT_CATEGORIES_SHEET = 'Categorias'
 DEFAULT_BUDGET_SHEET = 'OrcamentoMensal'
 DEFAULT_LOANS_SHEET = 'Empréstimos' 
 DEFAULT_DEBTS_SHEET = 'DívidasFuturas' 
 
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Intervalo mínimo (segundos) entre verificações de escritas feitas por outros processos
+EXTERNAL_WRITES_CHECK_INTERVAL = 0.05
+
+
+def to_cents(value):
+    """Converte um valor monetário em centavos inteiros (arredondamento comercial)."""
+    if value is None:
+        return None
+    return int(Decimal(str(value)).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def date_to_day(date_str):
+    """Converte 'YYYY-MM-DD' (ou um date) em dias desde 1970-01-01. Retorna None se inválida."""
+    if date_str is None:
+        return None
+    try:
+        if not isinstance(date_str, date):
+            date_str = date.fromisoformat(str(date_str)[:10])
+        return date_str.toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return None
+
+def day_to_date(day: int):
+    """Inverso de date_to_day."""
+    return date.fromordinal(EPOCH_ORDINAL + int(day))
+
+def month_year_to_key(month_year: str):
+    """Converte 'MM-YYYY' na chave numérica YYYYMM. Retorna None se inválido."""
+    try:
+        month, year = int(month_year[:2]), int(month_year[3:])
+    except (TypeError, ValueError):
+        return None
+    if month_year[2] != '-' or not 1 <= month <= 12:
+        return None
+    return year * 100 + month
+
+def key_to_month_year(key: int):
+    """Inverso de month_year_to_key."""
+    return f"{int(key) % 100:02d}-{int(key) // 100}"
+
+def with_numeric_keys(data: dict):
+    """
+    Preenche ValorCentavos, DataDia e MesAnoChave a partir de Valor, Data e MesAno presentes em 'data'.
+    Lança ValueError se algum deles não puder ser convertido: as chaves derivadas nunca ficam NULL
+    (uma linha sem DataDia ficaria fora dos relatórios, dos saldos e da listagem).
+    """
+    if 'Valor' in data:
+        try:
+            data['ValorCentavos'] = to_cents(data['Valor'])
+        except (ArithmeticError, ValueError):
+            data['ValorCentavos'] = None
+        if data['ValorCentavos'] is None:
+            raise ValueError(f"Valor inválido: {data['Valor']!r}.")
+    if 'Data' in data:
+        data['DataDia'] = date_to_day(data['Data'])
+        if data['DataDia'] is None:
+            raise ValueError(f"Data inválida (use YYYY-MM-DD): {data['Data']!r}.")
+    if 'MesAno' in data:
+        data['MesAnoChave'] = month_year_to_key(data['MesAno'])
+        if data['MesAnoChave'] is None:
+            raise ValueError(f"MesAno inválido (use MM-YYYY): {data['MesAno']!r}.")
+    return data
+
+
+MONTHLY_TRANSACTIONS_QUERY = "SELECT ID, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento FROM Transacoes WHERE MesAno = ?;"
+MONTHLY_BUDGETS_QUERY = "SELECT MesAno, Categoria, Limite FROM Orcamentos WHERE MesAno = ?;"
+
+# Leituras de uma única linha pela chave primária (usadas pelos caminhos de atualização)
+TRANSACTION_BY_ID_QUERY = "SELECT ID, MesAno, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento FROM Transacoes WHERE ID = ?;"
+LOAN_BY_ID_QUERY = 'SELECT ID, Tipo, ParteEnvolvida, ValorOriginal, "Juros%", NumParcelas, ParcelasPagas, Status FROM Emprestimos WHERE ID = ?;'
+DEBT_BY_ID_QUERY = "SELECT ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria FROM Dividas WHERE ID = ?;"
+
+# Regras de dívidas recorrentes com alguma ocorrência no período [:inicio, :fim]
+DEBT_RULES_IN_PERIOD_QUERY = """
+SELECT ID, Descricao, Valor, Categoria, Status, Frequencia, DataInicio, NumOcorrencias, DataFim
+FROM RecorrenciasDividas
+WHERE DataInicio <= :fim AND DataFim >= :inicio;
+"""
+DEBT_RULE_BY_ID_QUERY = """
+SELECT ID, Descricao, Valor, Categoria, Status, Frequencia, DataInicio, NumOcorrencias, DataFim
+FROM RecorrenciasDividas WHERE ID = ?;
+"""
+
+# Datas de ocorrência que não devem ser geradas (já materializadas em Dividas ou excluídas),
+# de todas as regras com ocorrências no período [:inicio, :fim], numa única consulta
+DEBT_RULES_SKIPPED_DATES_QUERY = """
+WITH Regras AS (
+    SELECT ID FROM RecorrenciasDividas WHERE DataInicio <= :fim AND DataFim >= :inicio
+)
+SELECT d.RegraID, d.DataOcorrencia FROM Regras r JOIN Dividas d
+    ON d.RegraID = r.ID AND d.RegraID IS NOT NULL AND d.DataOcorrencia BETWEEN :inicio AND :fim
+UNION ALL
+SELECT e.RegraID, e.DataOcorrencia FROM Regras r JOIN ExcecoesRecorrencias e
+    ON e.RegraID = r.ID AND e.DataOcorrencia BETWEEN :inicio AND :fim;
+"""
+
+DEBT_INSERT_QUERY = """
+INSERT INTO Dividas (ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria,
+                     RegraID, DataOcorrencia)
+VALUES (:ID, :Descricao, :Valor, :DataVencimento, :Status, :Recorrencia, :RecorrenciaMeses, :Categoria,
+        :RegraID, :DataOcorrencia);
+"""
+
+# Grava a ocorrência de uma dívida recorrente, a menos que outro pedido já a tenha gravado
+DEBT_OCCURRENCE_INSERT_QUERY = """
+INSERT INTO Dividas (ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria,
+                     RegraID, DataOcorrencia)
+VALUES (:ID, :Descricao, :Valor, :DataVencimento, :Status, :Recorrencia, :RecorrenciaMeses, :Categoria,
+        :RegraID, :DataOcorrencia)
+ON CONFLICT DO NOTHING;
+"""
+
+# Marca uma dívida como paga só se ainda não estiver: rowcount 0 indica que outro pedido já a pagou
+PAY_DEBT_QUERY = "UPDATE Dividas SET Status = 'Pago' WHERE ID = ? AND COALESCE(lower(Status), '') <> 'pago';"
+
+# Colunas de Dividas que podem ser alteradas em lote
+DEBT_BULK_UPDATE_COLUMNS = ('Descricao', 'Valor', 'DataVencimento', 'Status', 'Categoria')
+
+# Máximo de parâmetros por consulta 'IN (...)' (limite de variáveis das versões antigas do SQLite)
+MAX_IN_PARAMS = 500
+
+# Marca como 'Atrasado' todas as dívidas em aberto já vencidas num único UPDATE
+# (intervalo de DataVencimento em idx_dividas_vencimento_status). Dívidas sem status contam como
+# não pagas nas leituras, mas não são reescritas aqui (como na versão anterior).
+OVERDUE_DEBTS_SWEEP_QUERY = """
+UPDATE Dividas SET Status = 'Atrasado'
+WHERE DataVencimento < :hoje AND lower(Status) = 'aberto';
+"""
+
+# Dívidas não pagas que vencem até :limite (inclui as atrasadas), da mais antiga à mais recente
+UPCOMING_DEBTS_QUERY = """
+SELECT ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria
+FROM Dividas
+WHERE DataVencimento <= :limite AND COALESCE(lower(Status), '') <> 'pago'
+ORDER BY DataVencimento;
+"""
+
+# Faixas do relatório de antiguidade das dívidas (contas a pagar), na ordem de apresentação
+DEBT_AGING_BUCKETS = ('atrasado_60_mais', 'atrasado_31_60', 'atrasado_1_30', 'proximos_7_dias', 'proximos_30_dias')
+
+# Totais das dívidas não pagas por faixa e categoria, numa única agregação.
+# Os limites das faixas são datas calculadas em Python (ver CoreManager.get_debt_aging_totals),
+# para que o intervalo de DataVencimento use idx_dividas_vencimento_status.
+DEBT_AGING_QUERY = """
+SELECT CASE
+           WHEN DataVencimento < :atraso_60 THEN 'atrasado_60_mais'
+           WHEN DataVencimento < :atraso_30 THEN 'atrasado_31_60'
+           WHEN DataVencimento < :hoje THEN 'atrasado_1_30'
+           WHEN DataVencimento <= :semana THEN 'proximos_7_dias'
+           ELSE 'proximos_30_dias'
+       END AS Faixa,
+       COALESCE(Categoria, '') AS Categoria,
+       COUNT(*) AS Quantidade,
+       SUM(CAST(round(Valor * 100) AS INTEGER)) AS TotalCentavos
+FROM Dividas
+WHERE DataVencimento <= :mes AND COALESCE(lower(Status), '') <> 'pago'
+GROUP BY Faixa, Categoria;
+"""
+
+
+def debt_aging_bounds(today: date):
+    """Limites (YYYY-MM-DD) das faixas de DEBT_AGING_QUERY para a data 'today'."""
+    return {
+        'atraso_60': (today - timedelta(days=60)).isoformat(),
+        'atraso_30': (today - timedelta(days=30)).isoformat(),
+        'hoje': today.isoformat(),
+        'semana': (today + timedelta(days=7)).isoformat(),
+        'mes': (today + timedelta(days=30)).isoformat(),
+    }
+
+
+def debt_aging_bucket(due_date: str, bounds: dict):
+    """Faixa de uma data de vencimento (mesmas regras de DEBT_AGING_QUERY), ou None se for posterior a 30 dias."""
+    if due_date > bounds['mes']:
+        return None
+    if due_date < bounds['atraso_60']:
+        return 'atrasado_60_mais'
+    if due_date < bounds['atraso_30']:
+        return 'atrasado_31_60'
+    if due_date < bounds['hoje']:
+        return 'atrasado_1_30'
+    if due_date <= bounds['semana']:
+        return 'proximos_7_dias'
+    return 'proximos_30_dias'
+
+
+# Consultas frequentes que devem sempre usar um índice (nome -> (SQL, parâmetros de exemplo)).
+# Verificadas por CoreManager.verify_query_plans().
+PERIOD_TRANSACTIONS_QUERY = """
+SELECT ID, Data, Tipo, Descricao, Categoria, ValorCentavos / 100.0 AS Valor, MeioPagamento
+FROM Transacoes WHERE DataDia BETWEEN ? AND ? ORDER BY DataDia, ID;
+"""
+
+# Nome usado nos relatórios para lançamentos sem categoria (Categoria NULL)
+UNCATEGORIZED_LABEL = 'Sem categoria'
+
+PERIOD_TOTALS_QUERY = """
+SELECT lower(Tipo) AS Tipo, COALESCE(Categoria, :sem_categoria) AS Categoria, SUM(ValorCentavos) AS TotalCentavos
+FROM Transacoes
+WHERE DataDia BETWEEN :inicio AND :fim AND lower(Tipo) IN ('ganho', 'despesa')
+  AND (:categoria IS NULL OR lower(COALESCE(Categoria, :sem_categoria)) = lower(:categoria))
+GROUP BY 1, 2;
+"""
+
+MONTHLY_BALANCE_QUERY = """
+SELECT MeioPagamento,
+       SUM(CASE WHEN lower(Tipo) = 'ganho' THEN TotalCentavos ELSE 0 END) AS GanhosCentavos,
+       SUM(CASE WHEN lower(Tipo) = 'despesa' THEN TotalCentavos ELSE 0 END) AS DespesasCentavos
+FROM MonthlyAggregates WHERE MesAnoChave = ?
+GROUP BY MeioPagamento;
+"""
+
+MONTHLY_CATEGORY_TOTALS_QUERY = """
+SELECT lower(Tipo) AS Tipo, Categoria, SUM(TotalCentavos) AS TotalCentavos
+FROM MonthlyAggregates
+WHERE MesAnoChave = ? AND lower(Tipo) IN ('ganho', 'despesa')
+GROUP BY lower(Tipo), Categoria;
+"""
+
+# Último checkpoint de fim de mês anterior ao mês indicado, por meio de pagamento.
+# A CTE recursiva percorre os meios de pagamento saltando pela chave primária
+# (um acesso ao índice por meio), em vez de ler todos os checkpoints.
+RUNNING_BALANCE_CHECKPOINT_QUERY = """
+WITH RECURSIVE Meios(MeioPagamento) AS (
+    SELECT MIN(MeioPagamento) FROM SaldosAcumulados
+    UNION ALL
+    SELECT (SELECT MIN(MeioPagamento) FROM SaldosAcumulados WHERE MeioPagamento > Meios.MeioPagamento)
+    FROM Meios WHERE Meios.MeioPagamento IS NOT NULL
+)
+SELECT Meios.MeioPagamento, (
+    SELECT SaldoCentavos FROM SaldosAcumulados
+    WHERE MeioPagamento = Meios.MeioPagamento AND MesAnoChave < ?
+    ORDER BY MesAnoChave DESC LIMIT 1
+) AS SaldoCentavos
+FROM Meios WHERE Meios.MeioPagamento IS NOT NULL;
+"""
+
+# Lançamentos do mês civil até o dia pedido (DataDia entre o dia 1 do mês e esse dia):
+# o mesmo critério dos checkpoints, que são por mês da Data e não por MesAno
+RUNNING_BALANCE_DELTA_QUERY = """
+SELECT COALESCE(MeioPagamento, '') AS MeioPagamento,
+       SUM(CASE lower(Tipo) WHEN 'ganho' THEN ValorCentavos WHEN 'despesa' THEN -ValorCentavos ELSE 0 END) AS SaldoCentavos
+FROM Transacoes WHERE DataDia BETWEEN ? AND ?
+GROUP BY 1;
+"""
+
+# Lançamentos cujo ValorCentavos não corresponde a Valor. Só há divergência se a
+# diferença passar de meio centavo: to_cents arredonda o decimal (1.005 -> 101), mas
+# Valor * 100 em vírgula flutuante pode dar 100.4999...
+CENTS_DRIFT_CONDITION = "Valor IS NOT NULL AND (ValorCentavos IS NULL OR ABS(ValorCentavos - Valor * 100) > 0.501)"
+
+TRANSACTION_INSERT_QUERY = """
+INSERT INTO Transacoes (ID, MesAno, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento, ValorCentavos, DataDia, MesAnoChave)
+VALUES (:ID, :MesAno, :Data, :Tipo, :Descricao, :Categoria, :Valor, :MeioPagamento, :ValorCentavos, :DataDia, :MesAnoChave);
+"""
+
+# Inserções usadas pela importação: linhas já existentes (mesma chave) são ignoradas,
+# exceto orçamentos, cujo limite é atualizado. Só o conflito de chave é ignorado (ON CONFLICT ... DO NOTHING);
+# violações de NOT NULL ou CHECK continuam a falhar e são reportadas como erro pelo caminho linha a linha.
+# Transacoes ignora tanto o ID repetido (planilha) como o HashConteudo repetido (extratos): vários
+# ON CONFLICT na mesma instrução exigem SQLite 3.35 ou superior.
+IMPORT_QUERIES = {
+    'Categorias': "INSERT INTO Categorias (Categoria) VALUES (:Categoria) ON CONFLICT(Categoria) DO NOTHING;",
+    'Orcamentos': """
+        INSERT INTO Orcamentos (MesAno, Categoria, Limite) VALUES (:MesAno, :Categoria, :Limite)
+        ON CONFLICT(MesAno, Categoria) DO UPDATE SET Limite = excluded.Limite;
+    """,
+    'Emprestimos': """
+        INSERT INTO Emprestimos (ID, Tipo, ParteEnvolvida, ValorOriginal, "Juros%", NumParcelas, ParcelasPagas, Status)
+        VALUES (:ID, :Tipo, :ParteEnvolvida, :ValorOriginal, :Juros, :NumParcelas, :ParcelasPagas, :Status)
+        ON CONFLICT(ID) DO NOTHING;
+    """,
+    'Dividas': """
+        INSERT INTO Dividas (ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria)
+        VALUES (:ID, :Descricao, :Valor, :DataVencimento, :Status, :Recorrencia, :RecorrenciaMeses, :Categoria)
+        ON CONFLICT(ID) DO NOTHING;
+    """,
+    'Transacoes': """
+        INSERT INTO Transacoes (ID, MesAno, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento,
+                                ValorCentavos, DataDia, MesAnoChave, HashConteudo)
+        VALUES (:ID, :MesAno, :Data, :Tipo, :Descricao, :Categoria, :Valor, :MeioPagamento,
+                :ValorCentavos, :DataDia, :MesAnoChave, :HashConteudo)
+        ON CONFLICT(HashConteudo) WHERE HashConteudo IS NOT NULL DO NOTHING
+        ON CONFLICT(ID) DO NOTHING;
+    """,
+}
+
+# Pesquisa de texto completo: resultados ordenados por relevância (bm25) e, em empate, pelos mais recentes
+SEARCH_TRANSACTIONS_QUERY = """
+SELECT t.ID, t.MesAno, t.Data, t.Tipo, t.Descricao, t.Categoria, t.Valor, t.MeioPagamento
+FROM TransacoesBusca b JOIN Transacoes t ON t.ID = b.ID
+WHERE TransacoesBusca MATCH :busca
+  AND (:inicio IS NULL OR t.DataDia >= :inicio)
+  AND (:fim IS NULL OR t.DataDia <= :fim)
+  AND (:categoria IS NULL OR t.Categoria = :categoria)
+ORDER BY b.rank, t.DataDia DESC
+LIMIT :limite OFFSET :deslocamento;
+"""
+
+# Ordenações da listagem paginada: nome -> (coluna indexada, direção).
+# O cursor é o par (coluna, ID) da última linha devolvida (ver idx_transacoes_*_id).
+TRANSACTION_LISTING_SORTS = {
+    'data_desc': ('DataDia', 'DESC'),
+    'data_asc': ('DataDia', 'ASC'),
+    'valor_desc': ('ValorCentavos', 'DESC'),
+    'valor_asc': ('ValorCentavos', 'ASC'),
+}
+
+# Filtros da listagem: nome do parâmetro -> condição SQL
+TRANSACTION_LISTING_FILTERS = {
+    'inicio': "DataDia >= :inicio",
+    'fim': "DataDia <= :fim",
+    'tipo': "Tipo = :tipo",
+    'categoria': "Categoria = :categoria",
+    'meio': "MeioPagamento = :meio",
+    'valor_min': "ValorCentavos >= :valor_min",
+    'valor_max': "ValorCentavos <= :valor_max",
+}
+
+
+def build_listing_query(sort: str, filters, with_cursor: bool, null_cursor_key: bool = False):
+    """
+    Monta a consulta da listagem apenas com os filtros usados (para o planeador escolher o melhor índice).
+    Linhas com a coluna de ordenação NULL (dados anteriores à validação das datas) ficam no fim da ordem
+    decrescente e no início da crescente. Depois de um cursor, o resto da listagem pode estar em dois
+    intervalos do índice (chaves preenchidas e chaves NULL), lidos separadamente e juntos com UNION ALL.
+    """
+    column, direction = TRANSACTION_LISTING_SORTS[sort]
+    conditions = [TRANSACTION_LISTING_FILTERS[name] for name in filters]
+    operator = '>' if direction == 'ASC' else '<'
+    if not with_cursor:
+        ranges = [[]]
+    elif null_cursor_key:
+        ranges = [[f"{column} IS NULL", f"ID {operator} :cursor_id"]]
+        if direction == 'ASC':
+            ranges.append([f"{column} IS NOT NULL"])
+    else:
+        ranges = [[f"({column}, ID) {operator} (:cursor_chave, :cursor_id)"]]
+        if direction == 'DESC':
+            ranges.append([f"{column} IS NULL"])
+
+    selects = []
+    for extra in ranges:
+        where = f"WHERE {' AND '.join(conditions + extra)}" if conditions or extra else ""
+        selects.append(f"""
+SELECT ID, MesAno, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento, {column} AS ChaveOrdenacao
+FROM Transacoes {where}
+ORDER BY {column} {direction}, ID {direction}
+LIMIT :limite""")
+    if len(selects) == 1:
+        return selects[0] + ";\n"
+    union = "\nUNION ALL\n".join(f"SELECT * FROM ({select}\n)" for select in selects)
+    return f"""{union}
+ORDER BY ChaveOrdenacao {direction}, ID {direction}
+LIMIT :limite;
+"""
+
+
+def encode_listing_cursor(sort: str, key, transaction_id: str):
+    """Cursor opaco (base64 de JSON) que aponta para a linha seguinte à (key, ID)."""
+    raw = json.dumps([sort, key, transaction_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_listing_cursor(cursor: str, sort: str):
+    """Inverso de encode_listing_cursor. Levanta ValueError se o cursor for inválido ou de outra ordenação."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, key, transaction_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido.")
+    if cursor_sort != sort:
+        raise ValueError("O cursor pertence a outra ordenação.")
+    return key, transaction_id
+
+
+# Filtros da listagem de dívidas: nome do parâmetro -> condição SQL.
+# O intervalo de datas usa idx_dividas_vencimento_status; a categoria, idx_dividas_categoria_vencimento.
+DEBT_LISTING_FILTERS = {
+    'inicio': "DataVencimento >= :inicio",
+    'fim': "DataVencimento <= :fim",
+    'status': "lower(Status) = lower(:status)",
+    'categoria': "Categoria = :categoria",
+}
+
+
+def build_debt_listing_query(filters):
+    """Monta a consulta de dívidas apenas com os filtros usados, ordenada pelo vencimento."""
+    conditions = [DEBT_LISTING_FILTERS[name] for name in filters]
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"""
+SELECT ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria
+FROM Dividas {where}
+ORDER BY DataVencimento;
+"""
+
+
+HOT_QUERIES = {
+    'transacoes_do_mes': (MONTHLY_TRANSACTIONS_QUERY, ('01-2025',)),
+    'orcamentos_do_mes': (MONTHLY_BUDGETS_QUERY, ('01-2025',)),
+    'transacao_por_id': (TRANSACTION_BY_ID_QUERY, ('',)),
+    'emprestimo_por_id': (LOAN_BY_ID_QUERY, ('',)),
+    'divida_por_id': (DEBT_BY_ID_QUERY, ('',)),
+    'varredura_de_dividas_atrasadas': (OVERDUE_DEBTS_SWEEP_QUERY, {'hoje': '2025-01-01'}),
+    'dividas_a_vencer': (UPCOMING_DEBTS_QUERY, {'limite': '2025-01-31'}),
+    'dividas_do_periodo': (build_debt_listing_query(['inicio', 'fim', 'status']),
+                           {'inicio': '2025-01-01', 'fim': '2025-01-31', 'status': 'Aberto'}),
+    'dividas_por_categoria': (build_debt_listing_query(['categoria']), {'categoria': 'Contas'}),
+    'antiguidade_das_dividas': (DEBT_AGING_QUERY, debt_aging_bounds(date(2025, 1, 1))),
+    'regras_de_dividas_do_periodo': (DEBT_RULES_IN_PERIOD_QUERY, {'inicio': '2025-01-01', 'fim': '2025-01-31'}),
+    'ocorrencias_ignoradas': (DEBT_RULES_SKIPPED_DATES_QUERY, {'inicio': '2025-01-01', 'fim': '2025-01-31'}),
+    'transacoes_do_periodo': (PERIOD_TRANSACTIONS_QUERY, (20089, 20453)),
+    'totais_do_periodo': (PERIOD_TOTALS_QUERY, {'inicio': 20089, 'fim': 20453, 'categoria': 'Mercado',
+                                                'sem_categoria': UNCATEGORIZED_LABEL}),
+    'saldos_do_mes': (MONTHLY_BALANCE_QUERY, (202501,)),
+    'totais_por_categoria_do_mes': (MONTHLY_CATEGORY_TOTALS_QUERY, (202501,)),
+    'saldo_acumulado_checkpoint': (RUNNING_BALANCE_CHECKPOINT_QUERY, (202501,)),
+    'saldo_acumulado_delta': (RUNNING_BALANCE_DELTA_QUERY, (20089, 20103)),
+    'listagem_de_transacoes': (build_listing_query('data_desc', ['categoria'], True),
+                               {'categoria': 'Mercado', 'cursor_chave': 20089, 'cursor_id': '', 'limite': 50}),
+    'listagem_por_valor': (build_listing_query('valor_asc', ['inicio', 'fim'], True),
+                           {'inicio': 20089, 'fim': 20453, 'cursor_chave': 0, 'cursor_id': '', 'limite': 50}),
+    'listagem_apos_chave_nula': (build_listing_query('data_asc', ['categoria'], True, null_cursor_key=True),
+                                 {'categoria': 'Mercado', 'cursor_id': '', 'limite': 50}),
+    'pesquisa_de_transacoes': (SEARCH_TRANSACTIONS_QUERY, {'busca': '"mercado"*', 'inicio': None, 'fim': None,
+                                                           'categoria': None, 'limite': 50, 'deslocamento': 0}),
+}
+
+
+def build_match_expression(text: str):
+    """
+    Converte o texto digitado pelo utilizador numa expressão MATCH do FTS5.
+    Cada palavra é posta entre aspas (operadores e símbolos do FTS5 perdem o
+    significado especial) e pesquisada como prefixo; todas as palavras têm de
+    aparecer. Retorna None se não houver palavras.
+    """
+    tokens = [token.replace('"', '""') for token in (text or '').split()]
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
 class CoreManager:
     def __init__(self):
         self._ensure_db_file_exists()
+        self._pool = ConnectionPool(DB_FILE)
+        self._cache = QueryCache()
+        # Deteção de escritas de outros processos (ver _detect_external_writes)
+        self._data_version_lock = threading.Lock()
+        self._watcher = None
+        self._seen_data_version = None
+        self._pending_commits = 0 # commits deste processo entre o COMMIT e a reconciliação da versão
+        self._next_external_check = 0.0
+        self._unit_of_work = threading.local() # profundidade e tabelas escritas da transação em curso
         self._initialize_database()
 
     def _ensure_db_file_exists(self):
@@ -31,112 +494,478 @@ class CoreManager:
             print(f"Diretório '{db_folder_path}' criado.")
 
     def _create_connection(self):
+        """Retorna a conexão persistente da thread atual (partilhada via pool)."""
         try:
-            conn = sqlite3.connect(DB_FILE, isolation_level=None)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return self._pool.acquire()
         except Exception as e:
             print(f"Erro ao conectar ao banco de dados {DB_FILE}: {e}")
             return None
 
+    def close(self):
+        """Fecha todas as conexões do pool. Chamado no encerramento da aplicação."""
+        self._pool.close_all()
+        with self._data_version_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+        print("Conexões com o banco de dados encerradas.")
+
+    def _watcher_version(self):
+        """'PRAGMA data_version' lido na conexão própria (_watcher), que nunca escreve. Chamar com _data_version_lock."""
+        if self._watcher is None:
+            self._watcher = sqlite3.connect(self._pool.db_file, isolation_level=None, check_same_thread=False)
+        return self._watcher.execute("PRAGMA data_version;").fetchone()[0]
+
+    def _check_data_version(self):
+        """
+        Descarta toda a cache se outro processo (ex.: a API e o desktop em simultâneo)
+        gravou no banco desde a última verificação. Chamar com _data_version_lock.
+
+        'PRAGMA data_version' muda sempre que outra conexão faz commit. Cada commit
+        deste processo atualiza o valor visto depois do COMMIT (ver _commit), pelo que
+        qualquer outra mudança vem de fora. Enquanto um commit deste processo não foi
+        reconciliado, a mudança pode ser dele e a verificação fica para o _commit.
+        As escritas deste processo, em qualquer thread, invalidam apenas as suas
+        tabelas (gerações da QueryCache).
+        """
+        if self._pending_commits:
+            return
+        data_version = self._watcher_version()
+        if self._seen_data_version is not None and self._seen_data_version != data_version:
+            self._cache.invalidate_all()
+        self._seen_data_version = data_version
+
+    def _detect_external_writes(self):
+        """_check_data_version para as leituras, no máximo uma vez a cada EXTERNAL_WRITES_CHECK_INTERVAL."""
+        if time.monotonic() < self._next_external_check:
+            return
+        with self._data_version_lock:
+            self._check_data_version()
+            self._next_external_check = time.monotonic() + EXTERNAL_WRITES_CHECK_INTERVAL
+
+    def _commit(self, conn):
+        """
+        COMMIT da transação externa, mantendo a deteção de escritas de outros processos.
+        O lock só protege a leitura e a comparação das versões, nunca o COMMIT (e o seu
+        fsync): as leituras das outras threads não esperam pelo escritor.
+        """
+        with self._data_version_lock:
+            # Com BEGIN IMMEDIATE nenhum outro commit acontece até ao nosso
+            self._check_data_version()
+            self._pending_commits += 1
+        own_version = conn.execute("PRAGMA data_version;").fetchone()[0]
+        try:
+            conn.execute("COMMIT;")
+        finally:
+            with self._data_version_lock:
+                self._pending_commits -= 1
+                self._seen_data_version = self._watcher_version()
+                # A conexão que escreveu não vê o próprio commit: se o valor dela mudou, outra
+                # conexão gravou logo a seguir (antes da leitura do _watcher) e pode ser de fora
+                if conn.execute("PRAGMA data_version;").fetchone()[0] != own_version:
+                    self._cache.invalidate_all()
+
+    def _cached_read(self, name: str, params: tuple, tables: tuple, loader):
+        """
+        Executa loader(conn) através da cache de leituras.
+        'tables' são as tabelas de que o resultado depende: qualquer escrita nelas
+        (via CoreManager, em qualquer thread) invalida a entrada. Escritas de outros
+        processos descartam toda a cache (ver _detect_external_writes).
+        Dentro de transaction() a cache não é usada: o resultado pode incluir dados
+        ainda não confirmados (ou que serão desfeitos) e não pode ser servido a outras threads.
+        """
+        conn = self._create_connection()
+        if getattr(self._unit_of_work, 'depth', 0):
+            return loader(conn)
+        self._detect_external_writes()
+        return self._cache.get_or_load(name, params, tables, lambda: loader(conn))
+
+    @contextmanager
+    def transaction(self, *tables):
+        """
+        Unidade de trabalho: tudo o que for escrito dentro do bloco (por este
+        método ou pelos métodos de escrita do CoreManager, na mesma thread) é
+        gravado num único commit, ou desfeito por inteiro se o bloco levantar
+        uma exceção.
+
+            with core.transaction():
+                core.update_debt(...)
+                core.add_transaction(...)
+
+        O bloco mais externo abre 'BEGIN IMMEDIATE' (reserva a escrita logo no
+        início, evitando SQLITE_BUSY a meio da operação); blocos internos usam
+        SAVEPOINTs e podem falhar sem desfazer o bloco externo. 'tables' são as
+        tabelas escritas: as entradas da cache que dependem delas são descartadas
+        no fim do bloco e de novo após o commit (ou rollback) externo.
+        """
+        conn = self._create_connection()
+        if conn is None:
+            raise sqlite3.OperationalError("Sem conexão com o banco de dados.")
+        state = self._unit_of_work
+        depth = getattr(state, 'depth', 0)
+        if depth == 0:
+            state.tables = set()
+            conn.execute("BEGIN IMMEDIATE;")
+        else:
+            conn.execute(f"SAVEPOINT unidade_{depth};")
+        state.depth = depth + 1
+        state.tables.update(tables)
+        try:
+            yield conn
+            if depth == 0:
+                self._commit(conn)
+            else:
+                conn.execute(f"RELEASE unidade_{depth};")
+        except BaseException:
+            # Alguns erros (ex.: disco cheio) já desfazem a transação inteira no SQLite
+            if conn.in_transaction:
+                if depth == 0:
+                    conn.execute("ROLLBACK;")
+                else:
+                    conn.execute(f"ROLLBACK TO unidade_{depth};")
+                    conn.execute(f"RELEASE unidade_{depth};")
+            raise
+        finally:
+            state.depth = depth
+            for table in (state.tables if depth == 0 else tables):
+                self._cache.invalidate(table)
+
+    def get_tables_version(self, *tables):
+        """
+        Retorna um valor que muda sempre que uma das tabelas é escrita por este processo
+        (em qualquer thread) ou que outro processo grava no banco (ver _detect_external_writes).
+        Serve para saber se um resultado calculado antes ainda é válido.
+        """
+        self._detect_external_writes()
+        return self._cache.generations(*tables)
+
+    def get_cache_stats(self):
+        """Retorna os contadores da cache de leituras (hits, misses, entradas...)."""
+        return self._cache.stats()
+
+    def get_transaction_months(self):
+        """Retorna a lista de 'MesAno' distintos com lançamentos."""
+        query = "SELECT DISTINCT MesAno FROM Transacoes;"
+        try:
+            return self._cached_read('meses_com_transacoes', (), ('Transacoes',),
+                                     lambda conn: [row[0] for row in conn.execute(query).fetchall()])
+        except Exception as e:
+            print(f"Erro ao listar 'MesAno' da tabela Transacoes: {e}")
+            return []
+
     def _initialize_database(self):
-        
-        create_table_queries = [
-            """
-            CREATE TABLE IF NOT EXISTS Categorias (
-                Categoria TEXT PRIMARY KEY NOT NULL
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS Orcamentos (
-                MesAno TEXT NOT NULL,
-                Categoria TEXT NOT NULL,
-                Limite REAL NOT NULL,
-                PRIMARY KEY (MesAno, Categoria),
-                FOREIGN KEY (Categoria) REFERENCES Categorias (Categoria) ON DELETE CASCADE
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS Emprestimos (
-                ID TEXT PRIMARY KEY NOT NULL,
-                Tipo TEXT NOT NULL,
-                ParteEnvolvida TEXT NOT NULL,
-                ValorOriginal REAL NOT NULL,
-                "Juros%" REAL NOT NULL,
-                NumParcelas INTEGER NOT NULL,
-                ParcelasPagas INTEGER NOT NULL,
-                Status TEXT NOT NULL
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS Dividas (
-                ID TEXT PRIMARY KEY NOT NULL,
-                Descricao TEXT,
-                Valor REAL,
-                DataVencimento TEXT,
-                Status TEXT,
-                Recorrencia TEXT,
-                RecorrenciaMeses INTEGER,
-                Categoria TEXT,
-                FOREIGN KEY (Categoria) REFERENCES Categorias (Categoria) ON DELETE SET NULL
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS Transacoes (
-                ID TEXT PRIMARY KEY NOT NULL,
-                MesAno TEXT NOT NULL,
-                Data TEXT,
-                Tipo TEXT,
-                Descricao TEXT,
-                Categoria TEXT,
-                Valor REAL,
-                MeioPagamento TEXT,
-                FOREIGN KEY (Categoria) REFERENCES Categorias (Categoria) ON DELETE SET NULL
-            );
-            """
-        ]
-        
+        """Aplica as migrações pendentes. Se o esquema já estiver atualizado, nenhum DDL é executado."""
         try:
-            with self._create_connection() as conn:
-                cursor = conn.cursor()
-                for query in create_table_queries:
-                    cursor.execute(query)
-                print("Verificação de tabelas do banco de dados concluída.")
+            applied = apply_migrations(self._create_connection())
+            if applied:
+                print(f"Esquema do banco de dados atualizado para a versão {SCHEMA_VERSION} ({applied} migração(ões) aplicada(s)).")
         except Exception as e:
             print(f"Erro ao inicializar tabelas: {e}")
 
+    def verify_query_plans(self):
+        """
+        Executa EXPLAIN QUERY PLAN em cada consulta de HOT_QUERIES.
+        Retorna um dicionário {nome: [passos]} apenas com as consultas que fazem
+        varredura completa de tabela (SCAN sem índice). Vazio = tudo indexado.
+        """
+        full_scans = {}
+        conn = self._create_connection()
+        if conn is not None:
+            # Só interessam varreduras de tabelas reais (não de CTEs ou subconsultas)
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+            for name, (query, params) in HOT_QUERIES.items():
+                plan = [row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+                scans = [step for step in plan
+                         if step.startswith('SCAN ') and 'INDEX' not in step and step.split()[1] in tables]
+                if scans:
+                    full_scans[name] = scans
+        return full_scans
+
 
     def get_monthly_transactions(self, month_year: str):
         """Retorna os lançamentos de um mês específico."""
-        query = "SELECT ID, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento FROM Transacoes WHERE MesAno = ?;"
-        try:
-            with self._create_connection() as conn:
-                df = pd.read_sql_query(query, conn, params=(month_year,))
+        import pandas as pd
+        def load(conn):
+            df = pd.read_sql_query(MONTHLY_TRANSACTIONS_QUERY, conn, params=(month_year,))
 
-                expected_cols = ['ID', 'Data', 'Tipo', 'Descricao', 'Categoria', 'Valor', 'MeioPagamento']
-                for col in expected_cols:
-                    if col not in df.columns:
-                        df[col] = None
+            expected_cols = ['ID', 'Data', 'Tipo', 'Descricao', 'Categoria', 'Valor', 'MeioPagamento']
+            for col in expected_cols:
+                if col not in df.columns:
+                    df[col] = None
 
-                if 'ID' in df.columns:
-                    df['ID'] = df['ID'].astype(str)
+            if 'ID' in df.columns:
+                df['ID'] = df['ID'].astype(str)
 
-                return df
+            return df
+        try:
+            return self._cached_read('transacoes_do_mes', (month_year,), ('Transacoes',), load)
         except Exception as e:
             print(f"Erro ao carregar transações para '{month_year}': {e}")
             return pd.DataFrame(columns=['ID', 'Data', 'Tipo', 'Descricao', 'Categoria', 'Valor', 'MeioPagamento'])
 
+    def get_transactions_in_period(self, start_date, end_date):
+        """
+        Retorna os lançamentos com Data entre start_date e end_date (inclusive),
+        numa única consulta pelo índice de DataDia. 'Data' já vem como datetime
+        e 'Valor' como float (calculado a partir dos centavos).
+        """
+        import pandas as pd
+        columns = ['ID', 'Data', 'Tipo', 'Descricao', 'Categoria', 'Valor', 'MeioPagamento']
+        params = (date_to_day(start_date), date_to_day(end_date))
+
+        def load(conn):
+            return pd.read_sql_query(
+                PERIOD_TRANSACTIONS_QUERY, conn, params=params,
+                parse_dates={'Data': {'format': '%Y-%m-%d'}},
+                dtype={'ID': str, 'Valor': float}
+            )
+        try:
+            return self._cached_read('transacoes_do_periodo', params, ('Transacoes',), load)
+        except Exception as e:
+            print(f"Erro ao carregar transações do período: {e}")
+            return pd.DataFrame(columns=columns)
+
+    def get_transaction_totals(self, start_date, end_date, category: str = None):
+        """
+        Soma os lançamentos do período agrupados por tipo ('ganho'/'despesa') e categoria,
+        opcionalmente de uma única categoria (comparação sem distinguir maiúsculas).
+        Lançamentos sem categoria aparecem como UNCATEGORIZED_LABEL.
+        Retorna uma lista de tuplas (tipo, categoria, total_em_centavos),
+        ou None em caso de erro (para que o chamador use outro caminho).
+        """
+        params = {'inicio': date_to_day(start_date), 'fim': date_to_day(end_date),
+                  'categoria': category, 'sem_categoria': UNCATEGORIZED_LABEL}
+
+        def load(conn):
+            rows = conn.execute(PERIOD_TOTALS_QUERY, params).fetchall()
+            return [(row['Tipo'], row['Categoria'], row['TotalCentavos'] or 0) for row in rows]
+        try:
+            return self._cached_read('totais_do_periodo', tuple(params.values()), ('Transacoes',), load)
+        except Exception as e:
+            print(f"Erro ao agregar transações do período: {e}")
+            return None
+
+    def get_monthly_balance_totals(self, month_year: str):
+        """
+        Soma ganhos e despesas do mês por meio de pagamento numa única consulta.
+        Retorna uma lista de tuplas (meio_pagamento, ganhos_centavos, despesas_centavos),
+        ou None em caso de erro.
+        """
+        def load(conn):
+            rows = conn.execute(MONTHLY_BALANCE_QUERY, (month_year_to_key(month_year),)).fetchall()
+            return [(row['MeioPagamento'], row['GanhosCentavos'] or 0, row['DespesasCentavos'] or 0) for row in rows]
+        try:
+            return self._cached_read('saldos_do_mes', (month_year,), ('Transacoes',), load)
+        except Exception as e:
+            print(f"Erro ao calcular saldos de '{month_year}': {e}")
+            return None
+
+    def get_monthly_category_totals(self, month_year: str):
+        """
+        Totais do mês por tipo ('ganho'/'despesa') e categoria, lidos de MonthlyAggregates.
+        Retorna uma lista de tuplas (tipo, categoria, total_em_centavos), ou None em caso de erro.
+        """
+        def load(conn):
+            rows = conn.execute(MONTHLY_CATEGORY_TOTALS_QUERY, (month_year_to_key(month_year),)).fetchall()
+            return [(row['Tipo'], row['Categoria'] or None, row['TotalCentavos'] or 0) for row in rows]
+        try:
+            return self._cached_read('totais_por_categoria_do_mes', (month_year,), ('Transacoes',), load)
+        except Exception as e:
+            print(f"Erro ao buscar totais por categoria de '{month_year}': {e}")
+            return None
+
+    def rebuild_monthly_aggregates(self):
+        """
+        Recalcula toda a tabela MonthlyAggregates a partir de Transacoes.
+        Antes disso, ValorCentavos é recalculado a partir de Valor nos lançamentos em que divergem.
+        """
+        try:
+            with self.transaction('Transacoes') as conn:
+                repaired = conn.execute(
+                    f"UPDATE Transacoes SET ValorCentavos = CAST(ROUND(Valor * 100) AS INTEGER) WHERE {CENTS_DRIFT_CONDITION};"
+                ).rowcount
+                if repaired:
+                    print(f"ValorCentavos recalculado em {repaired} lançamento(s).")
+                conn.execute("DELETE FROM MonthlyAggregates;")
+                conn.execute(f"INSERT INTO MonthlyAggregates {MONTHLY_AGGREGATES_SOURCE_QUERY};")
+            print("Tabela MonthlyAggregates reconstruída.")
+            return True
+        except Exception as e:
+            print(f"Erro ao reconstruir MonthlyAggregates: {e}")
+            return False
+
+    def get_running_balance_totals(self, as_of_date):
+        """
+        Saldo acumulado de cada meio de pagamento até 'as_of_date' (inclusive):
+        o checkpoint do fim do mês civil anterior somado aos lançamentos do próprio mês
+        até essa data. Ambos usam a Data dos lançamentos (não o MesAno).
+        Retorna um dicionário {meio_pagamento: saldo_em_centavos}, ou None em caso de erro.
+        """
+        day = date_to_day(as_of_date)
+        as_of = day_to_date(day)
+        month_key = as_of.year * 100 + as_of.month
+        month_start = date_to_day(as_of.replace(day=1))
+
+        def load(conn):
+            totals = {}
+            for row in conn.execute(RUNNING_BALANCE_CHECKPOINT_QUERY, (month_key,)).fetchall():
+                if row['SaldoCentavos'] is not None:
+                    totals[row['MeioPagamento']] = row['SaldoCentavos']
+            for row in conn.execute(RUNNING_BALANCE_DELTA_QUERY, (month_start, day)).fetchall():
+                totals[row['MeioPagamento']] = totals.get(row['MeioPagamento'], 0) + (row['SaldoCentavos'] or 0)
+            return totals
+        try:
+            return self._cached_read('saldo_acumulado', (day,), ('Transacoes',), load)
+        except Exception as e:
+            print(f"Erro ao calcular saldo acumulado em {as_of_date}: {e}")
+            return None
+
+    def rebuild_running_balances(self):
+        """Recalcula os checkpoints de SaldosAcumulados a partir de Transacoes."""
+        try:
+            with self.transaction('Transacoes') as conn:
+                conn.execute("DELETE FROM SaldosAcumulados;")
+                conn.execute(f"INSERT INTO SaldosAcumulados {RUNNING_BALANCES_SOURCE_QUERY};")
+            print("Tabela SaldosAcumulados reconstruída.")
+            return True
+        except Exception as e:
+            print(f"Erro ao reconstruir SaldosAcumulados: {e}")
+            return False
+
+    def rebuild_search_index(self):
+        """Recria o índice de pesquisa TransacoesBusca a partir de Transacoes."""
+        try:
+            with self.transaction('Transacoes') as conn:
+                conn.execute("DELETE FROM TransacoesBusca;")
+                conn.execute(f"INSERT INTO TransacoesBusca (Descricao, Categoria, ID) {SEARCH_INDEX_SOURCE_QUERY};")
+            print("Índice de pesquisa TransacoesBusca reconstruído.")
+            return True
+        except Exception as e:
+            print(f"Erro ao reconstruir TransacoesBusca: {e}")
+            return False
+
+    def _get_by_id(self, query: str, row_id, label: str):
+        """
+        Lê uma única linha pela chave primária. Retorna um dicionário ou None se não existir.
+        Não passa pela cache: a procura no índice custa menos do que manter uma entrada por ID.
+        """
+        try:
+            row = self._create_connection().execute(query, (str(row_id),)).fetchone()
+            return dict(row) if row is not None else None
+        except Exception as e:
+            print(f"Erro ao buscar {label} {row_id}: {e}")
+            return None
+
+    def get_transaction(self, transaction_id: str):
+        """Retorna o lançamento com o ID indicado (dicionário) ou None."""
+        return self._get_by_id(TRANSACTION_BY_ID_QUERY, transaction_id, "transação")
+
+    def list_transactions(self, start_date=None, end_date=None, trans_type: str = None, category: str = None,
+                          payment_method: str = None, min_value: float = None, max_value: float = None,
+                          sort: str = 'data_desc', limit: int = 50, cursor: str = None):
+        """
+        Lista lançamentos de qualquer período com filtros e paginação por keyset.
+        'sort' é uma das chaves de TRANSACTION_LISTING_SORTS; 'cursor' é o valor
+        devolvido pela página anterior. Retorna (linhas, próximo cursor ou None),
+        ou None em caso de erro. Levanta ValueError para ordenação ou cursor inválidos.
+        """
+        if sort not in TRANSACTION_LISTING_SORTS:
+            raise ValueError(f"Ordenação inválida: {sort}.")
+        values = {
+            'inicio': date_to_day(start_date),
+            'fim': date_to_day(end_date),
+            'tipo': trans_type,
+            'categoria': category,
+            'meio': payment_method,
+            'valor_min': to_cents(min_value),
+            'valor_max': to_cents(max_value),
+        }
+        params = {name: value for name, value in values.items() if value is not None}
+        filters = list(params)
+        if cursor:
+            params['cursor_chave'], params['cursor_id'] = decode_listing_cursor(cursor, sort)
+        # Uma linha a mais indica se existe uma próxima página
+        params['limite'] = int(limit) + 1
+        query = build_listing_query(sort, filters, bool(cursor), bool(cursor) and params['cursor_chave'] is None)
+
+        def load(conn):
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+        try:
+            rows = self._cached_read('listagem_de_transacoes', (sort,) + tuple(sorted(params.items())), ('Transacoes',), load)
+        except Exception as e:
+            print(f"Erro ao listar transações: {e}")
+            return None
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_listing_cursor(sort, rows[-1]['ChaveOrdenacao'], rows[-1]['ID'])
+        # Novos dicionários: as linhas em cache não podem ser alteradas
+        return [{key: value for key, value in row.items() if key != 'ChaveOrdenacao'} for row in rows], next_cursor
+
+    def search_transactions(self, text: str, start_date=None, end_date=None, category: str = None,
+                            limit: int = 50, offset: int = 0):
+        """
+        Pesquisa lançamentos pela descrição/categoria (FTS5), do mais relevante ao menos relevante.
+        start_date/end_date ('YYYY-MM-DD' ou date) e category filtram os resultados.
+        Retorna uma lista de dicionários (no máximo 'limit', a partir de 'offset'),
+        ou None em caso de erro.
+        """
+        match = build_match_expression(text)
+        if match is None:
+            return []
+        params = {
+            'busca': match,
+            'inicio': date_to_day(start_date),
+            'fim': date_to_day(end_date),
+            'categoria': category,
+            'limite': int(limit),
+            'deslocamento': int(offset),
+        }
+
+        def load(conn):
+            return [dict(row) for row in conn.execute(SEARCH_TRANSACTIONS_QUERY, params).fetchall()]
+        try:
+            return self._cached_read('pesquisa_de_transacoes', tuple(params.values()), ('Transacoes',), load)
+        except Exception as e:
+            print(f"Erro ao pesquisar transações: {e}")
+            return None
+
+    def verify_monthly_aggregates(self):
+        """
+        Compara MonthlyAggregates com os totais recalculados de Transacoes e conta
+        os lançamentos cujo ValorCentavos não corresponde a Valor (as duas colunas são
+        gravadas em separado; os totais usam apenas ValorCentavos).
+        Retorna o número de linhas divergentes (0 = consistente), ou None em caso de erro.
+        """
+        columns = "MesAnoChave, Categoria, Tipo, MeioPagamento, TotalCentavos, Quantidade"
+        query = f"""
+        SELECT
+            (SELECT COUNT(*) FROM (
+                SELECT * FROM ({MONTHLY_AGGREGATES_SOURCE_QUERY}) EXCEPT SELECT {columns} FROM MonthlyAggregates
+            ))
+            +
+            (SELECT COUNT(*) FROM (
+                SELECT {columns} FROM MonthlyAggregates EXCEPT SELECT * FROM ({MONTHLY_AGGREGATES_SOURCE_QUERY})
+            ))
+            +
+            (SELECT COUNT(*) FROM Transacoes WHERE {CENTS_DRIFT_CONDITION});
+        """
+        try:
+            return self._create_connection().execute(query).fetchone()[0]
+        except Exception as e:
+            print(f"Erro ao verificar MonthlyAggregates: {e}")
+            return None
+
     def add_transaction(self, month_year: str, data: dict):
         """Adiciona um novo lançamento à tabela de transações."""
         data['ID'] = str(uuid.uuid4())
         data['MesAno'] = month_year 
         
-        query = """
-        INSERT INTO Transacoes (ID, MesAno, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento)
-        VALUES (:ID, :MesAno, :Data, :Tipo, :Descricao, :Categoria, :Valor, :MeioPagamento);
-        """
+        query = TRANSACTION_INSERT_QUERY
         try:
-            with self._create_connection() as conn:
+            with_numeric_keys(data)
+            with self.transaction('Transacoes') as conn:
                 conn.execute(query, data)
             print(f"Transação {data['ID']} adicionada para o mês {month_year}.")
             return True
@@ -144,15 +973,100 @@ class CoreManager:
             print(f"Erro ao adicionar transação: {e}")
             return False
 
-    def update_transaction(self, month_year: str, transaction_id: str, new_data: dict):
+    def add_transactions_bulk(self, rows: list):
+        """
+        Adiciona vários lançamentos numa única transação do banco (executemany).
+        Cada linha deve conter MesAno, Data, Tipo, Descricao, Categoria, Valor e MeioPagamento.
+        Retorna uma lista de resultados, na mesma ordem de 'rows':
+        {'ID': ..., 'sucesso': True} ou {'ID': None, 'sucesso': False, 'erro': ...}.
+        """
+        if not rows:
+            return []
+
+        records = [dict(row, ID=str(uuid.uuid4())) for row in rows]
+
+        try:
+            with self.transaction('Transacoes') as conn:
+                _, errors = self._execute_bulk(conn, TRANSACTION_INSERT_QUERY, records, with_numeric_keys)
+        except Exception as e:
+            print(f"Erro ao adicionar lote de transações: {e}")
+            return [{'ID': None, 'sucesso': False, 'erro': str(e)} for _ in rows]
+
+        print(f"Lote de transações processado: {len(records) - len(errors)} adicionadas, {len(errors)} com erro.")
+        return [
+            {'ID': None, 'sucesso': False, 'erro': errors[index]} if index in errors
+            else {'ID': record['ID'], 'sucesso': True}
+            for index, record in enumerate(records)
+        ]
+
+    def _execute_bulk(self, conn, query: str, records: list, prepare=None):
+        """
+        Executa 'query' para todos os registos com executemany, dentro da transação já aberta.
+        'prepare' (ex.: with_numeric_keys) é aplicado antes a cada registo; os que lançarem
+        ValueError são reportados como erro e não são enviados ao banco.
+        Se alguma linha falhar, desfaz o lote (SAVEPOINT) e insere linha a linha.
+        Retorna (linhas afetadas, {índice: mensagem de erro}).
+        """
+        errors = {}
+        if prepare is not None:
+            for index, record in enumerate(records):
+                try:
+                    prepare(record)
+                except ValueError as e:
+                    errors[index] = str(e)
+        pending = [(index, record) for index, record in enumerate(records) if index not in errors]
+
+        conn.execute("SAVEPOINT lote;")
+        try:
+            affected = conn.executemany(query, [record for _, record in pending]).rowcount
+            conn.execute("RELEASE lote;")
+        except sqlite3.Error:
+            # Alguma linha falhou: desfaz o lote e insere linha a linha, registando os erros
+            conn.execute("ROLLBACK TO lote;")
+            conn.execute("RELEASE lote;")
+            affected = 0
+            for index, record in pending:
+                try:
+                    affected += conn.execute(query, record).rowcount
+                except sqlite3.Error as e:
+                    errors[index] = str(e)
+        return affected, errors
+
+    def import_rows(self, table: str, records: list):
+        """
+        Insere um bloco de registos em 'table' (ver IMPORT_QUERIES) numa única transação.
+        Registos de Transacoes devem trazer ID e MesAno; as colunas derivadas são calculadas aqui
+        e HashConteudo é opcional (usado para ignorar linhas de extrato já importadas).
+        Retorna (linhas inseridas, {índice: mensagem de erro}) ou None se a transação falhar.
+        """
+        if not records:
+            return 0, {}
+        prepare = None
+        if table == 'Transacoes':
+            records = [dict({'HashConteudo': None}, **record) for record in records]
+            prepare = with_numeric_keys
 
+        try:
+            with self.transaction(table) as conn:
+                inserted, errors = self._execute_bulk(conn, IMPORT_QUERIES[table], records, prepare)
+            return inserted, errors
+        except Exception as e:
+            print(f"Erro ao importar bloco para a tabela {table}: {e}")
+            return None
+
+    def update_transaction(self, month_year: str, transaction_id: str, new_data: dict):
+        try:
+            with_numeric_keys(new_data)
+        except ValueError as e:
+            print(f"Erro ao atualizar transação {transaction_id}: {e}")
+            return False
         set_clause = ", ".join([f"{key} = :{key}" for key in new_data.keys()])
         query = f"UPDATE Transacoes SET {set_clause} WHERE ID = :ID;"
         
         new_data['ID'] = str(transaction_id)
         
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Transacoes') as conn:
                 conn.execute(query, new_data)
             return True
         except Exception as e:
@@ -162,7 +1076,7 @@ class CoreManager:
     def delete_transaction(self, month_year: str, transaction_id: str):
         query = "DELETE FROM Transacoes WHERE ID = ?;"
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Transacoes') as conn:
                 conn.execute(query, (str(transaction_id),))
             return True
         except Exception as e:
@@ -171,11 +1085,11 @@ class CoreManager:
 
 
     def get_categories(self):
+        import pandas as pd
         query = "SELECT Categoria FROM Categorias;"
         try:
-            with self._create_connection() as conn:
-                df = pd.read_sql_query(query, conn)
-                return df
+            return self._cached_read('categorias', (), ('Categorias',),
+                                     lambda conn: pd.read_sql_query(query, conn))
         except Exception as e:
             print(f"Erro ao buscar categorias: {e}")
             return pd.DataFrame(columns=['Categoria'])
@@ -183,7 +1097,7 @@ class CoreManager:
     def add_category(self, category_name: str):
         query = "INSERT INTO Categorias (Categoria) VALUES (?);"
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Categorias') as conn:
                 conn.execute(query, (category_name,))
             return True
         except Exception as e: 
@@ -193,7 +1107,7 @@ class CoreManager:
     def remove_category(self, category_name: str):
         query = "DELETE FROM Categorias WHERE Categoria = ?;"
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Categorias') as conn:
                 conn.execute(query, (category_name,))
             return True
         except Exception as e:
@@ -202,12 +1116,15 @@ class CoreManager:
 
 
 
-    def get_budgets(self):
-        query = "SELECT MesAno, Categoria, Limite FROM Orcamentos;"
+    def get_budgets(self, month_year: str = None):
+        """Retorna os orçamentos (de todos os meses ou apenas de 'month_year')."""
+        import pandas as pd
+        def load(conn):
+            if month_year:
+                return pd.read_sql_query(MONTHLY_BUDGETS_QUERY, conn, params=(month_year,))
+            return pd.read_sql_query("SELECT MesAno, Categoria, Limite FROM Orcamentos;", conn)
         try:
-            with self._create_connection() as conn:
-                df = pd.read_sql_query(query, conn)
-                return df
+            return self._cached_read('orcamentos', (month_year,), ('Orcamentos',), load)
         except Exception as e:
             print(f"Erro ao buscar orçamentos: {e}")
             return pd.DataFrame(columns=['MesAno', 'Categoria', 'Limite'])
@@ -220,7 +1137,7 @@ class CoreManager:
         ON CONFLICT(MesAno, Categoria) DO UPDATE SET Limite = excluded.Limite;
         """
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Orcamentos') as conn:
                 conn.execute(query, (month_year, category, limit))
             return True
         except Exception as e:
@@ -228,16 +1145,22 @@ class CoreManager:
             return False
 
     def get_loans(self):
+        import pandas as pd
         query = 'SELECT ID, Tipo, ParteEnvolvida, ValorOriginal, "Juros%", NumParcelas, ParcelasPagas, Status FROM Emprestimos;'
+        def load(conn):
+            df = pd.read_sql_query(query, conn)
+            df['ID'] = df['ID'].astype(str)
+            return df
         try:
-            with self._create_connection() as conn:
-                df = pd.read_sql_query(query, conn)
-                df['ID'] = df['ID'].astype(str) 
-                return df
+            return self._cached_read('emprestimos', (), ('Emprestimos',), load)
         except Exception as e:
             print(f"Erro ao buscar empréstimos: {e}")
             return pd.DataFrame(columns=['ID', 'Tipo', 'ParteEnvolvida', 'ValorOriginal', 'Juros%', 'NumParcelas', 'ParcelasPagas', 'Status'])
 
+    def get_loan(self, loan_id: str):
+        """Retorna o empréstimo com o ID indicado (dicionário, com a chave 'Juros%') ou None."""
+        return self._get_by_id(LOAN_BY_ID_QUERY, loan_id, "empréstimo")
+
     def add_loan(self, data: dict):
         query = """
         INSERT INTO Emprestimos (ID, Tipo, ParteEnvolvida, ValorOriginal, "Juros%", NumParcelas, ParcelasPagas, Status)
@@ -245,7 +1168,7 @@ class CoreManager:
         """
         data['Juros'] = data.pop('Juros%', 0.0) 
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Emprestimos') as conn:
                 conn.execute(query, data)
             return True
         except Exception as e:
@@ -261,7 +1184,7 @@ class CoreManager:
         new_data['ID'] = str(loan_id)
         
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Emprestimos') as conn:
                 conn.execute(query, new_data)
             return True
         except Exception as e:
@@ -270,27 +1193,161 @@ class CoreManager:
 
 
     def get_debts(self):
+        import pandas as pd
         query = "SELECT ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria FROM Dividas;"
+        def load(conn):
+            df = pd.read_sql_query(query, conn)
+            df['ID'] = df['ID'].astype(str)
+            return df
         try:
-            with self._create_connection() as conn:
-                df = pd.read_sql_query(query, conn)
-                df['ID'] = df['ID'].astype(str)
-                return df
+            return self._cached_read('dividas', (), ('Dividas',), load)
         except Exception as e:
             print(f"Erro ao buscar dívidas: {e}")
             return pd.DataFrame(columns=['ID', 'Descricao', 'Valor', 'DataVencimento', 'Status', 'Recorrencia', 'RecorrenciaMeses', 'Categoria'])
 
+    def get_debt(self, debt_id: str):
+        """Retorna a dívida com o ID indicado (dicionário) ou None."""
+        return self._get_by_id(DEBT_BY_ID_QUERY, debt_id, "dívida")
+
+    def get_debts_by_ids(self, debt_ids):
+        """Retorna {ID: dicionário} das linhas de Dividas com os IDs indicados (IDs inexistentes são omitidos)."""
+        debt_ids = [str(debt_id) for debt_id in dict.fromkeys(debt_ids)]
+        debts = {}
+        try:
+            conn = self._create_connection()
+            for start in range(0, len(debt_ids), MAX_IN_PARAMS):
+                chunk = debt_ids[start:start + MAX_IN_PARAMS]
+                query = DEBT_BY_ID_QUERY.replace("ID = ?", f"ID IN ({', '.join('?' * len(chunk))})")
+                debts.update((row['ID'], dict(row)) for row in conn.execute(query, chunk).fetchall())
+            return debts
+        except Exception as e:
+            print(f"Erro ao buscar dívidas por ID: {e}")
+            return None
+
+    def update_debts_bulk(self, debt_ids: list, new_data: dict, new_rows: list = ()):
+        """
+        Aplica as mesmas alterações (colunas de DEBT_BULK_UPDATE_COLUMNS) a várias dívidas
+        com executemany, num único commit. 'new_rows' são ocorrências de dívidas recorrentes
+        a gravar em Dividas antes da alteração (com RegraID e DataOcorrencia).
+        Retorna True, ou False se o lote falhar (nada é gravado).
+        """
+        invalid = [key for key in new_data if key not in DEBT_BULK_UPDATE_COLUMNS]
+        if invalid:
+            print(f"Colunas não permitidas na alteração em lote de dívidas: {', '.join(invalid)}.")
+            return False
+        set_clause = ", ".join([f"{key} = :{key}" for key in new_data])
+        query = f"UPDATE Dividas SET {set_clause} WHERE ID = :ID;"
+        try:
+            with self.transaction('Dividas') as conn:
+                conn.executemany(DEBT_INSERT_QUERY, new_rows)
+                conn.executemany(query, [dict(new_data, ID=str(debt_id)) for debt_id in debt_ids])
+            return True
+        except Exception as e:
+            print(f"Erro ao atualizar lote de dívidas: {e}")
+            return False
+
+    def pay_debts_bulk(self, debt_ids: list, transactions: list, new_rows: list = ()):
+        """
+        Marca várias dívidas como 'Pago' e insere os lançamentos de pagamento
+        ('transactions', na mesma ordem), tudo num único commit.
+        'new_rows' (ocorrências de dívidas recorrentes) são gravadas em Dividas antes, e as
+        categorias dos lançamentos que ainda não existirem são criadas.
+        O status é mudado dívida a dívida com um UPDATE condicional dentro do BEGIN IMMEDIATE:
+        só as dívidas que ainda não estavam pagas recebem o lançamento, para que dois pedidos
+        simultâneos não registem o mesmo pagamento duas vezes.
+        Retorna uma lista alinhada com 'debt_ids' com o ID do lançamento criado (ou None se a
+        dívida já estava paga), ou None se o lote falhar (nada é gravado).
+        """
+        try:
+            records = [with_numeric_keys(dict(transaction, ID=str(uuid.uuid4()))) for transaction in transactions]
+            with self.transaction('Dividas', 'Transacoes', 'Categorias') as conn:
+                conn.executemany(DEBT_OCCURRENCE_INSERT_QUERY, new_rows)
+                paid = [conn.execute(PAY_DEBT_QUERY, (str(debt_id),)).rowcount == 1 for debt_id in debt_ids]
+                records = [record if flipped else None for record, flipped in zip(records, paid)]
+                to_insert = [record for record in records if record is not None]
+                categories = {record['Categoria'] for record in to_insert}
+                conn.executemany("INSERT OR IGNORE INTO Categorias (Categoria) VALUES (?);", [(c,) for c in categories])
+                conn.executemany(TRANSACTION_INSERT_QUERY, to_insert)
+            print(f"Lote de pagamentos gravado: {len(to_insert)} dívida(s) paga(s).")
+            return [record['ID'] if record is not None else None for record in records]
+        except Exception as e:
+            print(f"Erro ao pagar lote de dívidas: {e}")
+            return None
+
+    def mark_overdue_debts(self, today: str):
+        """
+        Marca como 'Atrasado' as dívidas em aberto com vencimento anterior a 'today' (YYYY-MM-DD).
+        Retorna o número de dívidas atualizadas, ou None em caso de erro.
+        """
+        try:
+            with self.transaction('Dividas') as conn:
+                return conn.execute(OVERDUE_DEBTS_SWEEP_QUERY, {'hoje': today}).rowcount
+        except Exception as e:
+            print(f"Erro ao marcar dívidas atrasadas: {e}")
+            return None
+
+    def list_debts(self, start_date: str = None, end_date: str = None, status: str = None, category: str = None):
+        """
+        Retorna um DataFrame com as dívidas (linhas de Dividas) ordenadas pelo vencimento.
+        start_date/end_date (YYYY-MM-DD, inclusive), status (sem diferenciar maiúsculas)
+        e category são opcionais; só os filtros indicados entram na consulta.
+        """
+        import pandas as pd
+        values = {'inicio': start_date, 'fim': end_date, 'status': status, 'categoria': category}
+        params = {name: value for name, value in values.items() if value is not None}
+        query = build_debt_listing_query(list(params))
+        def load(conn):
+            df = pd.read_sql_query(query, conn, params=params)
+            df['ID'] = df['ID'].astype(str)
+            return df
+        try:
+            return self._cached_read('listagem_de_dividas', tuple(sorted(params.items())), ('Dividas',), load)
+        except Exception as e:
+            print(f"Erro ao listar dívidas: {e}")
+            return pd.DataFrame(columns=['ID', 'Descricao', 'Valor', 'DataVencimento', 'Status', 'Recorrencia', 'RecorrenciaMeses', 'Categoria'])
+
+    def get_debt_aging_totals(self, today: date):
+        """
+        Agrega as dívidas não pagas (linhas de Dividas) por faixa de antiguidade e categoria.
+        Retorna {(faixa, categoria): (quantidade, total_em_centavos)}, ou None em caso de erro.
+        O resultado fica em cache até à próxima escrita em Dividas.
+        """
+        bounds = debt_aging_bounds(today)
+        def load(conn):
+            return {
+                (row['Faixa'], row['Categoria']): (row['Quantidade'], row['TotalCentavos'])
+                for row in conn.execute(DEBT_AGING_QUERY, bounds).fetchall()
+            }
+        try:
+            return self._cached_read('antiguidade_das_dividas', (bounds['hoje'],), ('Dividas',), load)
+        except Exception as e:
+            print(f"Erro ao calcular a antiguidade das dívidas: {e}")
+            return None
+
+    def get_upcoming_debts(self, until_date: str):
+        """Retorna um DataFrame com as dívidas não pagas que vencem até 'until_date' (YYYY-MM-DD), inclusive."""
+        import pandas as pd
+        def load(conn):
+            df = pd.read_sql_query(UPCOMING_DEBTS_QUERY, conn, params={'limite': until_date})
+            df['ID'] = df['ID'].astype(str)
+            return df
+        try:
+            return self._cached_read('dividas_a_vencer', (until_date,), ('Dividas',), load)
+        except Exception as e:
+            print(f"Erro ao buscar dívidas a vencer: {e}")
+            return pd.DataFrame(columns=['ID', 'Descricao', 'Valor', 'DataVencimento', 'Status', 'Recorrencia', 'RecorrenciaMeses', 'Categoria'])
+
     def add_debt(self, data: dict):
         if 'ID' not in data:
             data['ID'] = str(uuid.uuid4())
             
-        query = """
-        INSERT INTO Dividas (ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria)
-        VALUES (:ID, :Descricao, :Valor, :DataVencimento, :Status, :Recorrencia, :RecorrenciaMeses, :Categoria);
-        """
+        # RegraID/DataOcorrencia só existem nas ocorrências materializadas de uma regra
+        data.setdefault('RegraID', None)
+        data.setdefault('DataOcorrencia', None)
+
         try:
-            with self._create_connection() as conn:
-                conn.execute(query, data)
+            with self.transaction('Dividas') as conn:
+                conn.execute(DEBT_INSERT_QUERY, data)
             return True
         except Exception as e:
             print(f"Erro ao adicionar dívida: {e}")
@@ -302,7 +1359,7 @@ class CoreManager:
         new_data['ID'] = str(debt_id)
         
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Dividas') as conn:
                 conn.execute(query, new_data)
             return True
         except Exception as e:
@@ -312,7 +1369,7 @@ class CoreManager:
     def delete_debt(self, debt_id: str):
         query = "DELETE FROM Dividas WHERE ID = ?;"
         try:
-            with self._create_connection() as conn:
+            with self.transaction('Dividas') as conn:
                 conn.execute(query, (str(debt_id),))
             return True
         except Exception as e:
@@ -320,7 +1377,75 @@ class CoreManager:
             return False
 
     
+    def get_debt_rule(self, rule_id: str):
+        """Retorna a regra de dívida recorrente com o ID indicado (dicionário) ou None."""
+        return self._get_by_id(DEBT_RULE_BY_ID_QUERY, rule_id, "regra de recorrência")
+
+    def get_debt_rules(self, start_date: str = None, end_date: str = None):
+        """
+        Retorna as regras de dívidas recorrentes com ocorrências entre start_date e
+        end_date (YYYY-MM-DD, inclusive; None = sem limite). Cada regra traz em
+        'Ignorar' as datas de ocorrência do período que não devem ser geradas
+        (já materializadas em Dividas ou excluídas). Retorna None em caso de erro.
+        """
+        params = {'inicio': start_date or '0000-01-01', 'fim': end_date or '9999-12-31'}
+        def load(conn):
+            skipped = {}
+            for rule_id, occurrence in conn.execute(DEBT_RULES_SKIPPED_DATES_QUERY, params).fetchall():
+                skipped.setdefault(rule_id, set()).add(occurrence)
+            rules = []
+            for row in conn.execute(DEBT_RULES_IN_PERIOD_QUERY, params).fetchall():
+                rule = dict(row)
+                rule['Ignorar'] = frozenset(skipped.get(rule['ID'], ()))
+                rules.append(rule)
+            return rules
+        try:
+            return self._cached_read('regras_de_dividas', (params['inicio'], params['fim']),
+                                     ('RecorrenciasDividas', 'Dividas'), load)
+        except Exception as e:
+            print(f"Erro ao buscar regras de dívidas recorrentes: {e}")
+            return None
+
+    def add_debt_rule(self, data: dict):
+        """Grava uma regra de dívida recorrente (colunas de RecorrenciasDividas)."""
+        if 'ID' not in data:
+            data['ID'] = str(uuid.uuid4())
+        query = """
+        INSERT INTO RecorrenciasDividas (ID, Descricao, Valor, Categoria, Status, Frequencia, DataInicio, NumOcorrencias, DataFim)
+        VALUES (:ID, :Descricao, :Valor, :Categoria, :Status, :Frequencia, :DataInicio, :NumOcorrencias, :DataFim);
+        """
+        try:
+            with self.transaction('RecorrenciasDividas') as conn:
+                conn.execute(query, data)
+            return True
+        except Exception as e:
+            print(f"Erro ao adicionar regra de dívida recorrente: {e}")
+            return False
+
+    def add_debt_rule_exception(self, rule_id: str, occurrence_date: str):
+        """Impede que a ocorrência de 'occurrence_date' (YYYY-MM-DD) da regra volte a ser gerada."""
+        query = "INSERT OR IGNORE INTO ExcecoesRecorrencias (RegraID, DataOcorrencia) VALUES (?, ?);"
+        try:
+            with self.transaction('RecorrenciasDividas') as conn:
+                conn.execute(query, (str(rule_id), occurrence_date))
+            return True
+        except Exception as e:
+            print(f"Erro ao excluir ocorrência {occurrence_date} da regra {rule_id}: {e}")
+            return False
+
+    def delete_debt_rule(self, rule_id: str):
+        """Exclui uma regra e as suas exceções. As ocorrências já materializadas (pagas/editadas) são mantidas."""
+        try:
+            with self.transaction('RecorrenciasDividas') as conn:
+                conn.execute("DELETE FROM ExcecoesRecorrencias WHERE RegraID = ?;", (str(rule_id),))
+                conn.execute("DELETE FROM RecorrenciasDividas WHERE ID = ?;", (str(rule_id),))
+            return True
+        except Exception as e:
+            print(f"Erro ao excluir regra de dívida recorrente {rule_id}: {e}")
+            return False
+
     def load_data(self, sheet_name):
+        import pandas as pd
         print(f"Aviso: load_data('{sheet_name}') chamado (método antigo). Redirecionando...")
         if sheet_name == DEFAULT_CATEGORIES_SHEET:
             return self.get_categories()
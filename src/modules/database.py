@@ -0,0 +1,178 @@
+# src/modules/database.py
+
+import os
+import sqlite3
+import threading
+import time
+
+HEALTH_CHECK_INTERVAL = 30.0 # segundos entre verificações de uma conexão ociosa
+
+# Perfis de desempenho aplicados a cada conexão nova.
+# 'compat' reproduz os padrões do SQLite (journal em modo DELETE, fsync a cada commit).
+# 'balanced' usa WAL, permitindo leitores concorrentes enquanto um escritor faz commit.
+# 'fast' aumenta cache e mmap para bases maiores; com WAL + NORMAL um commit
+# pode ser perdido numa queda de energia, mas a base nunca fica corrompida.
+PERFORMANCE_PROFILES = {
+    'compat': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+DEFAULT_PROFILE = 'balanced'
+PROFILE_ENV_VAR = 'FINANCAS_DB_PROFILE'
+
+
+def get_profile_name():
+    """Retorna o nome do perfil configurado na variável de ambiente (ou o padrão)."""
+    name = os.environ.get(PROFILE_ENV_VAR, DEFAULT_PROFILE).strip().lower()
+    if name not in PERFORMANCE_PROFILES:
+        print(f"Aviso: perfil de banco de dados '{name}' desconhecido. Usando '{DEFAULT_PROFILE}'.")
+        return DEFAULT_PROFILE
+    return name
+
+
+def apply_profile(conn, profile_name: str):
+    """Aplica os PRAGMAs de um perfil de desempenho a uma conexão."""
+    profile = PERFORMANCE_PROFILES[profile_name]
+    conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])};")
+    conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']};")
+    conn.execute(f"PRAGMA synchronous = {profile['synchronous']};")
+    conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])};")
+    conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])};")
+    conn.execute(f"PRAGMA temp_store = {profile['temp_store']};")
+
+
+class ConnectionPool:
+    """
+    Mantém uma conexão SQLite persistente por thread.
+
+    Cada thread (a thread da UI ou as threads de trabalho do servidor da API)
+    reutiliza sempre a mesma conexão, evitando abrir um novo ficheiro a cada
+    operação. Conexões ociosas há mais de HEALTH_CHECK_INTERVAL segundos são
+    verificadas com 'SELECT 1' antes de serem reutilizadas e recriadas se
+    estiverem inválidas.
+    """
+
+    def __init__(self, db_file: str, profile_name: str = None):
+        self.db_file = db_file
+        self.profile_name = profile_name or get_profile_name()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {} # thread -> conexão
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        apply_profile(conn, self.profile_name)
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _register(self, conn):
+        current = threading.current_thread()
+        with self._lock:
+            # Descarta conexões de threads que já terminaram
+            for thread in [t for t in self._connections if not t.is_alive()]:
+                self._close_quietly(self._connections.pop(thread))
+            self._connections[current] = conn
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self):
+        """Retorna a conexão da thread atual, criando-a se necessário."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("O pool de conexões já foi encerrado.")
+
+        conn = getattr(self._local, 'conn', None)
+        now = time.monotonic()
+
+        if conn is not None and now - self._local.last_check > HEALTH_CHECK_INTERVAL:
+            if not self._is_healthy(conn):
+                print("Aviso: conexão inválida detectada no pool. Reconectando...")
+                self._close_quietly(conn)
+                conn = None
+            self._local.last_check = now
+
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.last_check = now
+            self._register(conn)
+        return conn
+
+    def close_all(self):
+        """Fecha todas as conexões abertas pelo pool (usado no encerramento)."""
+        with self._lock:
+            self._closed = True
+            for conn in self._connections.values():
+                self._close_quietly(conn)
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def benchmark_profiles(num_rows: int = 5000, num_reads: int = 500):
+    """
+    Mede a taxa de inserções e leituras de cada perfil numa base temporária.
+    As inserções usam um commit por linha (como o caminho normal da aplicação).
+    Executar com: python -m src.modules.database
+    """
+    import tempfile
+
+    results = {}
+    for profile_name in PERFORMANCE_PROFILES:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pool = ConnectionPool(os.path.join(tmp_dir, 'benchmark.db'), profile_name)
+            conn = pool.acquire()
+            conn.execute("CREATE TABLE Transacoes (ID INTEGER PRIMARY KEY, MesAno TEXT, Valor REAL);")
+
+            start = time.perf_counter()
+            for i in range(num_rows):
+                conn.execute("INSERT INTO Transacoes (MesAno, Valor) VALUES (?, ?);", (f"{i % 12 + 1:02d}-2025", float(i)))
+            insert_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(num_reads):
+                conn.execute("SELECT SUM(Valor) FROM Transacoes WHERE MesAno = ?;", (f"{i % 12 + 1:02d}-2025",)).fetchone()
+            read_elapsed = time.perf_counter() - start
+
+            pool.close_all()
+        results[profile_name] = {
+            'insercoes_por_segundo': num_rows / insert_elapsed,
+            'leituras_por_segundo': num_reads / read_elapsed,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for name, result in benchmark_profiles().items():
+        print(f"{name:>10}: {result['insercoes_por_segundo']:>10.0f} inserções/s | {result['leituras_por_segundo']:>10.0f} leituras/s")
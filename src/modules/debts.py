@@ -1,28 +1,38 @@
 # src/modules/debts.py
 
-import pandas as pd
-from datetime import datetime, timedelta
-from .core import CoreManager, DEFAULT_DEBTS_SHEET # Importar DEFAULT_DEBTS_SHEET
+from datetime import date, datetime, timedelta
+from .core import (CoreManager, DEFAULT_DEBTS_SHEET, DEBT_AGING_BUCKETS, debt_aging_bounds, debt_aging_bucket,
+                   to_cents)
 from .monthly_control import MonthlyControlManager # Importar para lançar pagamentos e recorrências
+from .recurrence import (RECURRENCE_FREQUENCIES, expand_rule, last_occurrence, normalize_recurrence,
+                         parse_occurrence_id)
+
+DEBT_COLUMNS = ['ID', 'Descricao', 'Valor', 'DataVencimento', 'Status', 'Recorrencia', 'RecorrenciaMeses', 'Categoria']
 
 class DebtManager:
     def __init__(self, core_manager: CoreManager, monthly_control_manager: MonthlyControlManager): 
         self.core = core_manager
         self.monthly_control = monthly_control_manager 
+        self._last_overdue_sweep = None # (data, versão de Dividas) após a última varredura de dívidas atrasadas
 
     def add_debt(self, description: str, value: float, due_date: str, status: str, recurrence: str, recurrence_months: int, category: str): 
         """
         Adiciona uma nova dívida futura/boleto.
         Se for recorrente, gera as entradas para os próximos meses.
         recurrence_months: Número de meses para gerar a recorrência (se 'Mensal' ou 'Anual').
+        recurrence: 'Unica', 'Mensal' ou 'Anual' (sem distinguir maiúsculas nem o acento de 'Única').
         """
         if not all([description, value is not None, due_date, status, recurrence, category]):
             print("Dados incompletos para adicionar dívida.")
             return False
+        if normalize_recurrence(recurrence) is None:
+            print(f"Recorrência inválida: '{recurrence}'. Use Unica, Mensal ou Anual.")
+            return False
+        recurrence = normalize_recurrence(recurrence)
         if not isinstance(value, (int, float)) or value <= 0:
             print("Valor inválido para dívida.")
             return False
-        if recurrence in ["Mensal", "Anual"] and (not isinstance(recurrence_months, int) or recurrence_months <= 0):
+        if recurrence in RECURRENCE_FREQUENCIES and (not isinstance(recurrence_months, int) or recurrence_months <= 0):
             print("Número de meses para recorrência inválido.")
             return False
 
@@ -42,32 +52,22 @@ class DebtManager:
             }
             if self.core.add_debt(data):
                 generated_count += 1
-        else: # Recorrência Mensal ou Anual
-            for i in range(recurrence_months):
-                new_due_date = current_due_date
-                if recurrence == "Mensal":
-                    # Adiciona 'i' meses à data de vencimento
-                    year = current_due_date.year + (current_due_date.month + i -1) // 12
-                    month = (current_due_date.month + i -1) % 12 + 1
-                    day = min(current_due_date.day, self._days_in_month(year, month))
-                    new_due_date = datetime(year, month, day).date()
-                elif recurrence == "Anual":
-                    new_due_date = datetime(current_due_date.year + i, current_due_date.month, current_due_date.day).date()
-                
-                data = {
-                    'Descricao': description,
-                    'Valor': float(value),
-                    'DataVencimento': new_due_date.strftime("%Y-%m-%d"),
-                    'Status': status, 
-                    'Recorrencia': recurrence,
-                    'RecorrenciaMeses': recurrence_months, 
-                    'Categoria': category
-                }
-                if self.core.add_debt(data):
-                    generated_count += 1
-                else:
-                    print(f"Falha ao adicionar recorrência {i+1} de dívida.")
-                    return False 
+        else: # Recorrência Mensal ou Anual: uma regra, expandida ao consultar (ver recurrence.py)
+            rule = {
+                'Descricao': description,
+                'Valor': float(value),
+                'Categoria': category,
+                'Status': status,
+                'Frequencia': recurrence,
+                'DataInicio': current_due_date.strftime("%Y-%m-%d"),
+                'NumOcorrencias': recurrence_months,
+                'DataFim': last_occurrence(recurrence, current_due_date, recurrence_months).strftime("%Y-%m-%d"),
+            }
+            if self.core.add_debt_rule(rule):
+                generated_count += recurrence_months
+            else:
+                print("Falha ao adicionar a regra de recorrência da dívida.")
+                return False
         return generated_count > 0 
 
     def _days_in_month(self, year, month):
@@ -80,105 +80,371 @@ class DebtManager:
             return 30
         return 31
 
-    def get_all_debts(self, month_year_filter: str = None): 
+    def _expanded_debts(self, start_date: str = None, end_date: str = None, status: str = None, category: str = None):
         """
-        Retorna todas as dívidas futuras.
-        Se month_year_filter for fornecido (MM-YYYY), filtra por esse mês/ano.
+        Gera as ocorrências virtuais (ainda não pagas nem editadas) das dívidas
+        recorrentes com vencimento entre start_date e end_date (YYYY-MM-DD, inclusive),
+        opcionalmente apenas as de um status ou de uma categoria.
         """
-        df = self.core.get_debts()
-        if df.empty:
-            return pd.DataFrame(columns=['ID', 'Descricao', 'Valor', 'DataVencimento', 'Status', 'Recorrencia', 'RecorrenciaMeses', 'Categoria'])
+        today = datetime.now().date()
+        for rule in self.core.get_debt_rules(start_date, end_date) or []:
+            if category is not None and rule['Categoria'] != category:
+                continue
+            for occurrence in expand_rule(rule, start_date, end_date, rule['Ignorar'], today):
+                if status is None or str(occurrence['Status']).lower() == status.lower():
+                    yield occurrence
 
-        if 'DataVencimento' in df.columns:
-            df['DataVencimento'] = pd.to_datetime(df['DataVencimento'], errors='coerce').dt.date
-            df = df.dropna(subset=['DataVencimento'])
-        else: 
-            df['DataVencimento'] = None
+    def _with_occurrences(self, df, start_date: str = None, end_date: str = None, status: str = None, category: str = None):
+        """Junta as ocorrências virtuais do período ao DataFrame de dívidas e converte DataVencimento em date."""
+        import pandas as pd
+        occurrences = pd.DataFrame(list(self._expanded_debts(start_date, end_date, status, category)), columns=DEBT_COLUMNS)
+        frames = [frame for frame in (df, occurrences) if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=DEBT_COLUMNS)
+        # Novo DataFrame: o DataFrame em cache não pode ser alterado
+        df = pd.concat(frames, ignore_index=True)[DEBT_COLUMNS]
+        df['DataVencimento'] = pd.to_datetime(df['DataVencimento'], errors='coerce').dt.date
+        return df.dropna(subset=['DataVencimento'])
 
+    def get_all_debts(self, month_year_filter: str = None, start_date=None, end_date=None,
+                      status: str = None, category: str = None):
+        """
+        Retorna as dívidas futuras, incluindo as ocorrências das dívidas recorrentes,
+        ordenadas pelo vencimento. Todos os filtros são opcionais e aplicados no SQL:
+        month_year_filter (MM-YYYY), start_date/end_date (YYYY-MM-DD ou date, inclusive),
+        status e category. Com mês e datas, vale a interseção dos dois períodos.
+        """
+        start_date = start_date.strftime("%Y-%m-%d") if isinstance(start_date, date) else start_date
+        end_date = end_date.strftime("%Y-%m-%d") if isinstance(end_date, date) else end_date
         if month_year_filter:
             filter_month = int(month_year_filter[:2])
             filter_year = int(month_year_filter[3:])
-            
-            df = df[
-                (df['DataVencimento'].apply(lambda x: x.month == filter_month if x else False)) &
-                (df['DataVencimento'].apply(lambda x: x.year == filter_year if x else False))
-            ]
-        
-        expected_cols = ['ID', 'Descricao', 'Valor', 'DataVencimento', 'Status', 'Recorrencia', 'RecorrenciaMeses', 'Categoria']
-        for col in expected_cols:
-            if col not in df.columns:
-                df[col] = None 
-        
-        return df
+            month_start = date(filter_year, filter_month, 1).strftime("%Y-%m-%d")
+            month_end = (date(filter_year + filter_month // 12, filter_month % 12 + 1, 1) - timedelta(days=1)).strftime("%Y-%m-%d")
+            start_date = max(start_date, month_start) if start_date else month_start
+            end_date = min(end_date, month_end) if end_date else month_end
+
+        debts_df = self.core.list_debts(start_date, end_date, status, category)
+        return self._with_occurrences(debts_df, start_date, end_date, status, category).sort_values(by='DataVencimento', kind='stable')
+
+    def _materialize(self, debt: dict):
+        """Grava em Dividas uma ocorrência virtual (ID '<regra>:<data>'), para poder ser paga ou editada."""
+        return self.core.add_debt(self._occurrence_row(debt))
 
     def update_debt(self, debt_id: str, new_data: dict):
-        """Atualiza uma dívida futura existente."""
-        if 'DataVencimento' in new_data and isinstance(new_data['DataVencimento'], datetime.date):
+        """Atualiza uma dívida futura existente (ocorrências virtuais são gravadas em Dividas antes)."""
+        if 'DataVencimento' in new_data and isinstance(new_data['DataVencimento'], date):
             new_data['DataVencimento'] = new_data['DataVencimento'].strftime("%Y-%m-%d")
-        return self.core.update_debt(debt_id, new_data)
+        if self.core.get_debt(debt_id) is not None:
+            return self.core.update_debt(debt_id, new_data)
+
+        debt = self.get_debt(debt_id)
+        if debt is None:
+            print(f"Erro: Dívida com ID '{debt_id}' não encontrada.")
+            return False
+        try:
+            with self.core.transaction():
+                if not (self._materialize(debt) and self.core.update_debt(debt_id, new_data)):
+                    raise RuntimeError("falha ao gravar a ocorrência")
+        except Exception as e:
+            print(f"Erro ao atualizar a ocorrência '{debt_id}': {e}")
+            return False
+        return True
+
+    def get_debt(self, debt_id: str):
+        """
+        Retorna uma dívida pelo ID (dicionário) ou None se não existir.
+        Aceita também IDs de ocorrências virtuais de dívidas recorrentes ('<regra>:<data>').
+        """
+        debt = self.core.get_debt(debt_id)
+        if debt is not None:
+            return debt
+        parsed = parse_occurrence_id(debt_id)
+        if parsed is None:
+            return None
+        occurrence = parsed[1].strftime("%Y-%m-%d")
+        for candidate in self._expanded_debts(occurrence, occurrence):
+            if candidate['ID'] == debt_id:
+                return candidate
+        return None
 
     def delete_debt(self, debt_id: str):
-        """Exclui uma dívida futura."""
-        return self.core.delete_debt(debt_id)
+        """
+        Exclui uma dívida futura. Para uma ocorrência de dívida recorrente, regista
+        também uma exceção na regra, para que a ocorrência não volte a ser gerada.
+        """
+        parsed = parse_occurrence_id(debt_id)
+        if parsed is None or self.core.get_debt_rule(parsed[0]) is None:
+            return self.core.delete_debt(debt_id)
+        try:
+            with self.core.transaction():
+                if not (self.core.delete_debt(debt_id)
+                        and self.core.add_debt_rule_exception(parsed[0], parsed[1].strftime("%Y-%m-%d"))):
+                    raise RuntimeError("falha ao excluir a ocorrência")
+        except Exception as e:
+            print(f"Erro ao excluir a ocorrência '{debt_id}': {e}")
+            return False
+        return True
+
+    def delete_debt_series(self, rule_id: str):
+        """Exclui uma dívida recorrente (a regra); as ocorrências já pagas ou editadas são mantidas."""
+        return self.core.delete_debt_rule(rule_id)
 
     def mark_debt_as_paid(self, debt_id: str, current_month_year_for_transaction: str):
         """
         Marca uma dívida como 'Pago' e gera um lançamento de despesa no gerenciamento mensal.
         current_month_year_for_transaction: Mês/Ano atual da GUI para registrar o pagamento.
         """
-        success_update_debt = self.update_debt(debt_id, {'Status': 'Pago'})
-
-        if success_update_debt:
-            debt_details = self.get_all_debts().loc[self.get_all_debts()['ID'].astype(str) == debt_id].iloc[0]
-            
-            transaction_date = datetime.now().strftime("%Y-%m-%d") 
-            description = f"Pagamento Dívida: {debt_details['Descricao']}"
-            category = debt_details['Categoria']
-            value = debt_details['Valor']
-
-            if category not in self.monthly_control.core.get_categories()['Categoria'].tolist():
-                self.monthly_control.core.add_category(category)
-
-            # Lança o pagamento como uma despesa no gerenciamento mensal
-            success_monthly_transaction = self.monthly_control.add_transaction(
-                current_month_year_for_transaction, 
-                transaction_date,
-                'Despesa',
-                description,
-                category,
-                value,
-                'Conta' # Pagamentos de dívidas geralmente saem da conta
-            )
-            return success_monthly_transaction
-        return False
+        debt_details = self.get_debt(debt_id)
+        if debt_details is None:
+            print(f"Erro: Dívida com ID '{debt_id}' não encontrada.")
+            return False
+
+        transaction_date = datetime.now().strftime("%Y-%m-%d")
+        description = f"Pagamento Dívida: {debt_details['Descricao']}"
+        category = debt_details['Categoria']
+        value = debt_details['Valor']
+
+        # Status da dívida e lançamento do pagamento num único commit (tudo ou nada)
+        try:
+            with self.core.transaction():
+                if not self.update_debt(debt_id, {'Status': 'Pago'}):
+                    raise RuntimeError("falha ao atualizar o status da dívida")
+
+                if category not in self.core.get_categories()['Categoria'].tolist():
+                    self.core.add_category(category)
+
+                # Lança o pagamento como uma despesa no gerenciamento mensal
+                if not self.monthly_control.add_transaction(
+                    current_month_year_for_transaction,
+                    transaction_date,
+                    'Despesa',
+                    description,
+                    category,
+                    value,
+                    'Conta' # Pagamentos de dívidas geralmente saem da conta
+                ):
+                    raise RuntimeError("falha ao registrar o lançamento do pagamento")
+        except Exception as e:
+            print(f"Pagamento da dívida '{debt_id}' cancelado ({e}). Nenhuma alteração foi gravada.")
+            return False
+        return True
+
+    def _resolve_debts(self, debt_ids: list):
+        """
+        Busca várias dívidas de uma vez: as gravadas em Dividas com uma consulta por lote
+        e as ocorrências virtuais com uma única expansão das regras no período que as cobre.
+        Retorna ({ID: dicionário}, linhas de Dividas a gravar para as ocorrências virtuais
+        encontradas); IDs inexistentes são omitidos. Retorna (None, None) em caso de erro.
+        """
+        debts = self.core.get_debts_by_ids(debt_ids)
+        if debts is None:
+            return None, None
+        wanted = {debt_id for debt_id in debt_ids if debt_id not in debts and parse_occurrence_id(debt_id)}
+        new_rows = {}
+        if wanted:
+            occurrences = [parse_occurrence_id(debt_id)[1].strftime("%Y-%m-%d") for debt_id in wanted]
+            for debt in self._expanded_debts(min(occurrences), max(occurrences)):
+                if debt['ID'] in wanted:
+                    debts[debt['ID']] = debt
+                    new_rows[debt['ID']] = self._occurrence_row(debt)
+        return debts, new_rows
+
+    def _occurrence_row(self, debt: dict):
+        """Linha de Dividas (com RegraID e DataOcorrencia) de uma ocorrência virtual de dívida recorrente."""
+        parsed = parse_occurrence_id(debt['ID'])
+        row = {column: debt[column] for column in DEBT_COLUMNS}
+        row['RegraID'] = parsed[0]
+        row['DataOcorrencia'] = parsed[1].strftime("%Y-%m-%d")
+        return row
+
+    def mark_debts_as_paid(self, debt_ids: list, current_month_year_for_transaction: str, payment_method: str = "Conta"):
+        """
+        Marca várias dívidas como 'Pago' e gera os lançamentos de despesa dos pagamentos,
+        tudo num único commit. Dívidas inválidas (inexistentes, já pagas, sem categoria ou
+        repetidas no pedido) são reportadas individualmente sem abortar o lote.
+        Retorna uma lista de resultados por dívida: {'indice', 'ID', 'sucesso', 'TransacaoID', 'erro'}.
+        """
+        debt_ids = [str(debt_id) for debt_id in debt_ids]
+        results = [{'indice': index, 'ID': debt_id, 'sucesso': False, 'TransacaoID': None, 'erro': None}
+                   for index, debt_id in enumerate(debt_ids)]
+        if not current_month_year_for_transaction or not payment_method:
+            for result in results:
+                result['erro'] = "Dados incompletos para registrar o pagamento."
+            return results
+
+        debts, occurrence_rows = self._resolve_debts(debt_ids)
+        if debts is None:
+            for result in results:
+                result['erro'] = "Erro ao buscar as dívidas."
+            return results
+
+        transaction_date = datetime.now().strftime("%Y-%m-%d")
+        valid, transactions, new_rows, seen = [], [], [], set()
+        for result in results:
+            debt = debts.get(result['ID'])
+            if result['ID'] in seen:
+                result['erro'] = "Dívida repetida no pedido."
+            elif debt is None:
+                result['erro'] = "Dívida não encontrada."
+            elif str(debt['Status']).lower() == 'pago':
+                result['erro'] = "Dívida já paga."
+            elif not debt['Categoria']:
+                result['erro'] = "Dívida sem categoria."
+            seen.add(result['ID'])
+            if result['erro']:
+                continue
+
+            if result['ID'] in occurrence_rows:
+                new_rows.append(occurrence_rows[result['ID']])
+            valid.append(result)
+            transactions.append({
+                'MesAno': current_month_year_for_transaction,
+                'Data': transaction_date,
+                'Tipo': 'Despesa',
+                'Descricao': f"Pagamento Dívida: {debt['Descricao']}",
+                'Categoria': debt['Categoria'],
+                'Valor': float(debt['Valor']),
+                'MeioPagamento': payment_method
+            })
+
+        if not valid:
+            return results
+        transaction_ids = self.core.pay_debts_bulk([result['ID'] for result in valid], transactions, new_rows)
+        for index, result in enumerate(valid):
+            if transaction_ids is None:
+                result['erro'] = "Erro ao gravar o lote de pagamentos. Nenhuma alteração foi gravada."
+            elif transaction_ids[index] is None:
+                # Paga por outro pedido entre a leitura do status e o commit
+                result['erro'] = "Dívida já paga."
+            else:
+                result['sucesso'], result['TransacaoID'] = True, transaction_ids[index]
+        return results
+
+    def update_debts(self, debt_ids: list, new_data: dict):
+        """
+        Aplica as mesmas alterações (Descricao, Valor, DataVencimento, Status, Categoria)
+        a várias dívidas num único commit. Ocorrências virtuais são gravadas em Dividas antes.
+        Retorna uma lista de resultados por dívida: {'indice', 'ID', 'sucesso', 'erro'}.
+        """
+        debt_ids = [str(debt_id) for debt_id in debt_ids]
+        results = [{'indice': index, 'ID': debt_id, 'sucesso': False, 'erro': None}
+                   for index, debt_id in enumerate(debt_ids)]
+        new_data = dict(new_data)
+        if isinstance(new_data.get('DataVencimento'), date):
+            new_data['DataVencimento'] = new_data['DataVencimento'].strftime("%Y-%m-%d")
+
+        error = None
+        if not new_data:
+            error = "Nenhuma alteração indicada."
+        elif 'Valor' in new_data and (not isinstance(new_data['Valor'], (int, float)) or new_data['Valor'] <= 0):
+            error = "Valor inválido para dívida."
+        debts, occurrence_rows = self._resolve_debts(debt_ids) if error is None else ({}, {})
+        if debts is None:
+            error = "Erro ao buscar as dívidas."
+        if error:
+            for result in results:
+                result['erro'] = error
+            return results
+
+        valid, new_rows, seen = [], [], set()
+        for result in results:
+            debt = debts.get(result['ID'])
+            if result['ID'] in seen:
+                result['erro'] = "Dívida repetida no pedido."
+            elif debt is None:
+                result['erro'] = "Dívida não encontrada."
+            seen.add(result['ID'])
+            if result['erro']:
+                continue
+            if result['ID'] in occurrence_rows:
+                new_rows.append(occurrence_rows[result['ID']])
+            valid.append(result)
+
+        if not valid:
+            return results
+        success = self.core.update_debts_bulk([result['ID'] for result in valid], new_data, new_rows)
+        for result in valid:
+            result['sucesso'] = success
+            if not success:
+                result['erro'] = "Erro ao gravar o lote de alterações. Nenhuma alteração foi gravada."
+        return results
+
+    def sweep_overdue_debts(self, force: bool = False):
+        """
+        Marca como 'Atrasado' as dívidas em aberto já vencidas, com um único UPDATE.
+        Não repete a varredura no mesmo dia enquanto Dividas não for escrita, seja por este
+        gestor, por outro caminho do CoreManager ou por outro processo (ver
+        CoreManager.get_tables_version), salvo se 'force' for True.
+        Retorna o número de dívidas atualizadas (0 se a varredura não foi necessária).
+        """
+        today = datetime.now().date()
+        if not force and self._last_overdue_sweep == (today, self.core.get_tables_version('Dividas')):
+            return 0
+        updated = self.core.mark_overdue_debts(today.strftime("%Y-%m-%d"))
+        if updated is None:
+            return 0
+        # Lida depois do UPDATE, que também conta como escrita em Dividas
+        self._last_overdue_sweep = (today, self.core.get_tables_version('Dividas'))
+        # Pré-calcula os totais por antiguidade do dia (ficam em cache até à próxima escrita em Dividas)
+        self.core.get_debt_aging_totals(today)
+        return updated
 
     def get_upcoming_or_overdue_debts(self, days_ahead: int = 7):
         """
-        Retorna dívidas futuras com vencimento próximo (dias_ahead) ou atrasadas.
-        Define o status 'Atrasado' para dívidas vencidas e abertas.
+        Retorna dívidas futuras com vencimento próximo (dias_ahead) ou atrasadas,
+        incluindo as ocorrências das dívidas recorrentes.
+        Define o status 'Atrasado' para dívidas vencidas e abertas (ver sweep_overdue_debts).
         """
-        debts_df = self.get_all_debts() 
-        if debts_df.empty:
+        import pandas as pd
+        self.sweep_overdue_debts()
+
+        limit_date = (datetime.now().date() + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        upcoming_or_overdue = self._with_occurrences(self.core.get_upcoming_debts(limit_date), None, limit_date)
+        upcoming_or_overdue = upcoming_or_overdue[upcoming_or_overdue['Status'].astype(str).str.lower() != 'pago']
+        if upcoming_or_overdue.empty:
             return pd.DataFrame()
+        return upcoming_or_overdue.sort_values(by='DataVencimento', kind='stable')
 
+    def get_debt_aging(self):
+        """
+        Relatório de contas a pagar: totais das dívidas não pagas por faixa de
+        antiguidade (atrasadas há 1-30, 31-60 e mais de 60 dias; a vencer nos
+        próximos 7 e 30 dias) e por categoria, incluindo as ocorrências das
+        dívidas recorrentes. Os totais de Dividas vêm de uma única agregação em SQL.
+        Retorna {'Data', 'Faixas': {faixa: {'Total', 'Quantidade', 'Por_Categoria'}},
+        'Total_Em_Aberto'}, ou None em caso de erro.
+        """
+        self.sweep_overdue_debts()
         today = datetime.now().date()
-        
-        # Atualiza o status para 'Atrasado' e persiste no Excel
-        for idx in debts_df.index:
-            row = debts_df.loc[idx]
-            if str(row['Status']).lower() == 'aberto' and pd.notna(row['DataVencimento']) and row['DataVencimento'] < today:
-                debts_df.loc[idx, 'Status'] = 'Atrasado'
-                self.core.update_debt(row['ID'], {'Status': 'Atrasado'})
-        
-        # Recarrega o DF para garantir que as alterações de status foram persistidas e refletidas
-        debts_df = self.get_all_debts() 
-
-        upcoming_or_overdue = debts_df[
-            (debts_df['Status'].astype(str).str.lower() != 'pago') & 
-            (
-                (debts_df['DataVencimento'] <= today + timedelta(days=days_ahead)) | 
-                (debts_df['DataVencimento'] < today) 
-            )
-        ].sort_values(by='DataVencimento')
-
-        return upcoming_or_overdue
\ No newline at end of file
+        totals = self.core.get_debt_aging_totals(today)
+        if totals is None:
+            return None
+
+        # Novo dicionário: os totais em cache não podem ser alterados
+        merged = {key: list(value) for key, value in totals.items()}
+        bounds = debt_aging_bounds(today)
+        for occurrence in self._expanded_debts(None, bounds['mes']):
+            if str(occurrence['Status']).lower() == 'pago':
+                continue
+            bucket = debt_aging_bucket(occurrence['DataVencimento'], bounds)
+            entry = merged.setdefault((bucket, occurrence['Categoria'] or ''), [0, 0])
+            entry[0] += 1
+            entry[1] += to_cents(occurrence['Valor'])
+
+        buckets = {bucket: {'Total': 0, 'Quantidade': 0, 'Por_Categoria': {}} for bucket in DEBT_AGING_BUCKETS}
+        for (bucket, category), (count, total_cents) in merged.items():
+            category = category or "Sem categoria"
+            buckets[bucket]['Quantidade'] += count
+            buckets[bucket]['Total'] += total_cents
+            buckets[bucket]['Por_Categoria'][category] = buckets[bucket]['Por_Categoria'].get(category, 0) + total_cents
+
+        total_cents = sum(values['Total'] for values in buckets.values())
+        for values in buckets.values():
+            values['Total'] /= 100
+            values['Por_Categoria'] = {category: cents / 100 for category, cents in sorted(values['Por_Categoria'].items())}
+        return {
+            'Data': today,
+            'Faixas': buckets,
+            'Total_Em_Aberto': total_cents / 100,
+        }
@@ -0,0 +1,248 @@
+# src/modules/importer.py
+
+"""
+Importa a planilha da versão antiga (data/financas_pessoais.xlsx) para o SQLite.
+
+A planilha é lida em modo streaming (openpyxl read_only), linha a linha, e as
+linhas são enviadas ao banco em blocos de 'chunk_size' (uma transação por
+bloco), pelo que a memória usada não depende do tamanho do ficheiro.
+
+Os IDs das transações da planilha repetem-se entre abas ('1', '2', ... em cada
+mês), por isso cada transação recebe um ID determinístico derivado da aba e do
+ID original: importar a mesma planilha duas vezes não duplica lançamentos.
+
+Executar com: python -m src.modules.importer [caminho.xlsx] [--chunk-size 500]
+"""
+
+import re
+import uuid
+from datetime import date, datetime
+
+from .core import (CoreManager, WORKBOOK_FILE, DEFAULT_CATEGORIES_SHEET, DEFAULT_BUDGET_SHEET,
+                   DEFAULT_LOANS_SHEET, DEFAULT_DEBTS_SHEET)
+
+DEFAULT_CHUNK_SIZE = 500
+MONTHLY_SHEET_PATTERN = re.compile(r'^(\d{2})-(\d{4})$')
+IMPORT_NAMESPACE = uuid.UUID('6f1c3c2e-9d0b-4f39-9a57-3f8e2b7d4a10') # base dos IDs gerados
+
+
+def _normalize_sheet_name(name: str):
+    return name.strip().lower().translate(str.maketrans('áàâãéêíóôõúç', 'aaaaeeiooouc')).replace(' ', '')
+
+# Aba (nome normalizado, sem acentos) -> tabela de destino.
+# As planilhas antigas têm abas com e sem acento ('Emprestimos' e 'Empréstimos').
+SHEET_TABLES = {
+    _normalize_sheet_name(DEFAULT_CATEGORIES_SHEET): 'Categorias',
+    _normalize_sheet_name(DEFAULT_BUDGET_SHEET): 'Orcamentos',
+    _normalize_sheet_name(DEFAULT_LOANS_SHEET): 'Emprestimos',
+    _normalize_sheet_name(DEFAULT_DEBTS_SHEET): 'Dividas',
+}
+
+# Ordem de importação: categorias primeiro (chave estrangeira das restantes tabelas)
+TABLE_ORDER = ['Categorias', 'Orcamentos', 'Emprestimos', 'Dividas']
+
+# Coluna que identifica a linha de cabeçalho de cada tabela (nem sempre é a primeira linha)
+HEADER_KEYS = {
+    'Categorias': 'Categoria',
+    'Orcamentos': 'MesAno',
+    'Emprestimos': 'ID',
+    'Dividas': 'ID',
+    'Transacoes': 'Data',
+}
+
+
+def _text(value, default=None):
+    if value is None:
+        return default
+    value = str(value).strip()
+    return value if value else default
+
+def _number(value, default=0.0):
+    if value is None or value == '':
+        return default
+    try:
+        return float(str(value).replace(',', '.')) if isinstance(value, str) else float(value)
+    except ValueError:
+        return default
+
+def _integer(value, default=0):
+    return int(_number(value, default))
+
+def _iso_date(value):
+    """Converte datas do Excel (datetime, date ou texto) em 'YYYY-MM-DD'."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = _text(value)
+    if text is None:
+        return None
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(text[:10], fmt).date().isoformat()
+        except ValueError:
+            continue
+    return text
+
+
+class ExcelImporter:
+    def __init__(self, core_manager: CoreManager, chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None):
+        """
+        progress: função opcional chamada após cada bloco como progress(aba, linhas_lidas, linhas_inseridas).
+        """
+        self.core = core_manager
+        self.chunk_size = max(1, chunk_size)
+        self.progress = progress
+
+    def _sheet_plan(self, workbook):
+        """Retorna [(aba, tabela)] na ordem de importação; meses em ordem cronológica."""
+        fixed, monthly = [], []
+        for sheet_name in workbook.sheetnames:
+            match = MONTHLY_SHEET_PATTERN.match(sheet_name.strip())
+            if match:
+                monthly.append(((int(match.group(2)), int(match.group(1))), sheet_name))
+                continue
+            table = SHEET_TABLES.get(_normalize_sheet_name(sheet_name))
+            if table:
+                fixed.append((sheet_name, table))
+            else:
+                print(f"Aviso: aba '{sheet_name}' ignorada (não corresponde a nenhuma tabela).")
+        fixed.sort(key=lambda item: TABLE_ORDER.index(item[1]))
+        return fixed + [(sheet_name, 'Transacoes') for _, sheet_name in sorted(monthly)]
+
+    def _iter_records(self, worksheet, table: str):
+        """Gera dicionários {coluna: valor} a partir da linha de cabeçalho, ignorando linhas vazias."""
+        header = None
+        for row_number, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
+            if header is None:
+                names = [_text(cell) for cell in row]
+                if HEADER_KEYS[table] in names:
+                    header = names
+                continue
+            if all(cell is None or str(cell).strip() == '' for cell in row):
+                continue
+            yield row_number, {name: value for name, value in zip(header, row) if name}
+
+    def _to_record(self, sheet_name: str, table: str, row_number: int, row: dict):
+        """Converte uma linha da planilha no registo esperado por CoreManager.import_rows."""
+        if table == 'Categorias':
+            category = _text(row.get('Categoria'))
+            return {'Categoria': category} if category else None
+
+        if table == 'Orcamentos':
+            return {
+                'MesAno': _text(row.get('MesAno')),
+                'Categoria': _text(row.get('Categoria')),
+                'Limite': _number(row.get('Limite')),
+            }
+
+        original_id = _text(row.get('ID'), default=f"linha-{row_number}")
+
+        if table == 'Emprestimos':
+            return {
+                'ID': original_id,
+                'Tipo': _text(row.get('Tipo'), ''),
+                'ParteEnvolvida': _text(row.get('ParteEnvolvida'), ''),
+                'ValorOriginal': _number(row.get('ValorOriginal')),
+                'Juros': _number(row.get('Juros%')),
+                'NumParcelas': _integer(row.get('NumParcelas')),
+                'ParcelasPagas': _integer(row.get('ParcelasPagas')),
+                'Status': _text(row.get('Status'), 'Aberto'),
+            }
+
+        if table == 'Dividas':
+            return {
+                'ID': original_id,
+                'Descricao': _text(row.get('Descricao')),
+                'Valor': _number(row.get('Valor')),
+                'DataVencimento': _iso_date(row.get('DataVencimento')),
+                'Status': _text(row.get('Status'), 'Aberto'),
+                'Recorrencia': _text(row.get('Recorrencia'), 'Unica'),
+                'RecorrenciaMeses': _integer(row.get('RecorrenciaMeses')),
+                'Categoria': _text(row.get('Categoria')),
+            }
+
+        return {
+            'ID': str(uuid.uuid5(IMPORT_NAMESPACE, f"{sheet_name.strip()}:{original_id}")),
+            'MesAno': sheet_name.strip(),
+            'Data': _iso_date(row.get('Data')),
+            'Tipo': _text(row.get('Tipo')),
+            'Descricao': _text(row.get('Descricao'), ''),
+            'Categoria': _text(row.get('Categoria')),
+            'Valor': _number(row.get('Valor')),
+            'MeioPagamento': _text(row.get('MeioPagamento'), 'Conta'),
+        }
+
+    def _flush(self, table: str, chunk: list, result: dict):
+        outcome = self.core.import_rows(table, chunk)
+        if outcome is None:
+            result['erros'] += len(chunk)
+            return
+        inserted, errors = outcome
+        result['inseridas'] += inserted
+        result['erros'] += len(errors)
+        result['ignoradas'] += len(chunk) - inserted - len(errors)
+
+    def import_sheet(self, worksheet, table: str):
+        """Importa uma aba em blocos. Retorna {'lidas', 'inseridas', 'ignoradas', 'erros'}."""
+        result = {'lidas': 0, 'inseridas': 0, 'ignoradas': 0, 'erros': 0}
+        chunk = []
+        for row_number, row in self._iter_records(worksheet, table):
+            result['lidas'] += 1
+            record = self._to_record(worksheet.title, table, row_number, row)
+            if record is None:
+                result['ignoradas'] += 1
+                continue
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                self._flush(table, chunk, result)
+                chunk = []
+                if self.progress:
+                    self.progress(worksheet.title, result['lidas'], result['inseridas'])
+        if chunk:
+            self._flush(table, chunk, result)
+            if self.progress:
+                self.progress(worksheet.title, result['lidas'], result['inseridas'])
+        return result
+
+    def import_workbook(self, path: str = None):
+        """
+        Importa todas as abas reconhecidas da planilha.
+        Retorna {aba: {'tabela', 'lidas', 'inseridas', 'ignoradas', 'erros'}}.
+        """
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path or WORKBOOK_FILE, read_only=True, data_only=True)
+        try:
+            summary = {}
+            for sheet_name, table in self._sheet_plan(workbook):
+                summary[sheet_name] = dict(self.import_sheet(workbook[sheet_name], table), tabela=table)
+            return summary
+        finally:
+            workbook.close()
+
+
+def _print_progress(sheet_name: str, read_rows: int, inserted_rows: int):
+    print(f"  {sheet_name}: {read_rows} linha(s) lida(s), {inserted_rows} inserida(s)")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Importa a planilha antiga para o banco SQLite.")
+    parser.add_argument('path', nargs='?', default=WORKBOOK_FILE, help="caminho do ficheiro .xlsx")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="linhas por transação")
+    args = parser.parse_args()
+
+    core = CoreManager()
+    start = time.perf_counter()
+    try:
+        summary = ExcelImporter(core, args.chunk_size, _print_progress).import_workbook(args.path)
+    finally:
+        core.close()
+    elapsed = time.perf_counter() - start
+
+    totals = {key: sum(result[key] for result in summary.values()) for key in ('lidas', 'inseridas', 'ignoradas', 'erros')}
+    print(f"Importação concluída em {elapsed:.2f}s: {totals['inseridas']} inserida(s), "
+          f"{totals['ignoradas']} ignorada(s) (já existentes ou vazias), {totals['erros']} com erro.")
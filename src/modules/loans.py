@@ -1,8 +1,7 @@
-import pandas as pd
 from datetime import datetime
 import uuid 
 
-from .core import CoreManager, DEFAULT_LOANS_SHEET, DEFAULT_CATEGORIES_SHEET
+from .core import CoreManager, DEFAULT_LOANS_SHEET
 from .monthly_control import MonthlyControlManager
 
 class LoanManager:
@@ -38,28 +37,6 @@ class LoanManager:
             transaction_type = 'Despesa'
             description = f"Empréstimo Concedido - {involved_party}"
         
-        if transaction_type:
-            today = datetime.now().strftime("%Y-%m-%d")
-            month_year = datetime.now().strftime("%m-%Y")
-            
-            if "Empréstimos" not in self.core.load_data(DEFAULT_CATEGORIES_SHEET)['Categoria'].tolist():
-                self.core.add_category("Empréstimos")
-            
-            
-            success_monthly_transaction = self.monthly_control.add_transaction(
-                month_year, 
-                today, 
-                transaction_type, 
-                description, 
-                "Empréstimos", 
-                float(original_value),
-                meio_pagamento
-            )
-            
-            if not success_monthly_transaction:
-                print(f"Falha ao registrar a transação de {transaction_type} inicial do empréstimo. Abortando.")
-                return False
-
         data = {
             'ID': str(uuid.uuid4()), 
             'Tipo': loan_type,
@@ -70,25 +47,42 @@ class LoanManager:
             'ParcelasPagas': 0, 
             'Status': 'Aberto'
         }
-        
-        return self.core.add_loan(data)
 
-    def record_installment_payment(self, loan_id: str, month_year: str, amount_paid: float):
-        
-        df_loans = self.core.get_loans()
-        if df_loans.empty:
-            print("Erro: Nenhum empréstimo encontrado para registrar parcela.")
+        # Lançamento inicial e registro do empréstimo num único commit (tudo ou nada)
+        try:
+            with self.core.transaction():
+                if transaction_type:
+                    today = datetime.now().strftime("%Y-%m-%d")
+                    month_year = datetime.now().strftime("%m-%Y")
+
+                    if "Empréstimos" not in self.core.get_categories()['Categoria'].tolist():
+                        self.core.add_category("Empréstimos")
+
+                    if not self.monthly_control.add_transaction(
+                        month_year, 
+                        today, 
+                        transaction_type, 
+                        description, 
+                        "Empréstimos", 
+                        float(original_value),
+                        meio_pagamento
+                    ):
+                        raise RuntimeError(f"falha ao registrar a transação de {transaction_type} inicial")
+
+                if not self.core.add_loan(data):
+                    raise RuntimeError("falha ao gravar o empréstimo")
+        except Exception as e:
+            print(f"Registro do empréstimo cancelado ({e}). Nenhuma alteração foi gravada.")
             return False
+        return True
+
+    def record_installment_payment(self, loan_id: str, month_year: str, amount_paid: float):
         
-        df_loans['ID'] = df_loans['ID'].astype(str)
         loan_id = str(loan_id)
-
-        loan_row_index = df_loans[df_loans['ID'] == loan_id].index
-        if loan_row_index.empty:
+        current_loan_data = self.core.get_loan(loan_id)
+        if current_loan_data is None:
             print(f"Erro: Empréstimo com ID '{loan_id}' não encontrado.")
             return False
-        
-        current_loan_data = df_loans.loc[loan_row_index[0]].to_dict()
 
         if current_loan_data['Status'] == 'Fechado':
             print("Este empréstimo já está fechado.")
@@ -118,24 +112,6 @@ class LoanManager:
         
         meio_pagamento = "Conta" 
 
-        if "Empréstimos" not in self.core.load_data(DEFAULT_CATEGORIES_SHEET)['Categoria'].tolist():
-            self.core.add_category("Empréstimos")
-        
-        
-        success_monthly_transaction = self.monthly_control.add_transaction(
-            month_year, 
-            today, 
-            transaction_type, 
-            description, 
-            "Empréstimos", 
-            amount_paid,
-            meio_pagamento
-        )
-
-        if not success_monthly_transaction:
-            print("Falha ao registrar a transação mensal para o empréstimo. Abortando operação.")
-            return False
-
         new_paid_installments = current_paid_installments + 1
         remaining_value = original_value - amount_paid
         
@@ -146,21 +122,38 @@ class LoanManager:
             new_status = 'Fechado'
             new_valor_original = 0 
             new_paid_installments = total_installments 
+
+        # Lançamento da parcela e atualização do empréstimo num único commit (tudo ou nada)
+        try:
+            with self.core.transaction():
+                if "Empréstimos" not in self.core.get_categories()['Categoria'].tolist():
+                    self.core.add_category("Empréstimos")
+
+                if not self.monthly_control.add_transaction(
+                    month_year, 
+                    today, 
+                    transaction_type, 
+                    description, 
+                    "Empréstimos", 
+                    amount_paid,
+                    meio_pagamento
+                ):
+                    raise RuntimeError("falha ao registrar a transação mensal da parcela")
+
+                if not self.core.update_loan(loan_id, {
+                    'Status': new_status,
+                    'ParcelasPagas': new_paid_installments,
+                    'ValorOriginal': new_valor_original
+                }):
+                    raise RuntimeError("falha ao atualizar o empréstimo")
+        except Exception as e:
+            print(f"Pagamento da parcela do empréstimo '{loan_id}' cancelado ({e}). Nenhuma alteração foi gravada.")
+            return False
+
+        if new_status == 'Fechado':
             print(f"Empréstimo '{loan_id}' pago totalmente e fechado.")
         else:
             print(f"Empréstimo '{loan_id}' parcialmente pago. Valor restante R$ {remaining_value:.2f}.")
-
-        
-        success_update = self.core.update_loan(loan_id, {
-            'Status': new_status,
-            'ParcelasPagas': new_paid_installments,
-            'ValorOriginal': new_valor_original
-        })
-        
-        if not success_update:
-            print("Erro ao atualizar o empréstimo.")
-            return False
-            
         return True
 
     def delete_loan(self, loan_id: str):
@@ -173,16 +166,11 @@ class LoanManager:
         return False
 
     def get_active_loans(self):
+        import pandas as pd
         df = self.core.get_loans()
         if not df.empty:
             return df[df['Status'].astype(str).str.lower() == 'aberto'] 
         return pd.DataFrame()
 
     def get_loan_details(self, loan_id: str):
-        df = self.core.get_loans()
-        if not df.empty:
-            df['ID'] = df['ID'].astype(str)
-            loan_id = str(loan_id)
-            loan_row = df[df['ID'] == loan_id]
-            return loan_row.iloc[0].to_dict() if not loan_row.empty else None
-        return None
\ No newline at end of file
+        return self.core.get_loan(loan_id)
\ No newline at end of file
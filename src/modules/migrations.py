@@ -0,0 +1,503 @@
+# src/modules/migrations.py
+
+"""
+Migrações do esquema do banco de dados, aplicadas por ordem.
+
+A versão atual do esquema fica guardada em 'PRAGMA user_version'. Cada migração
+é executada uma única vez, dentro de uma transação, e incrementa essa versão.
+Quando a base já está na última versão, nenhum DDL é executado no arranque.
+Para alterar o esquema, acrescente uma nova função ao final de MIGRATIONS
+(nunca altere uma migração já publicada).
+"""
+
+
+def _migration_001_base_tables(conn):
+    """Tabelas base da aplicação."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Categorias (
+            Categoria TEXT PRIMARY KEY NOT NULL
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Orcamentos (
+            MesAno TEXT NOT NULL,
+            Categoria TEXT NOT NULL,
+            Limite REAL NOT NULL,
+            PRIMARY KEY (MesAno, Categoria),
+            FOREIGN KEY (Categoria) REFERENCES Categorias (Categoria) ON DELETE CASCADE
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Emprestimos (
+            ID TEXT PRIMARY KEY NOT NULL,
+            Tipo TEXT NOT NULL,
+            ParteEnvolvida TEXT NOT NULL,
+            ValorOriginal REAL NOT NULL,
+            "Juros%" REAL NOT NULL,
+            NumParcelas INTEGER NOT NULL,
+            ParcelasPagas INTEGER NOT NULL,
+            Status TEXT NOT NULL
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Dividas (
+            ID TEXT PRIMARY KEY NOT NULL,
+            Descricao TEXT,
+            Valor REAL,
+            DataVencimento TEXT,
+            Status TEXT,
+            Recorrencia TEXT,
+            RecorrenciaMeses INTEGER,
+            Categoria TEXT,
+            FOREIGN KEY (Categoria) REFERENCES Categorias (Categoria) ON DELETE SET NULL
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Transacoes (
+            ID TEXT PRIMARY KEY NOT NULL,
+            MesAno TEXT NOT NULL,
+            Data TEXT,
+            Tipo TEXT,
+            Descricao TEXT,
+            Categoria TEXT,
+            Valor REAL,
+            MeioPagamento TEXT,
+            FOREIGN KEY (Categoria) REFERENCES Categorias (Categoria) ON DELETE SET NULL
+        );
+    """)
+
+
+def _migration_002_secondary_indexes(conn):
+    """
+    Índices secundários das consultas frequentes.
+    Orcamentos(MesAno) não precisa de índice próprio: é o prefixo da chave primária.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_mesano ON Transacoes (MesAno);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_data ON Transacoes (Data);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_categoria_tipo ON Transacoes (Categoria, Tipo);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dividas_vencimento_status ON Dividas (DataVencimento, Status);")
+
+
+def _migration_003_numeric_transaction_keys(conn):
+    """
+    Colunas numéricas derivadas em Transacoes:
+    ValorCentavos (valor em centavos inteiros, para somas exatas),
+    DataDia (dias desde 1970-01-01) e MesAnoChave (YYYYMM, ordenável por data).
+    As colunas textuais originais continuam a ser o formato exposto pela API.
+    """
+    conn.execute("ALTER TABLE Transacoes ADD COLUMN ValorCentavos INTEGER;")
+    conn.execute("ALTER TABLE Transacoes ADD COLUMN DataDia INTEGER;")
+    conn.execute("ALTER TABLE Transacoes ADD COLUMN MesAnoChave INTEGER;")
+    conn.execute("""
+        UPDATE Transacoes SET
+            ValorCentavos = CAST(ROUND(Valor * 100) AS INTEGER),
+            DataDia = CAST(julianday(Data) - 2440587.5 AS INTEGER),
+            MesAnoChave = CAST(substr(MesAno, 4, 4) || substr(MesAno, 1, 2) AS INTEGER);
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_datadia ON Transacoes (DataDia);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_mesanochave ON Transacoes (MesAnoChave);")
+
+
+# Totais por (mês, categoria, tipo, meio de pagamento) recalculados a partir de Transacoes.
+# Usado para preencher/reconstruir MonthlyAggregates e para verificar a sua consistência.
+MONTHLY_AGGREGATES_SOURCE_QUERY = """
+SELECT MesAnoChave, COALESCE(Categoria, '') AS Categoria, COALESCE(Tipo, '') AS Tipo,
+       COALESCE(MeioPagamento, '') AS MeioPagamento,
+       SUM(COALESCE(ValorCentavos, 0)) AS TotalCentavos, COUNT(*) AS Quantidade
+FROM Transacoes WHERE MesAnoChave IS NOT NULL
+GROUP BY 1, 2, 3, 4
+"""
+
+
+def _migration_004_monthly_aggregates(conn):
+    """
+    Tabela MonthlyAggregates com os totais mensais por categoria, tipo e meio de
+    pagamento, mantida por triggers em cada INSERT/UPDATE/DELETE de Transacoes.
+    Valores NULL são guardados como '' para fazerem parte da chave primária.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS MonthlyAggregates (
+            MesAnoChave INTEGER NOT NULL,
+            Categoria TEXT NOT NULL,
+            Tipo TEXT NOT NULL,
+            MeioPagamento TEXT NOT NULL,
+            TotalCentavos INTEGER NOT NULL DEFAULT 0,
+            Quantidade INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (MesAnoChave, Categoria, Tipo, MeioPagamento)
+        ) WITHOUT ROWID;
+    """)
+    add_new_row = """
+        INSERT INTO MonthlyAggregates (MesAnoChave, Categoria, Tipo, MeioPagamento, TotalCentavos, Quantidade)
+        SELECT NEW.MesAnoChave, COALESCE(NEW.Categoria, ''), COALESCE(NEW.Tipo, ''),
+               COALESCE(NEW.MeioPagamento, ''), COALESCE(NEW.ValorCentavos, 0), 1
+        WHERE NEW.MesAnoChave IS NOT NULL
+        ON CONFLICT (MesAnoChave, Categoria, Tipo, MeioPagamento) DO UPDATE SET
+            TotalCentavos = TotalCentavos + excluded.TotalCentavos,
+            Quantidade = Quantidade + 1;
+    """
+    remove_old_row = """
+        UPDATE MonthlyAggregates SET
+            TotalCentavos = TotalCentavos - COALESCE(OLD.ValorCentavos, 0),
+            Quantidade = Quantidade - 1
+        WHERE MesAnoChave = OLD.MesAnoChave AND Categoria = COALESCE(OLD.Categoria, '')
+          AND Tipo = COALESCE(OLD.Tipo, '') AND MeioPagamento = COALESCE(OLD.MeioPagamento, '');
+        DELETE FROM MonthlyAggregates
+        WHERE MesAnoChave = OLD.MesAnoChave AND Categoria = COALESCE(OLD.Categoria, '')
+          AND Tipo = COALESCE(OLD.Tipo, '') AND MeioPagamento = COALESCE(OLD.MeioPagamento, '')
+          AND Quantidade <= 0;
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_agregados_insert AFTER INSERT ON Transacoes
+        BEGIN {add_new_row} END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_agregados_delete AFTER DELETE ON Transacoes
+        BEGIN {remove_old_row} END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_agregados_update
+        AFTER UPDATE OF MesAnoChave, Categoria, Tipo, MeioPagamento, ValorCentavos ON Transacoes
+        BEGIN {remove_old_row} {add_new_row} END;
+    """)
+    conn.execute("DELETE FROM MonthlyAggregates;")
+    conn.execute(f"INSERT INTO MonthlyAggregates {MONTHLY_AGGREGATES_SOURCE_QUERY};")
+
+
+# Saldo acumulado (ganhos - despesas) de cada meio de pagamento até ao fim de cada mês,
+# calculado a partir de MonthlyAggregates. Usado para preencher/reconstruir SaldosAcumulados.
+# Checkpoints por MesAno (versão da migração 005; substituída pela 011)
+_MONTHLY_RUNNING_BALANCES_SOURCE_QUERY = """
+SELECT MeioPagamento, MesAnoChave,
+       SUM(SUM(CASE lower(Tipo) WHEN 'ganho' THEN TotalCentavos WHEN 'despesa' THEN -TotalCentavos ELSE 0 END))
+           OVER (PARTITION BY MeioPagamento ORDER BY MesAnoChave) AS SaldoCentavos
+FROM MonthlyAggregates
+GROUP BY MeioPagamento, MesAnoChave
+"""
+
+
+def _migration_005_running_balances(conn):
+    """
+    Tabela SaldosAcumulados com um checkpoint de fim de mês por meio de pagamento.
+    Os triggers somam o efeito de cada lançamento (ganho +, despesa -) ao checkpoint
+    do seu mês e de todos os meses seguintes; se o mês ainda não tiver checkpoint,
+    ele é criado a partir do checkpoint anterior.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS SaldosAcumulados (
+            MeioPagamento TEXT NOT NULL,
+            MesAnoChave INTEGER NOT NULL,
+            SaldoCentavos INTEGER NOT NULL,
+            PRIMARY KEY (MeioPagamento, MesAnoChave)
+        ) WITHOUT ROWID;
+    """)
+
+    def apply_delta(row, sign):
+        method = f"COALESCE({row}.MeioPagamento, '')"
+        delta = (f"{sign} (CASE lower({row}.Tipo) WHEN 'ganho' THEN COALESCE({row}.ValorCentavos, 0) "
+                 f"WHEN 'despesa' THEN -COALESCE({row}.ValorCentavos, 0) ELSE 0 END)")
+        return f"""
+            INSERT INTO SaldosAcumulados (MeioPagamento, MesAnoChave, SaldoCentavos)
+            SELECT {method}, {row}.MesAnoChave, COALESCE((
+                SELECT SaldoCentavos FROM SaldosAcumulados
+                WHERE MeioPagamento = {method} AND MesAnoChave < {row}.MesAnoChave
+                ORDER BY MesAnoChave DESC LIMIT 1
+            ), 0)
+            WHERE {row}.MesAnoChave IS NOT NULL
+            ON CONFLICT (MeioPagamento, MesAnoChave) DO NOTHING;
+            UPDATE SaldosAcumulados SET SaldoCentavos = SaldoCentavos + ({delta})
+            WHERE MeioPagamento = {method} AND MesAnoChave >= {row}.MesAnoChave;
+        """
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_saldos_insert AFTER INSERT ON Transacoes
+        BEGIN {apply_delta('NEW', '+')} END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_saldos_delete AFTER DELETE ON Transacoes
+        BEGIN {apply_delta('OLD', '-')} END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_saldos_update
+        AFTER UPDATE OF MesAnoChave, Tipo, MeioPagamento, ValorCentavos ON Transacoes
+        BEGIN {apply_delta('OLD', '-')} {apply_delta('NEW', '+')} END;
+    """)
+    conn.execute("DELETE FROM SaldosAcumulados;")
+    conn.execute(f"INSERT INTO SaldosAcumulados {_MONTHLY_RUNNING_BALANCES_SOURCE_QUERY};")
+
+
+def _migration_006_transaction_content_hash(conn):
+    """
+    Coluna HashConteudo em Transacoes, preenchida pela importação de extratos
+    bancários (CSV/OFX). O índice único parcial faz com que reimportar um extrato
+    sobreposto custe uma consulta ao índice por linha: as linhas repetidas são
+    ignoradas por INSERT OR IGNORE. Lançamentos manuais ficam com NULL.
+    """
+    conn.execute("ALTER TABLE Transacoes ADD COLUMN HashConteudo TEXT;")
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_transacoes_hashconteudo
+        ON Transacoes (HashConteudo) WHERE HashConteudo IS NOT NULL;
+    """)
+
+
+# Conteúdo do índice de pesquisa com o rowid de Transacoes (só a migração 007; ver a 012)
+_ROWID_SEARCH_INDEX_SOURCE_QUERY = "SELECT rowid, Descricao, Categoria, ID FROM Transacoes"
+
+
+def _migration_007_transaction_search(conn):
+    """
+    Índice de texto completo (FTS5) sobre a descrição e a categoria dos lançamentos.
+    TransacoesBusca usa o mesmo rowid de Transacoes e é mantida por triggers.
+    As pesquisas juntam os resultados a Transacoes pelo ID (guardado sem indexar),
+    e CoreManager.rebuild_search_index() reconstrói o índice se for preciso
+    (ex.: após um VACUUM, que pode renumerar os rowids).
+    """
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS TransacoesBusca USING fts5(
+            Descricao, Categoria, ID UNINDEXED,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_busca_insert AFTER INSERT ON Transacoes
+        BEGIN
+            INSERT INTO TransacoesBusca (rowid, Descricao, Categoria, ID)
+            VALUES (NEW.rowid, NEW.Descricao, NEW.Categoria, NEW.ID);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_busca_delete AFTER DELETE ON Transacoes
+        BEGIN
+            DELETE FROM TransacoesBusca WHERE rowid = OLD.rowid;
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_busca_update
+        AFTER UPDATE OF Descricao, Categoria, ID ON Transacoes
+        BEGIN
+            UPDATE TransacoesBusca SET Descricao = NEW.Descricao, Categoria = NEW.Categoria, ID = NEW.ID
+            WHERE rowid = OLD.rowid;
+        END;
+    """)
+    conn.execute("DELETE FROM TransacoesBusca;")
+    conn.execute(f"INSERT INTO TransacoesBusca (rowid, Descricao, Categoria, ID) {_ROWID_SEARCH_INDEX_SOURCE_QUERY};")
+
+
+def _migration_008_transaction_listing_indexes(conn):
+    """
+    Índices compostos para a listagem paginada por keyset: (DataDia, ID) e
+    (ValorCentavos, ID) servem tanto a ordenação como a condição do cursor;
+    (Categoria, DataDia, ID) serve o filtro mais comum (uma categoria) sem
+    ordenar em memória. O índice simples de DataDia passa a ser um prefixo do
+    composto e é removido.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_datadia_id ON Transacoes (DataDia, ID);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_categoria_datadia_id ON Transacoes (Categoria, DataDia, ID);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_valorcentavos_id ON Transacoes (ValorCentavos, ID);")
+    conn.execute("DROP INDEX IF EXISTS idx_transacoes_datadia;")
+
+
+def _migration_009_recurring_debt_rules(conn):
+    """
+    Dívidas recorrentes passam a ser guardadas como uma regra (início,
+    frequência, número de ocorrências e data da última) em vez de uma linha
+    por mês. As ocorrências são geradas ao consultar um período
+    (ver recurrence.py); só as pagas ou editadas viram linhas de Dividas, com
+    RegraID e DataOcorrencia (a data original da ocorrência) preenchidos.
+    Ocorrências excluídas ficam registadas em ExcecoesRecorrencias para não
+    voltarem a ser geradas. As recorrências antigas (já materializadas) ficam
+    como estão.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS RecorrenciasDividas (
+            ID TEXT PRIMARY KEY NOT NULL,
+            Descricao TEXT NOT NULL,
+            Valor REAL NOT NULL,
+            Categoria TEXT,
+            Status TEXT NOT NULL DEFAULT 'Aberto',
+            Frequencia TEXT NOT NULL CHECK (Frequencia IN ('Mensal', 'Anual')),
+            DataInicio TEXT NOT NULL,
+            NumOcorrencias INTEGER,
+            DataFim TEXT NOT NULL,
+            FOREIGN KEY (Categoria) REFERENCES Categorias (Categoria) ON DELETE SET NULL
+        );
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recorrenciasdividas_periodo ON RecorrenciasDividas (DataInicio, DataFim);")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ExcecoesRecorrencias (
+            RegraID TEXT NOT NULL,
+            DataOcorrencia TEXT NOT NULL,
+            PRIMARY KEY (RegraID, DataOcorrencia),
+            FOREIGN KEY (RegraID) REFERENCES RecorrenciasDividas (ID) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+    """)
+    conn.execute("ALTER TABLE Dividas ADD COLUMN RegraID TEXT;")
+    conn.execute("ALTER TABLE Dividas ADD COLUMN DataOcorrencia TEXT;")
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_dividas_regra_ocorrencia
+        ON Dividas (RegraID, DataOcorrencia) WHERE RegraID IS NOT NULL;
+    """)
+
+
+def _migration_010_debt_category_index(conn):
+    """
+    Índice (Categoria, DataVencimento) para a listagem de dívidas filtrada por
+    categoria, já na ordem de vencimento. O filtro por período usa o índice
+    existente idx_dividas_vencimento_status.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dividas_categoria_vencimento ON Dividas (Categoria, DataVencimento);")
+
+
+def _calendar_month_key(day: str):
+    """Expressão SQL da chave YYYYMM do mês civil de um DataDia (dias desde 1970-01-01)."""
+    return f"CAST(strftime('%Y%m', {day} * 86400, 'unixepoch') AS INTEGER)"
+
+
+# Checkpoints de SaldosAcumulados recalculados a partir de Transacoes (migração 011 e reconstrução):
+# saldo acumulado no fim de cada mês civil da Data dos lançamentos
+RUNNING_BALANCES_SOURCE_QUERY = f"""
+SELECT MeioPagamento, MesAnoChave,
+       SUM(DeltaCentavos) OVER (PARTITION BY MeioPagamento ORDER BY MesAnoChave) AS SaldoCentavos
+FROM (
+    SELECT COALESCE(MeioPagamento, '') AS MeioPagamento, {_calendar_month_key('DataDia')} AS MesAnoChave,
+           SUM(CASE lower(Tipo) WHEN 'ganho' THEN COALESCE(ValorCentavos, 0)
+                                WHEN 'despesa' THEN -COALESCE(ValorCentavos, 0) ELSE 0 END) AS DeltaCentavos
+    FROM Transacoes WHERE DataDia IS NOT NULL
+    GROUP BY 1, 2
+)
+"""
+
+
+def _migration_011_running_balances_by_date(conn):
+    """
+    Os checkpoints de SaldosAcumulados passam a ser do mês civil da Data de cada
+    lançamento (derivado de DataDia), e não do seu MesAno. O saldo numa data soma o
+    checkpoint do mês anterior aos lançamentos do mês até essa data, e as duas partes
+    têm de usar o mesmo critério: transferências e pagamentos de dívidas são gravados
+    com a data de hoje sob o MesAno selecionado na interface, que pode ser outro.
+    A coluna continua a chamar-se MesAnoChave (YYYYMM).
+    """
+    for trigger in ('insert', 'delete', 'update'):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_transacoes_saldos_{trigger};")
+
+    def apply_delta(row, sign):
+        method = f"COALESCE({row}.MeioPagamento, '')"
+        month = _calendar_month_key(f"{row}.DataDia")
+        delta = (f"{sign} (CASE lower({row}.Tipo) WHEN 'ganho' THEN COALESCE({row}.ValorCentavos, 0) "
+                 f"WHEN 'despesa' THEN -COALESCE({row}.ValorCentavos, 0) ELSE 0 END)")
+        return f"""
+            INSERT INTO SaldosAcumulados (MeioPagamento, MesAnoChave, SaldoCentavos)
+            SELECT {method}, {month}, COALESCE((
+                SELECT SaldoCentavos FROM SaldosAcumulados
+                WHERE MeioPagamento = {method} AND MesAnoChave < {month}
+                ORDER BY MesAnoChave DESC LIMIT 1
+            ), 0)
+            WHERE {row}.DataDia IS NOT NULL
+            ON CONFLICT (MeioPagamento, MesAnoChave) DO NOTHING;
+            UPDATE SaldosAcumulados SET SaldoCentavos = SaldoCentavos + ({delta})
+            WHERE {row}.DataDia IS NOT NULL AND MeioPagamento = {method} AND MesAnoChave >= {month};
+        """
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_saldos_insert AFTER INSERT ON Transacoes
+        BEGIN {apply_delta('NEW', '+')} END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_saldos_delete AFTER DELETE ON Transacoes
+        BEGIN {apply_delta('OLD', '-')} END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_saldos_update
+        AFTER UPDATE OF DataDia, Tipo, MeioPagamento, ValorCentavos ON Transacoes
+        BEGIN {apply_delta('OLD', '-')} {apply_delta('NEW', '+')} END;
+    """)
+    conn.execute("DELETE FROM SaldosAcumulados;")
+    conn.execute(f"INSERT INTO SaldosAcumulados {RUNNING_BALANCES_SOURCE_QUERY};")
+
+
+# Conteúdo do índice de pesquisa, recalculado a partir de Transacoes (migração 012 e reconstrução)
+SEARCH_INDEX_SOURCE_QUERY = "SELECT Descricao, Categoria, ID FROM Transacoes"
+
+
+def _migration_012_search_index_by_id(conn):
+    """
+    Os triggers de TransacoesBusca passam a localizar as linhas do índice pelo ID
+    do lançamento e não pelo rowid implícito de Transacoes, que tem uma chave
+    primária TEXT e por isso pode ser renumerado por um VACUUM. O rowid do índice
+    passa a ser atribuído pelo próprio FTS5. Como ID não é indexado, apagar ou
+    editar um lançamento percorre o índice, o que é aceitável para operações de
+    uma linha. O índice é reconstruído para corrigir linhas já desalinhadas.
+    """
+    for trigger in ('insert', 'delete', 'update'):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_transacoes_busca_{trigger};")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_busca_insert AFTER INSERT ON Transacoes
+        BEGIN
+            INSERT INTO TransacoesBusca (Descricao, Categoria, ID)
+            VALUES (NEW.Descricao, NEW.Categoria, NEW.ID);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_busca_delete AFTER DELETE ON Transacoes
+        BEGIN
+            DELETE FROM TransacoesBusca WHERE ID = OLD.ID;
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transacoes_busca_update
+        AFTER UPDATE OF Descricao, Categoria, ID ON Transacoes
+        BEGIN
+            UPDATE TransacoesBusca SET Descricao = NEW.Descricao, Categoria = NEW.Categoria, ID = NEW.ID
+            WHERE ID = OLD.ID;
+        END;
+    """)
+    conn.execute("DELETE FROM TransacoesBusca;")
+    conn.execute(f"INSERT INTO TransacoesBusca (Descricao, Categoria, ID) {SEARCH_INDEX_SOURCE_QUERY};")
+
+
+MIGRATIONS = [
+    _migration_001_base_tables,
+    _migration_002_secondary_indexes,
+    _migration_003_numeric_transaction_keys,
+    _migration_004_monthly_aggregates,
+    _migration_005_running_balances,
+    _migration_006_transaction_content_hash,
+    _migration_007_transaction_search,
+    _migration_008_transaction_listing_indexes,
+    _migration_009_recurring_debt_rules,
+    _migration_010_debt_category_index,
+    _migration_011_running_balances_by_date,
+    _migration_012_search_index_by_id,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    """Retorna a versão do esquema gravada no ficheiro do banco."""
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """
+    Aplica as migrações pendentes e retorna quantas foram executadas.
+    A conexão deve estar em modo autocommit (isolation_level=None).
+    """
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return 0
+
+    applied = 0
+    for number, migration in enumerate(MIGRATIONS, start=1):
+        # BEGIN IMMEDIATE bloqueia outros processos (API/desktop) durante a migração;
+        # a versão é relida dentro do bloqueio para não aplicar a mesma migração duas vezes.
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            if get_schema_version(conn) >= number:
+                conn.execute("COMMIT;")
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number};")
+            conn.execute("COMMIT;")
+            applied += 1
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+    return applied
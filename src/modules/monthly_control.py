@@ -1,11 +1,30 @@
-from .core import CoreManager
-import pandas as pd
+from .core import CoreManager, date_to_day, month_year_to_key
 from datetime import datetime
 
+PAYMENT_METHODS = {'conta': "Conta", 'dinheiro em mãos': "Dinheiro em Mãos"}
+
+def month_year_from_date(date: str):
+    """Converte uma data 'YYYY-MM-DD' no 'MesAno' correspondente ('MM-YYYY')."""
+    return datetime.strptime(date, "%Y-%m-%d").strftime("%m-%Y")
+
 class MonthlyControlManager:
     def __init__(self, core_manager: CoreManager):
         self.core = core_manager
 
+    def _validate_transaction(self, month_year, date, trans_type, description, category, value, payment_method):
+        """Retorna uma mensagem de erro se os dados do lançamento forem inválidos, ou None."""
+        if not all([month_year, date, trans_type, description, category, value is not None, payment_method]):
+            return "Dados incompletos para adicionar transação."
+        if trans_type not in ('Ganho', 'Despesa'):
+            return "Tipo de transação inválido."
+        if date_to_day(date) is None:
+            return "Data inválida (use YYYY-MM-DD)."
+        if month_year_to_key(month_year) is None:
+            return "Mês inválido (use MM-YYYY)."
+        if not isinstance(value, (int, float)) or value < 0:
+            return "Valor inválido para transação."
+        return None
+
     def add_transaction(self, month_year: str, date: str, trans_type: str, description: str, category: str, value: float, payment_method: str = "Conta"):
         """
         Adiciona um novo lançamento (ganho ou despesa).
@@ -13,11 +32,9 @@ class MonthlyControlManager:
         date:YYYY-MM-DD
         payment_method: 'Conta' ou 'Dinheiro em Mãos'
         """
-        if not all([month_year, date, trans_type, description, category, value is not None, payment_method]):
-            print("Dados incompletos para adicionar transação.")
-            return False
-        if not isinstance(value, (int, float)) or value < 0:
-            print("Valor inválido para transação.")
+        error = self._validate_transaction(month_year, date, trans_type, description, category, value, payment_method)
+        if error:
+            print(error)
             return False
         
         data = {
@@ -30,6 +47,73 @@ class MonthlyControlManager:
         }
         return self.core.add_transaction(month_year, data)
 
+    def add_transactions_bulk(self, rows: list):
+        """
+        Valida e adiciona vários lançamentos de uma só vez.
+        Cada linha é um dicionário com Data, Tipo, Descricao, Categoria, Valor e
+        MeioPagamento (padrão 'Conta'); MesAno é opcional e derivado de Data se ausente.
+        Linhas inválidas são reportadas sem abortar o restante do lote.
+        Retorna uma lista de resultados por linha: {'indice', 'sucesso', 'ID', 'erro'}.
+        """
+        results = [None] * len(rows)
+        valid_rows = []
+        valid_indexes = []
+
+        for index, row in enumerate(rows):
+            month_year = row.get('MesAno')
+            payment_method = row.get('MeioPagamento') or "Conta"
+            try:
+                if not month_year and row.get('Data'):
+                    month_year = month_year_from_date(row['Data'])
+                error = self._validate_transaction(
+                    month_year, row.get('Data'), row.get('Tipo'), row.get('Descricao'),
+                    row.get('Categoria'), row.get('Valor'), payment_method
+                )
+            except ValueError:
+                error = "Data inválida (use YYYY-MM-DD)."
+
+            if error:
+                results[index] = {'indice': index, 'sucesso': False, 'ID': None, 'erro': error}
+                continue
+
+            valid_indexes.append(index)
+            valid_rows.append({
+                'MesAno': month_year,
+                'Data': row['Data'],
+                'Tipo': row['Tipo'],
+                'Descricao': row['Descricao'],
+                'Categoria': row['Categoria'],
+                'Valor': float(row['Valor']),
+                'MeioPagamento': payment_method
+            })
+
+        for index, result in zip(valid_indexes, self.core.add_transactions_bulk(valid_rows)):
+            results[index] = {'indice': index, 'sucesso': result['sucesso'], 'ID': result['ID'], 'erro': result.get('erro')}
+        return results
+
+    def list_transactions(self, start_date: str = None, end_date: str = None, trans_type: str = None,
+                          category: str = None, payment_method: str = None, min_value: float = None,
+                          max_value: float = None, sort: str = 'data_desc', limit: int = 50, cursor: str = None):
+        """Lista lançamentos com filtros e paginação por cursor (ver CoreManager.list_transactions)."""
+        if payment_method:
+            payment_method = PAYMENT_METHODS.get(payment_method.strip().lower(), payment_method)
+        return self.core.list_transactions(start_date, end_date, trans_type, category, payment_method,
+                                           min_value, max_value, sort, limit, cursor)
+
+    def search_transactions(self, text: str, start_date: str = None, end_date: str = None, category: str = None,
+                            limit: int = 50, offset: int = 0):
+        """Pesquisa lançamentos por texto (ver CoreManager.search_transactions)."""
+        return self.core.search_transactions(text, start_date, end_date, category, limit, offset)
+
+    def import_statement(self, content: str, statement_format: str, category: str = None, payment_method: str = "Conta"):
+        """
+        Importa um extrato bancário ('csv' ou 'ofx') recebido como texto.
+        Linhas já importadas antes (mesmo HashConteudo) são ignoradas.
+        Retorna {'lidas', 'inseridas', 'duplicadas', 'invalidas', 'erros', 'detalhes'}.
+        """
+        from .statements import StatementImporter
+        return StatementImporter(self.core).import_text(content, statement_format, category, payment_method)
+
     def add_transfer_transaction(self, month_year: str, value: float, from_method: str, to_method: str):
         """
         Registra uma transferência entre meios de pagamento (Conta e Dinheiro em Mãos).
@@ -46,23 +130,31 @@ class MonthlyControlManager:
             return False
 
         today_date_str = datetime.now().strftime("%Y-%m-%d")
-        
-        # Transação de Saída (Despesa na origem)
-        success_out = self.add_transaction(
-            month_year, today_date_str, 'Despesa', 
-            f"Transferência para {to_method}", "Transferência", value, from_method
-        )
-        
-        # Transação de Entrada (Ganho no destino)
-        success_in = self.add_transaction(
-            month_year, today_date_str, 'Ganho', 
-            f"Transferência de {from_method}", "Transferência", value, to_method
-        )
-        
-        return success_out and success_in
+
+        # As duas pernas são gravadas num único commit: ou ficam ambas ou nenhuma
+        try:
+            with self.core.transaction():
+                # Transação de Saída (Despesa na origem)
+                if not self.add_transaction(
+                    month_year, today_date_str, 'Despesa',
+                    f"Transferência para {to_method}", "Transferência", value, from_method
+                ):
+                    raise RuntimeError("falha ao registrar a saída")
+
+                # Transação de Entrada (Ganho no destino)
+                if not self.add_transaction(
+                    month_year, today_date_str, 'Ganho',
+                    f"Transferência de {from_method}", "Transferência", value, to_method
+                ):
+                    raise RuntimeError("falha ao registrar a entrada")
+        except Exception as e:
+            print(f"Transferência cancelada ({e}). Nenhum lançamento foi gravado.")
+            return False
+        return True
 
     def get_transactions_for_month(self, month_year: str):
         """Retorna um DataFrame com todas as transações de um dado mês/ano."""
+        import pandas as pd
         df = self.core.get_monthly_transactions(month_year)
         # Garante que as colunas esperadas existam para evitar KeyError
         expected_cols = ['ID', 'Data', 'Tipo', 'Descricao', 'Categoria', 'Valor', 'MeioPagamento']
@@ -82,6 +174,59 @@ class MonthlyControlManager:
         balance = gains - expenses
         return gains, expenses, balance
 
+    def get_monthly_balances(self, month_year: str):
+        """
+        Retorna todos os saldos do mês a partir de uma única consulta agregada:
+        {'Ganhos', 'Despesas', 'Saldo Liquido', 'Saldo em Conta', 'Saldo em Mãos',
+         'Por Meio de Pagamento': {meio: {'Ganhos', 'Despesas', 'Saldo'}}}
+        """
+        by_method = {}
+        for method, gains_cents, expenses_cents in self.core.get_monthly_balance_totals(month_year) or []:
+            # Agrupa variações de maiúsculas/minúsculas sob o nome canónico
+            method_name = PAYMENT_METHODS.get(str(method).lower(), str(method))
+            totals = by_method.setdefault(method_name, [0, 0])
+            totals[0] += gains_cents
+            totals[1] += expenses_cents
+
+        gains_cents = sum(totals[0] for totals in by_method.values())
+        expenses_cents = sum(totals[1] for totals in by_method.values())
+
+        def balance_of(method_name):
+            gains, expenses = by_method.get(method_name, (0, 0))
+            return (gains - expenses) / 100
+
+        return {
+            'Ganhos': gains_cents / 100,
+            'Despesas': expenses_cents / 100,
+            'Saldo Liquido': (gains_cents - expenses_cents) / 100,
+            'Saldo em Conta': balance_of("Conta"),
+            'Saldo em Mãos': balance_of("Dinheiro em Mãos"),
+            'Por Meio de Pagamento': {
+                method_name: {'Ganhos': gains / 100, 'Despesas': expenses / 100, 'Saldo': (gains - expenses) / 100}
+                for method_name, (gains, expenses) in by_method.items()
+            }
+        }
+
+    def get_running_balance(self, as_of_date: str):
+        """
+        Retorna o saldo acumulado (desde o primeiro lançamento) de cada meio de
+        pagamento até a data 'as_of_date' (YYYY-MM-DD), inclusive:
+        {'Data', 'Saldos': {meio: saldo}, 'Total'}
+        """
+        totals = self.core.get_running_balance_totals(as_of_date)
+        if totals is None:
+            return None
+
+        balances = {}
+        for method, balance_cents in totals.items():
+            method_name = PAYMENT_METHODS.get(str(method).lower(), str(method))
+            balances[method_name] = balances.get(method_name, 0) + balance_cents
+        return {
+            'Data': as_of_date,
+            'Saldos': {method_name: cents / 100 for method_name, cents in balances.items()},
+            'Total': sum(balances.values()) / 100
+        }
+
     def calculate_detailed_balance(self, month_year: str, payment_method: str):
         """
         Calcula o saldo (ganhos - despesas) para um meio de pagamento específico.
@@ -101,10 +246,9 @@ class MonthlyControlManager:
     def update_transaction(self, month_year: str, transaction_id: str, new_data: dict):
         """Atualiza um lançamento existente."""
         if 'MeioPagamento' not in new_data:
-            current_df = self.get_transactions_for_month(month_year)
-            current_trans = current_df[current_df['ID'].astype(str) == transaction_id]
-            if not current_trans.empty and 'MeioPagamento' in current_trans.columns:
-                new_data['MeioPagamento'] = current_trans.iloc[0]['MeioPagamento']
+            current_trans = self.core.get_transaction(transaction_id)
+            if current_trans and current_trans['MeioPagamento']:
+                new_data['MeioPagamento'] = current_trans['MeioPagamento']
             else:
                 new_data['MeioPagamento'] = "Conta" # Padrão se não encontrar
 
@@ -114,21 +258,26 @@ class MonthlyControlManager:
         """Exclui um lançamento."""
         return self.core.delete_transaction(month_year, transaction_id)
 
+    def get_transaction(self, transaction_id: str):
+        """Retorna um lançamento pelo ID (dicionário) ou None se não existir."""
+        return self.core.get_transaction(transaction_id)
+
     def get_monthly_gains_expenses(self, month_year: str):
         """Retorna os totais de ganhos e despesas para o gráfico."""
-        df = self.get_transactions_for_month(month_year)
-        if df.empty:
-            return {'Ganhos': 0, 'Despesas': 0}
-        
-        gains = df[df['Tipo'].astype(str).str.lower() == 'ganho']['Valor'].sum()
-        expenses = df[df['Tipo'].astype(str).str.lower() == 'despesa']['Valor'].sum()
-        return {'Ganhos': gains, 'Despesas': expenses}
+        balances = self.get_monthly_balances(month_year)
+        return {'Ganhos': balances['Ganhos'], 'Despesas': balances['Despesas']}
 
     def get_expenses_by_category(self, month_year: str):
-        """Retorna as despesas por categoria para o gráfico."""
-        df = self.get_transactions_for_month(month_year)
-        if df.empty:
+        """Retorna as despesas por categoria para o gráfico (lidas de MonthlyAggregates)."""
+        import pandas as pd
+        totals = self.core.get_monthly_category_totals(month_year)
+        if not totals:
             return pd.Series(dtype=float)
-        
-        expenses_df = df[df['Tipo'].astype(str).str.lower() == 'despesa']
-        return expenses_df.groupby('Categoria')['Valor'].sum().sort_values(ascending=False)
\ No newline at end of file
+
+        expenses = {}
+        for trans_type, category, total_cents in totals:
+            if trans_type == 'despesa':
+                expenses[category] = expenses.get(category, 0) + total_cents
+        series = pd.Series({category: cents / 100 for category, cents in expenses.items()}, dtype=float, name='Valor')
+        series.index.name = 'Categoria'
+        return series.sort_values(ascending=False)
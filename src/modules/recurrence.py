@@ -0,0 +1,121 @@
+# src/modules/recurrence.py
+
+"""
+Expansão das regras de dívidas recorrentes (tabela RecorrenciasDividas).
+
+Uma regra guarda apenas o início, a frequência e o número de ocorrências; as
+ocorrências de um período são calculadas aqui, sob pedido, por geradores.
+Cada ocorrência tem um ID virtual estável, '<ID da regra>:<YYYY-MM-DD>' (a data
+original da ocorrência), que passa a ser o ID real da linha em Dividas quando
+a ocorrência é paga ou editada.
+"""
+
+import calendar
+from datetime import date, datetime
+
+RECURRENCE_FREQUENCIES = ('Mensal', 'Anual')
+
+# Valores de Recorrencia aceites (sem distinguir maiúsculas) -> valor canónico
+RECURRENCE_ALIASES = {'unica': 'Unica', 'única': 'Unica', 'mensal': 'Mensal', 'anual': 'Anual'}
+
+
+def normalize_recurrence(value):
+    """Retorna o valor canónico de uma Recorrencia ('Unica', 'Mensal' ou 'Anual'), ou None se não for reconhecido."""
+    return RECURRENCE_ALIASES.get(str(value or '').strip().lower())
+
+
+def _to_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def nth_occurrence(frequency: str, start, index: int):
+    """
+    Data da ocorrência número 'index' (0 = a primeira) de uma regra.
+    O dia do mês é o do início, limitado ao último dia do mês (31/01 -> 28/02 -> 31/03).
+    """
+    start = _to_date(start)
+    if frequency == 'Mensal':
+        year, month = start.year + (start.month - 1 + index) // 12, (start.month - 1 + index) % 12 + 1
+    elif frequency == 'Anual':
+        year, month = start.year + index, start.month
+    else:
+        raise ValueError(f"Frequência de recorrência inválida: {frequency}.")
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def last_occurrence(frequency: str, start, count: int):
+    """Data da última de 'count' ocorrências (usada para preencher DataFim)."""
+    return nth_occurrence(frequency, start, count - 1)
+
+
+def occurrence_dates(frequency: str, start, count: int = None, until=None, window_start=None, window_end=None):
+    """
+    Gera as datas das ocorrências da regra dentro de [window_start, window_end]
+    (limites opcionais e inclusivos), em ordem cronológica. A regra termina
+    após 'count' ocorrências ou em 'until', o que vier primeiro; pelo menos um
+    dos dois (ou window_end) tem de ser indicado.
+    """
+    start, until = _to_date(start), _to_date(until)
+    window_start, window_end = _to_date(window_start), _to_date(window_end)
+    if count is None and until is None and window_end is None:
+        raise ValueError("Regra sem fim: indique 'count', 'until' ou 'window_end'.")
+
+    index = 0
+    if window_start and window_start > start:
+        # Salta diretamente para perto do início da janela
+        months = (window_start.year - start.year) * 12 + window_start.month - start.month
+        index = max(0, (months if frequency == 'Mensal' else months // 12) - 1)
+
+    while count is None or index < count:
+        current = nth_occurrence(frequency, start, index)
+        if (until and current > until) or (window_end and current > window_end):
+            return
+        if not window_start or current >= window_start:
+            yield current
+        index += 1
+
+
+def occurrence_id(rule_id: str, occurrence_date):
+    """ID virtual de uma ocorrência: '<ID da regra>:<YYYY-MM-DD>'."""
+    return f"{rule_id}:{_to_date(occurrence_date).isoformat()}"
+
+
+def parse_occurrence_id(debt_id: str):
+    """Retorna (ID da regra, data da ocorrência) de um ID virtual, ou None se não for um."""
+    rule_id, _, occurrence = str(debt_id).rpartition(':')
+    if not rule_id:
+        return None
+    try:
+        return rule_id, _to_date(occurrence)
+    except ValueError:
+        return None
+
+
+def expand_rule(rule: dict, window_start=None, window_end=None, skip=(), today=None):
+    """
+    Gera as ocorrências ainda não materializadas de uma regra (dicionário com as
+    colunas de RecorrenciasDividas) no formato das linhas de Dividas.
+    'skip' são as datas de ocorrência a ignorar (já materializadas ou excluídas).
+    Ocorrências em aberto com vencimento anterior a 'today' têm status 'Atrasado'.
+    """
+    today = _to_date(today) or date.today()
+    for current in occurrence_dates(rule['Frequencia'], rule['DataInicio'], rule['NumOcorrencias'],
+                                    rule['DataFim'], window_start, window_end):
+        iso_date = current.isoformat()
+        if iso_date in skip:
+            continue
+        status = rule['Status']
+        if str(status).lower() == 'aberto' and current < today:
+            status = 'Atrasado'
+        yield {
+            'ID': occurrence_id(rule['ID'], current),
+            'Descricao': rule['Descricao'],
+            'Valor': rule['Valor'],
+            'DataVencimento': iso_date,
+            'Status': status,
+            'Recorrencia': rule['Frequencia'],
+            'RecorrenciaMeses': rule['NumOcorrencias'] or 0,
+            'Categoria': rule['Categoria'],
+        }
@@ -1,11 +1,7 @@
-import pandas as pd
 from datetime import datetime
-import openpyxl 
 import os 
-from fpdf import FPDF
-import sqlite3
 
-from .core import CoreManager, DB_FILE
+from .core import CoreManager, UNCATEGORIZED_LABEL
 from .monthly_control import MonthlyControlManager
 
 class ReportManager:
@@ -13,80 +9,54 @@ class ReportManager:
         self.core = core_manager
         self.monthly_control = monthly_control_manager 
 
-    def _get_all_transaction_sheets(self):
-        if not os.path.exists(DB_FILE): 
-            print(f"Aviso: Arquivo de banco de dados '{DB_FILE}' não encontrado.")
-            return []
-            
-        try:
-            with sqlite3.connect(DB_FILE) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT DISTINCT MesAno FROM Transacoes;")
-                monthly_sheets = [item[0] for item in cursor.fetchall()]
-                return monthly_sheets
-        except Exception as e:
-            print(f"Erro ao listar 'MesAno' da tabela Transacoes: {e}")
-            return []
-
     def get_all_transactions_in_period(self, start_date: datetime, end_date: datetime):
-
-        all_transactions_df = pd.DataFrame()
-        
-        all_sheets = self._get_all_transaction_sheets() 
-
-        start_ts = pd.Timestamp(start_date)
-        end_ts = pd.Timestamp(end_date)
-
-        for sheet_name in all_sheets:
-            try:
-                sheet_month_year_dt = datetime.strptime(sheet_name, "%m-%Y")
-                
-                sheet_start_date_dt = sheet_month_year_dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                
-                next_month_dt = (pd.Timestamp(sheet_month_year_dt) + pd.DateOffset(months=1)).to_pydatetime()
-                sheet_end_date_dt = (next_month_dt - pd.DateOffset(days=1)).replace(hour=23, minute=59, second=59, microsecond=999999)
-
-                sheet_start_ts = pd.Timestamp(sheet_start_date_dt)
-                sheet_end_ts = pd.Timestamp(sheet_end_date_dt)
-
-                if not (sheet_end_ts < start_ts or sheet_start_ts > end_ts):
-                
-                    month_df = self.core.get_monthly_transactions(sheet_name) 
-                    
-                    if not month_df.empty:
-                        if 'Data' in month_df.columns:
-                            month_df['Data'] = pd.to_datetime(month_df['Data'], errors='coerce')
-                        else:
-                            print(f"Aviso: Aba '{sheet_name}' não possui coluna 'Data'. Ignorando.")
-                            continue
-
-                        if 'Valor' in month_df.columns:
-                            month_df['Valor'] = pd.to_numeric(month_df['Valor'], errors='coerce')
-                        else:
-                            print(f"Aviso: Aba '{sheet_name}' não possui coluna 'Valor'. Ignorando.")
-                            continue
-                        
-                        expected_cols = ['ID', 'Data', 'Tipo', 'Descricao', 'Categoria', 'Valor', 'MeioPagamento']
-                        for col in expected_cols:
-                            if col not in month_df.columns:
-                                month_df[col] = "Conta" if col == 'MeioPagamento' else None 
-
-                        month_df_filtered = month_df[(month_df['Data'] >= start_ts) & (month_df['Data'] <= end_ts)]
-                        all_transactions_df = pd.concat([all_transactions_df, month_df_filtered[expected_cols]], ignore_index=True)
-            
-            except ValueError as ve:
-                print(f"Aviso: Problema de formato de data na aba '{sheet_name}' ou nome de aba inválido: {ve}")
-                continue 
-            except Exception as e:
-                print(f"Erro ao processar aba '{sheet_name}' para relatório: {e}")
-                continue
-        
-        if not all_transactions_df.empty and 'Data' in all_transactions_df.columns:
-            return all_transactions_df.dropna(subset=['Data'])
-        return all_transactions_df
+        """Retorna todas as transações com data entre start_date e end_date (inclusive)."""
+        return self.core.get_transactions_in_period(start_date, end_date)
 
     def generate_financial_summary(self, start_date: datetime, end_date: datetime, category: str = None):
+        """
+        Resume ganhos e despesas do período (opcionalmente de uma única categoria).
+        As somas são feitas no SQLite (GROUP BY Tipo, Categoria); se a agregação
+        falhar, o resumo é calculado em pandas a partir das transações brutas.
+        Os dois caminhos produzem o mesmo resumo; lançamentos sem categoria
+        aparecem como UNCATEGORIZED_LABEL.
+        """
+        summary = self._generate_summary_from_sql(start_date, end_date, category)
+        if summary is not None:
+            return summary
+        return self._generate_summary_from_dataframe(start_date, end_date, category)
+
+    def _generate_summary_from_sql(self, start_date: datetime, end_date: datetime, category: str = None):
+        import pandas as pd
+        if category and category.lower() == "todas":
+            category = None
+        totals = self.core.get_transaction_totals(start_date, end_date, category)
+        if totals is None:
+            return None
+
+        gains_by_category = {}
+        expenses_by_category = {}
+        for trans_type, category_name, total_cents in totals:
+            target = gains_by_category if trans_type == 'ganho' else expenses_by_category
+            target[category_name] = target.get(category_name, 0) + total_cents
+
+        def to_series(cents_by_category):
+            series = pd.Series({cat: cents / 100 for cat, cents in cents_by_category.items()}, dtype=float, name='Valor')
+            series.index.name = 'Categoria'
+            return series.sort_values(ascending=False)
+
+        total_gains = sum(gains_by_category.values()) / 100
+        total_expenses = sum(expenses_by_category.values()) / 100
+        return {
+            'Ganhos Totais': total_gains,
+            'Despesas Totais': total_expenses,
+            'Saldo Total': total_gains - total_expenses,
+            'Despesas por Categoria': to_series(expenses_by_category),
+            'Ganhos por Categoria': to_series(gains_by_category)
+        }
 
+    def _generate_summary_from_dataframe(self, start_date: datetime, end_date: datetime, category: str = None):
+        import pandas as pd
         transactions_df = self.get_all_transactions_in_period(start_date, end_date)
         
         if transactions_df.empty:
@@ -98,6 +68,7 @@ class ReportManager:
                 'Ganhos por Categoria': pd.Series(dtype=float)
             }
 
+        transactions_df = transactions_df.assign(Categoria=transactions_df['Categoria'].fillna(UNCATEGORIZED_LABEL))
         if category and category.lower() != "todas":
             transactions_df = transactions_df[transactions_df['Categoria'].astype(str).str.lower() == category.lower()]
             if transactions_df.empty: 
@@ -169,6 +140,7 @@ class ReportManager:
         """Exporta o resumo financeiro para um arquivo PDF.
         (Este método foi corrigido)
         """
+        from fpdf import FPDF
         try:
             if not os.path.exists('data'):
                 os.makedirs('data')
@@ -0,0 +1,235 @@
+# src/modules/statements.py
+
+"""
+Importação de extratos bancários (CSV e OFX) para a tabela Transacoes.
+
+Os extratos são lidos por geradores, linha a linha (CSV) ou movimento a
+movimento (OFX), e inseridos em blocos de 'chunk_size' (ver IMPORT_QUERIES em core.py).
+Cada linha recebe um HashConteudo (data, valor, descrição, meio de pagamento e
+FITID do OFX ou, na falta dele, a ordem de ocorrência de linhas iguais no
+extrato). O índice único sobre HashConteudo faz com que reimportar um extrato
+sobreposto ignore as linhas já existentes com uma consulta ao índice por linha;
+linhas malformadas (ex.: sem MesAno) são contadas como erro, não como duplicadas.
+
+Executar com: python -m src.modules.statements extrato.csv|extrato.ofx [--categoria X] [--meio Conta]
+"""
+
+import csv
+import hashlib
+import re
+import uuid
+from datetime import datetime
+
+from .core import CoreManager, to_cents
+from .monthly_control import PAYMENT_METHODS
+
+DEFAULT_CHUNK_SIZE = 500
+STATEMENT_FORMATS = ('csv', 'ofx')
+
+# Coluna da tabela -> nomes aceites no cabeçalho do CSV (minúsculas, sem acentos)
+CSV_COLUMN_ALIASES = {
+    'Data': ('data', 'date', 'data lancamento', 'data do lancamento', 'data movimento', 'data da transacao'),
+    'Descricao': ('descricao', 'historico', 'lancamento', 'description', 'memo', 'estabelecimento', 'titulo'),
+    'Valor': ('valor', 'valor (r$)', 'amount', 'value', 'quantia'),
+}
+CSV_DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%y')
+
+_OFX_TRANSACTION = re.compile(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))', re.S | re.I)
+_OFX_FIELD = re.compile(r'<(\w+)>([^<\r\n]*)')
+_OFX_ACCOUNT = re.compile(r'<ACCTID>([^<\r\n]*)', re.I)
+
+
+def _normalize_header(name: str):
+    return (name or '').strip().lower().translate(str.maketrans('áàâãéêíóôõúç', 'aaaaeeiooouc'))
+
+
+def parse_amount(text):
+    """Converte '1.234,56', '-50.00', 'R$ 10,00' ou '(10,00)' em float. Retorna None se inválido."""
+    text = str(text or '').replace('R$', '').replace(' ', '').strip()
+    if not text:
+        return None
+    negative = text.startswith('(') and text.endswith(')')
+    text = text.strip('()')
+    if ',' in text and '.' in text:
+        # O último separador é o decimal
+        text = text.replace('.', '').replace(',', '.') if text.rfind(',') > text.rfind('.') else text.replace(',', '')
+    elif ',' in text:
+        text = text.replace(',', '.')
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+def parse_date(text, formats=CSV_DATE_FORMATS):
+    """Converte a data do extrato em 'YYYY-MM-DD'. Retorna None se inválida."""
+    text = str(text or '').strip()[:10]
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def parse_csv(lines):
+    """
+    Gera {'Data', 'Descricao', 'Valor', 'FITID'} para cada linha de um extrato CSV.
+    'lines' é qualquer iterável de linhas de texto (ficheiro aberto, str.splitlines()...).
+    O separador (',', ';' ou tabulação) é detetado pelo cabeçalho. Linhas inválidas
+    geram {'erro': ...} em vez de interromper a leitura.
+    """
+    lines = iter(lines)
+    header_line = next(lines, None)
+    if header_line is None:
+        return
+    delimiter = max(',;\t', key=header_line.count)
+    header = [_normalize_header(name) for name in next(csv.reader([header_line], delimiter=delimiter))]
+
+    positions = {}
+    for column, aliases in CSV_COLUMN_ALIASES.items():
+        for index, name in enumerate(header):
+            if name in aliases:
+                positions[column] = index
+                break
+    missing = [column for column in CSV_COLUMN_ALIASES if column not in positions]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(missing)}.")
+
+    for line_number, row in enumerate(csv.reader(lines, delimiter=delimiter), start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        try:
+            data = {column: row[index] for column, index in positions.items()}
+        except IndexError:
+            yield {'linha': line_number, 'erro': "Número de colunas inválido."}
+            continue
+        yield {
+            'linha': line_number,
+            'Data': parse_date(data['Data']),
+            'Descricao': data['Descricao'].strip(),
+            'Valor': parse_amount(data['Valor']),
+            'FITID': None,
+        }
+
+
+def parse_ofx(text: str):
+    """
+    Gera {'Data', 'Descricao', 'Valor', 'FITID'} para cada <STMTTRN> de um extrato OFX
+    (SGML 1.x, sem tags de fecho, ou XML 2.x).
+    """
+    account = _OFX_ACCOUNT.search(text)
+    account_id = account.group(1).strip() if account else ''
+    for number, match in enumerate(_OFX_TRANSACTION.finditer(text), start=1):
+        fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(match.group(1))}
+        fitid = fields.get('FITID')
+        yield {
+            'linha': number,
+            'Data': parse_date(fields.get('DTPOSTED', '')[:8], ('%Y%m%d',)),
+            'Descricao': fields.get('MEMO') or fields.get('NAME') or '',
+            'Valor': parse_amount(fields.get('TRNAMT')),
+            'FITID': f"{account_id}:{fitid}" if fitid else None,
+        }
+
+
+def content_hash(entry: dict, payment_method: str, occurrence: int):
+    """Hash que identifica uma linha de extrato entre importações."""
+    identity = entry['FITID'] or f"#{occurrence}"
+    key = f"{entry['Data']}|{to_cents(entry['Valor'])}|{entry['Descricao'].strip().lower()}|{payment_method}|{identity}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class StatementImporter:
+    def __init__(self, core_manager: CoreManager, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.core = core_manager
+        self.chunk_size = max(1, chunk_size)
+
+    def _records(self, entries, category: str, payment_method: str, result: dict):
+        """Converte as linhas do extrato em registos de Transacoes, contando as inválidas."""
+        occurrences = {}
+        for entry in entries:
+            result['lidas'] += 1
+            if 'erro' in entry or not entry['Data'] or not entry['Valor']:
+                result['invalidas'] += 1
+                result['detalhes'].append({'linha': entry['linha'], 'erro': entry.get('erro', "Data ou valor inválido.")})
+                continue
+
+            # Linhas idênticas sem FITID (duas compras iguais no mesmo dia) distinguem-se pela ordem
+            key = (entry['Data'], entry['Valor'], entry['Descricao'])
+            occurrences[key] = occurrences.get(key, 0) + 1
+
+            yield {
+                'ID': str(uuid.uuid4()),
+                'MesAno': datetime.strptime(entry['Data'], '%Y-%m-%d').strftime('%m-%Y'),
+                'Data': entry['Data'],
+                'Tipo': 'Ganho' if entry['Valor'] > 0 else 'Despesa',
+                'Descricao': entry['Descricao'],
+                'Categoria': category,
+                'Valor': abs(entry['Valor']),
+                'MeioPagamento': payment_method,
+                'HashConteudo': content_hash(entry, payment_method, occurrences[key]),
+            }
+
+    def _flush(self, chunk: list, result: dict):
+        outcome = self.core.import_rows('Transacoes', chunk)
+        if outcome is None:
+            result['erros'] += len(chunk)
+            return
+        inserted, errors = outcome
+        result['inseridas'] += inserted
+        result['erros'] += len(errors)
+        result['duplicadas'] += len(chunk) - inserted - len(errors)
+
+    def import_entries(self, entries, category: str = None, payment_method: str = "Conta"):
+        """
+        Insere as linhas geradas por parse_csv/parse_ofx em blocos.
+        Retorna {'lidas', 'inseridas', 'duplicadas', 'invalidas', 'erros', 'detalhes'}.
+        """
+        result = {'lidas': 0, 'inseridas': 0, 'duplicadas': 0, 'invalidas': 0, 'erros': 0, 'detalhes': []}
+        payment_method = PAYMENT_METHODS.get(str(payment_method).strip().lower(), payment_method)
+        chunk = []
+        for record in self._records(entries, category, payment_method, result):
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk, result)
+                chunk = []
+        if chunk:
+            self._flush(chunk, result)
+        print(f"Extrato importado: {result['inseridas']} inserida(s), {result['duplicadas']} já existente(s), "
+              f"{result['invalidas']} inválida(s), {result['erros']} com erro.")
+        return result
+
+    def import_text(self, content: str, statement_format: str, category: str = None, payment_method: str = "Conta"):
+        """Importa um extrato recebido como texto ('csv' ou 'ofx')."""
+        if statement_format == 'csv':
+            entries = parse_csv(content.splitlines())
+        elif statement_format == 'ofx':
+            entries = parse_ofx(content)
+        else:
+            raise ValueError(f"Formato de extrato desconhecido: {statement_format}.")
+        return self.import_entries(entries, category, payment_method)
+
+    def import_file(self, path: str, category: str = None, payment_method: str = "Conta", encoding: str = 'utf-8-sig'):
+        """Importa um ficheiro .csv (lido linha a linha) ou .ofx."""
+        with open(path, encoding=encoding, errors='replace', newline='') as file:
+            if path.lower().endswith('.ofx'):
+                return self.import_entries(parse_ofx(file.read()), category, payment_method)
+            return self.import_entries(parse_csv(file), category, payment_method)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa um extrato bancário (CSV ou OFX) para o banco SQLite.")
+    parser.add_argument('path', help="caminho do ficheiro .csv ou .ofx")
+    parser.add_argument('--categoria', default=None, help="categoria atribuída a todas as linhas")
+    parser.add_argument('--meio', default="Conta", help="meio de pagamento (padrão: Conta)")
+    parser.add_argument('--encoding', default='utf-8-sig', help="codificação do ficheiro (ex.: latin-1)")
+    args = parser.parse_args()
+
+    core = CoreManager()
+    try:
+        StatementImporter(core).import_file(args.path, args.categoria, args.meio, args.encoding)
+    finally:
+        core.close()
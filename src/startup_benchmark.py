@@ -0,0 +1,92 @@
+# src/startup_benchmark.py
+
+"""
+Mede o custo de importação dos pontos de entrada (API e interface desktop)
+com 'python -X importtime' e falha (código de saída 1) se:
+  - um módulo pesado (pandas, matplotlib, openpyxl, fpdf) voltar a ser
+    importado no arranque, ou
+  - o tempo total de importação ultrapassar o limite configurado.
+
+Executar com: python -m src.startup_benchmark [--runs 3] [--max-ms 1500]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Módulos que só devem ser carregados quando o código que os usa é executado
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib', 'openpyxl', 'fpdf')
+
+# Ponto de entrada -> limite de tempo de importação (ms)
+ENTRY_POINTS = {
+    'api_main': 1500,
+    'src.ui.main_window': 1000,
+}
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def measure_import(module: str, db_file: str):
+    """
+    Importa 'module' num processo novo com -X importtime.
+    Retorna (tempo total em ms, conjunto de módulos importados).
+    Levanta RuntimeError se a importação falhar.
+    """
+    env = dict(os.environ, FINANCAS_DB_FILE=db_file)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=_REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'erro desconhecido')
+
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        # Formato: "import time: <self us> | <cumulativo us> | <indentação><módulo>"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported.add(name.strip())
+        if not name[1:].startswith(' '): # módulo de nível superior
+            total_us += int(cumulative)
+    return total_us / 1000, imported
+
+
+def run_benchmark(runs: int = 3, max_ms: float = None):
+    """Mede cada ponto de entrada (melhor de 'runs') e retorna a lista de falhas."""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'benchmark.db')
+        for module, default_limit in ENTRY_POINTS.items():
+            limit = max_ms if max_ms is not None else default_limit
+            try:
+                measurements = [measure_import(module, db_file) for _ in range(runs)]
+            except RuntimeError as e:
+                failures.append(f"{module}: falha ao importar ({e})")
+                print(f"{module:>20}: falha ao importar ({e})")
+                continue
+
+            best_ms = min(elapsed for elapsed, _ in measurements)
+            heavy = sorted(m for m in HEAVY_MODULES if m in measurements[0][1])
+            print(f"{module:>20}: {best_ms:>8.1f} ms (limite {limit} ms) | pesados: {', '.join(heavy) or 'nenhum'}")
+
+            if heavy:
+                failures.append(f"{module}: importa no arranque {', '.join(heavy)}")
+            if best_ms > limit:
+                failures.append(f"{module}: {best_ms:.1f} ms excede o limite de {limit} ms")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica o tempo de importação dos pontos de entrada.")
+    parser.add_argument('--runs', type=int, default=3, help="número de medições por ponto de entrada")
+    parser.add_argument('--max-ms', type=float, default=None, help="limite único (ms) para todos os pontos de entrada")
+    args = parser.parse_args()
+
+    failures = run_benchmark(args.runs, args.max_ms)
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    sys.exit(1 if failures else 0)
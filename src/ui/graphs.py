@@ -1,20 +1,33 @@
 # src/ui/graphs.py
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg #, NavigationToolbar2TkAgg
-import pandas as pd
 import tkinter as tk
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class GraphPlotter:
     def __init__(self, master_frame):
         self.master_frame = master_frame
-        self.figure = plt.Figure(figsize=(5, 4), dpi=100)
+        self.figure = None
+        self.ax = None
+        self.canvas = None
+
+    def _ensure_canvas(self):
+        """Cria a figura no primeiro desenho; o matplotlib só é importado aqui."""
+        if self.canvas is not None:
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg #, NavigationToolbar2TkAgg
+
+        self.figure = Figure(figsize=(5, 4), dpi=100)
         self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.master_frame)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
     def clear_plot(self):
+        self._ensure_canvas()
         self.ax.clear()
         self.figure.canvas.draw_idle()
 
@@ -30,7 +43,10 @@ class GraphPlotter:
         self.figure.tight_layout()
         self.canvas.draw()
 
-    def plot_expenses_by_category(self, expenses_by_category: pd.Series):
+    def plot_expenses_by_category(self, expenses_by_category: "pd.Series"):
+        from matplotlib import colormaps
+        from matplotlib.patches import Circle
+
         self.clear_plot()
         if expenses_by_category.empty:
             self.ax.text(0.5, 0.5, "Sem despesas por categoria para exibir", 
@@ -44,10 +60,10 @@ class GraphPlotter:
 
         # Para um gráfico de pizza, você pode ajustar as cores e formatar porcentagens
         self.ax.pie(values, labels=categories, autopct='%1.1f%%', startangle=90, 
-                    pctdistance=0.85, wedgeprops=dict(width=0.4), colors=plt.cm.Paired.colors)
+                    pctdistance=0.85, wedgeprops=dict(width=0.4), colors=colormaps['Paired'].colors)
         
         # Desenha um círculo central para fazer um donut chart
-        centre_circle = plt.Circle((0,0),0.70,fc='white')
+        centre_circle = Circle((0,0),0.70,fc='white')
         self.ax.add_artist(centre_circle)
 
         self.ax.set_title('Despesas por Categoria')
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
 from datetime import datetime, timedelta
-import pandas as pd
 
 # Importar os módulos de gerenciamento
 from src.modules.core import CoreManager, DEFAULT_CATEGORIES_SHEET, DEFAULT_BUDGET_SHEET, DEFAULT_LOANS_SHEET, DEFAULT_DEBTS_SHEET 
@@ -68,6 +67,7 @@ class FinanceApp(tk.Tk):
     def _on_closing(self):
         """Método chamado ao tentar fechar a janela, garantindo o salvamento final."""
         self._manual_save_all_data(show_message=False)
+        self.core_manager.close()
         self.destroy()
 
     def _create_widgets(self):
@@ -136,6 +136,7 @@ class FinanceApp(tk.Tk):
         """Tenta salvar explicitamente todos os dados em todas as abas principais.
            show_message: Se True, exibe messagebox de sucesso/erro.
         """
+        import pandas as pd
         success_all = True
         
         try:
@@ -380,6 +381,7 @@ class FinanceApp(tk.Tk):
             self.balance_label.config(foreground="black") # Preto
 
     def _update_monthly_view(self):
+        import pandas as pd
         transactions_df = self.monthly_control_manager.get_transactions_for_month(self._current_month_year)
         
         for item in self.monthly_tree.get_children():
@@ -417,9 +419,8 @@ class FinanceApp(tk.Tk):
         self.style.configure('evenrow', background='#F0F0F0')
         self.style.configure('oddrow', background='#FFFFFF')
 
-        # --- CORREÇÃO E OTIMIZAÇÃO AQUI ---
-        # 1. Busca os dados UMA VEZ usando o método correto
-        balances_and_gains_data = self.monthly_control_manager.get_monthly_gains_expenses(self._current_month_year)
+        # 1. Busca todos os saldos do mês numa única consulta agregada
+        balances_and_gains_data = self.monthly_control_manager.get_monthly_balances(self._current_month_year)
         
         # 2. Passa os dados para atualizar os labels de saldo
         self._update_balances_display(balances_and_gains_data)
@@ -507,15 +508,11 @@ class FinanceApp(tk.Tk):
         if not item_id:
             return
 
-        transactions_df = self.monthly_control_manager.get_transactions_for_month(self._current_month_year)
-        transaction_data_series = transactions_df[transactions_df['ID'].astype(str) == item_id]
-        
-        if transaction_data_series.empty:
+        transaction_data = self.monthly_control_manager.get_transaction(item_id)
+        if transaction_data is None:
             messagebox.showerror("Erro", "Lançamento não encontrado para edição.")
             return
 
-        transaction_data = transaction_data_series.iloc[0].to_dict()
-
         payment_methods = ["Conta", "Dinheiro em Mãos"]
         dialog = AddEditTransactionDialog(self, self.category_manager.get_all_categories(), transaction_data, payment_methods=payment_methods)
         self.wait_window(dialog)
@@ -575,6 +572,7 @@ class FinanceApp(tk.Tk):
 
     def _display_debt_reminders(self, upcoming_debts_df):
         """Mostra os lembretes de dívidas no frame de lembretes."""
+        import pandas as pd
         # Limpa o frame correto
         for widget in self.debt_reminders_frame.winfo_children(): # <-- CORRIGIDO
             widget.destroy()
@@ -1105,6 +1103,7 @@ class FinanceApp(tk.Tk):
         self._edit_selected_loan()
 
     def _update_loans_view(self):
+        import pandas as pd
         for item in self.loans_tree.get_children():
             self.loans_tree.delete(item)
 
@@ -1280,6 +1279,7 @@ class FinanceApp(tk.Tk):
             self.debts_category_combo.set(categories[0])
 
     def _update_debts_view(self):
+        import pandas as pd
         for item in self.debts_tree.get_children():
             self.debts_tree.delete(item)
 
@@ -1322,9 +1322,11 @@ class FinanceApp(tk.Tk):
         if not debt_id:
             return
 
-        debt_details = self.debt_manager.get_all_debts()
-        debt_row = debt_details[debt_details['ID'].astype(str) == debt_id].iloc[0]
-        
+        debt_row = self.debt_manager.get_debt(debt_id)
+        if debt_row is None:
+            messagebox.showerror("Erro", "Dívida não encontrada.")
+            return
+
         if str(debt_row['Status']).lower() == 'pago':
             messagebox.showinfo("Dívida já Paga", "Esta dívida já foi marcada como paga.")
             return
@@ -1343,8 +1345,10 @@ class FinanceApp(tk.Tk):
         if not debt_id:
             return
 
-        debt_details = self.debt_manager.get_all_debts()
-        debt_row = debt_details[debt_details['ID'].astype(str) == debt_id].iloc[0].to_dict()
+        debt_row = self.debt_manager.get_debt(debt_id)
+        if debt_row is None:
+            messagebox.showerror("Erro", "Dívida não encontrada para edição.")
+            return
 
         edit_dialog = tk.Toplevel(self)
         edit_dialog.title(f"Editar Dívida: {debt_row['Descricao']}")
@@ -1365,8 +1369,8 @@ class FinanceApp(tk.Tk):
         ttk.Label(edit_dialog, text="Vencimento:").grid(row=2, column=0, sticky=tk.W, pady=5, padx=5)
         due_date_entry = DateEntry(edit_dialog, width=38, background='light gray', foreground='black', borderwidth=1,
                                     date_pattern='dd/mm/yyyy', locale='pt_BR')
-        if pd.notna(debt_row['DataVencimento']):
-            due_date_entry.set_date(debt_row['DataVencimento'])
+        if debt_row['DataVencimento']:
+            due_date_entry.set_date(datetime.strptime(str(debt_row['DataVencimento'])[:10], "%Y-%m-%d").date())
         due_date_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=5)
 
         ttk.Label(edit_dialog, text="Recorrência:").grid(row=3, column=0, sticky=tk.W, pady=5, padx=5)
@@ -1377,7 +1381,7 @@ class FinanceApp(tk.Tk):
 
         ttk.Label(edit_dialog, text="Nº de Meses (para recorrência):").grid(row=4, column=0, sticky=tk.W, pady=5, padx=5)
         recurrence_months_entry = ttk.Entry(edit_dialog, width=38)
-        if 'RecorrenciaMeses' in debt_row and pd.notna(debt_row['RecorrenciaMeses']):
+        if debt_row['RecorrenciaMeses'] is not None:
             recurrence_months_entry.insert(0, str(int(debt_row['RecorrenciaMeses'])))
         else:
             recurrence_months_entry.insert(0, "1")
@@ -1452,8 +1456,10 @@ class FinanceApp(tk.Tk):
         if not debt_id:
             return
 
-        debt_details = self.debt_manager.get_all_debts()
-        debt_row = debt_details[debt_details['ID'].astype(str) == debt_id].iloc[0]
+        debt_row = self.debt_manager.get_debt(debt_id)
+        if debt_row is None:
+            messagebox.showerror("Erro", "Dívida não encontrada.")
+            return
         description = debt_row['Descricao']
 
         if messagebox.askyesno("Confirmar Exclusão", f"Tem certeza que deseja excluir a dívida '{description}'?"):
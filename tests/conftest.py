@@ -0,0 +1,22 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.modules import core  # noqa: E402
+
+
+@pytest.fixture
+def core_manager(tmp_path, monkeypatch):
+    """CoreManager sobre uma base vazia e temporária (as migrações são aplicadas na criação)."""
+    db_file = str(tmp_path / 'financas.db')
+    monkeypatch.setenv(core.DB_FILE_ENV_VAR, db_file)
+    # DB_FILE é lido na importação do módulo; a variável de ambiente só vale para novos processos
+    monkeypatch.setattr(core, 'DB_FILE', db_file)
+    manager = core.CoreManager()
+    yield manager
+    manager.close()
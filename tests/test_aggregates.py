@@ -0,0 +1,24 @@
+# tests/test_aggregates.py
+
+from src.modules.monthly_control import MonthlyControlManager
+
+
+def _add(core_manager, value):
+    assert MonthlyControlManager(core_manager).add_transaction('01-2025', '2025-01-10', 'Despesa', 'X', 'Outros', value)
+
+
+def test_aggregates_are_consistent_after_writes(core_manager):
+    for value in (10.0, 1.005, 0.1, 2.675):
+        _add(core_manager, value)
+    assert core_manager.verify_monthly_aggregates() == 0
+
+
+def test_cents_drift_is_detected_and_repaired(core_manager):
+    _add(core_manager, 10.0)
+    conn = core_manager._create_connection()
+    conn.execute("UPDATE Transacoes SET Valor = 12.5;")  # escrita fora do CoreManager
+    assert core_manager.verify_monthly_aggregates() == 1
+
+    assert core_manager.rebuild_monthly_aggregates()
+    assert core_manager.verify_monthly_aggregates() == 0
+    assert conn.execute("SELECT ValorCentavos FROM Transacoes;").fetchone()[0] == 1250
@@ -0,0 +1,108 @@
+# tests/test_cache.py
+
+import sqlite3
+import threading
+
+import pytest
+
+from src.modules.monthly_control import MonthlyControlManager
+
+
+def _in_thread(target):
+    errors = []
+
+    def run():
+        try:
+            target()
+        except Exception as e:  # pragma: no cover - repassado ao teste
+            errors.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _hits(core_manager):
+    return core_manager.get_cache_stats()['hits']
+
+
+def test_write_from_another_thread_keeps_unrelated_entries(core_manager):
+    assert core_manager.add_category('Mercado')
+    core_manager.get_categories()
+    core_manager.get_transaction_months()
+
+    _in_thread(lambda: MonthlyControlManager(core_manager).add_transaction(
+        '01-2025', '2025-01-10', 'Despesa', 'X', 'Mercado', 10.0))
+
+    hits = _hits(core_manager)
+    assert core_manager.get_categories()['Categoria'].tolist() == ['Mercado']
+    assert _hits(core_manager) == hits + 1  # Categorias não foi alterada: continua em cache
+    assert core_manager.get_transaction_months() == ['01-2025']
+    assert _hits(core_manager) == hits + 1  # Transacoes foi alterada: recarregada
+
+
+def test_write_from_another_process_invalidates_everything(core_manager, monkeypatch):
+    from src.modules import core
+    monkeypatch.setattr(core, 'EXTERNAL_WRITES_CHECK_INTERVAL', 0)
+    assert core_manager.add_category('Mercado')
+    assert core_manager.get_categories()['Categoria'].tolist() == ['Mercado']
+
+    # Outra conexão, fora do CoreManager (como o desktop e a API em simultâneo)
+    other = sqlite3.connect(core_manager._pool.db_file, isolation_level=None)
+    other.execute("INSERT INTO Categorias (Categoria) VALUES ('Farmácia');")
+    other.close()
+
+    assert sorted(core_manager.get_categories()['Categoria']) == ['Farmácia', 'Mercado']
+
+
+def test_external_write_check_is_throttled(core_manager):
+    core_manager.get_categories()
+    other = sqlite3.connect(core_manager._pool.db_file, isolation_level=None)
+    other.execute("INSERT INTO Categorias (Categoria) VALUES ('Farmácia');")
+    other.close()
+
+    # Dentro do intervalo a escrita externa ainda não foi vista; depois dele, é
+    core_manager._next_external_check = float('inf')
+    assert core_manager.get_categories()['Categoria'].tolist() == []
+    core_manager._next_external_check = 0.0
+    assert core_manager.get_categories()['Categoria'].tolist() == ['Farmácia']
+
+
+def test_commit_does_not_hold_the_data_version_lock(core_manager):
+    lock_held_during_commit = []
+
+    def trace(statement):
+        if statement.startswith('COMMIT'):
+            lock_held_during_commit.append(core_manager._data_version_lock.locked())
+    conn = core_manager._create_connection()
+    conn.set_trace_callback(trace)
+    try:
+        assert core_manager.add_category('Mercado')
+    finally:
+        conn.set_trace_callback(None)
+
+    # As leituras das outras threads não esperam pelo COMMIT (nem pelo fsync)
+    assert lock_held_during_commit == [False]
+
+
+def test_reads_inside_a_transaction_are_not_cached(core_manager):
+    seen_by_other_thread = []
+    with pytest.raises(RuntimeError):
+        with core_manager.transaction('Categorias') as conn:
+            conn.execute("INSERT INTO Categorias (Categoria) VALUES ('Temporária');")
+            assert core_manager.get_categories()['Categoria'].tolist() == ['Temporária']
+            _in_thread(lambda: seen_by_other_thread.append(core_manager.get_categories()['Categoria'].tolist()))
+            raise RuntimeError("desfazer")
+
+    assert seen_by_other_thread == [[]]
+    assert core_manager.get_categories()['Categoria'].tolist() == []
+
+
+def test_returned_rows_are_copies(core_manager):
+    assert MonthlyControlManager(core_manager).add_transaction('01-2025', '2025-01-10', 'Despesa', 'Mercado', 'Outros', 10.0)
+    rows = core_manager.search_transactions('mercado')
+    rows[0]['Descricao'] = 'alterada'
+    rows.append({'Descricao': 'extra'})
+
+    assert [row['Descricao'] for row in core_manager.search_transactions('mercado')] == ['Mercado']
@@ -0,0 +1,121 @@
+# tests/test_debts.py
+
+import sqlite3
+
+import pytest
+
+from src.modules.debts import DebtManager
+from src.modules.monthly_control import MonthlyControlManager
+
+
+@pytest.fixture
+def debt_manager(core_manager):
+    assert core_manager.add_category('Casa')
+    return DebtManager(core_manager, MonthlyControlManager(core_manager))
+
+
+def _rule_ids(debt_manager):
+    return [rule['ID'] for rule in debt_manager.core.get_debt_rules()]
+
+
+def test_rules_are_expanded_with_one_query_for_skipped_dates(debt_manager):
+    for description in ('Aluguel', 'Internet', 'Luz'):
+        assert debt_manager.add_debt(description, 100.0, '2030-01-10', 'Aberto', 'Mensal', 6, 'Casa')
+    aluguel, internet, _ = sorted(_rule_ids(debt_manager),
+                                  key=lambda rule_id: debt_manager.core.get_debt_rule(rule_id)['Descricao'])
+    assert debt_manager.update_debt(f"{aluguel}:2030-02-10", {'Valor': 120.0})
+    assert debt_manager.delete_debt(f"{internet}:2030-03-10")
+
+    statements = []
+    conn = debt_manager.core._create_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        debts = debt_manager.get_all_debts(start_date='2030-01-01', end_date='2030-06-30')
+    finally:
+        conn.set_trace_callback(None)
+
+    # Uma consulta para as regras e outra para as datas a ignorar, qualquer que seja o número de regras
+    assert sum('ExcecoesRecorrencias' in statement for statement in statements) == 1
+    assert len(debts) == 3 * 6 - 1
+    assert debts['ID'].is_unique
+    assert debts.loc[debts['ID'] == f"{aluguel}:2030-02-10", 'Valor'].tolist() == [120.0]
+
+
+@pytest.mark.parametrize('recurrence, expected', [('mensal', 'Mensal'), (' ANUAL ', 'Anual'), ('Única', None)])
+def test_recurrence_values_are_normalized(debt_manager, recurrence, expected):
+    assert debt_manager.add_debt('Seguro', 50.0, '2030-01-10', 'Aberto', recurrence, 3, 'Casa')
+    rules = debt_manager.core.get_debt_rules()
+    assert [rule['Frequencia'] for rule in rules] == ([expected] if expected else [])
+
+
+def test_unknown_recurrence_is_rejected(debt_manager):
+    assert not debt_manager.add_debt('Seguro', 50.0, '2030-01-10', 'Aberto', 'Semanal', 3, 'Casa')
+    assert debt_manager.core.get_debt_rules() == []
+    assert debt_manager.get_all_debts().empty
+
+
+def test_debts_without_status_count_as_unpaid(core_manager):
+    from datetime import date
+    today = date(2030, 6, 15)
+    for due_date, status in [('2030-06-05', None), ('2030-06-18', None), ('2030-06-05', 'Pago'), ('2030-06-05', 'Aberto')]:
+        assert core_manager.add_debt({'Descricao': 'X', 'Valor': 10.0, 'DataVencimento': due_date, 'Status': status,
+                                      'Recorrencia': 'Unica', 'RecorrenciaMeses': 0, 'Categoria': 'Casa'})
+
+    assert core_manager.get_debt_aging_totals(today) == {
+        ('atrasado_1_30', 'Casa'): (2, 2000),
+        ('proximos_7_dias', 'Casa'): (1, 1000),
+    }
+    assert len(core_manager.get_upcoming_debts('2030-06-30')) == 3
+
+    # a varredura só reescreve as dívidas explicitamente em aberto
+    assert core_manager.mark_overdue_debts(today.isoformat()) == 1
+    statuses = sorted(core_manager.list_debts()['Status'].fillna(''))
+    assert statuses == ['', '', 'Atrasado', 'Pago']
+
+
+def _payment_count(core_manager):
+    conn = core_manager._create_connection()
+    return conn.execute("SELECT COUNT(*) FROM Transacoes WHERE Descricao LIKE 'Pagamento Dívida:%';").fetchone()[0]
+
+
+def test_paying_the_same_debts_twice_records_one_payment(debt_manager, monkeypatch):
+    assert debt_manager.add_debt('Luz', 80.0, '2030-01-10', 'Aberto', 'Unica', 0, 'Casa')
+    assert debt_manager.add_debt('Aluguel', 900.0, '2030-01-05', 'Aberto', 'Mensal', 3, 'Casa')
+    debts = debt_manager.get_all_debts(start_date='2030-01-01', end_date='2030-01-31')
+    debt_ids = sorted(debts['ID'])  # uma dívida gravada e uma ocorrência virtual
+
+    # Os dois pedidos leem o status antes de qualquer um deles gravar
+    stale_view = debt_manager._resolve_debts(debt_ids)
+    monkeypatch.setattr(debt_manager, '_resolve_debts', lambda ids: stale_view)
+
+    first = debt_manager.mark_debts_as_paid(debt_ids, '01-2030')
+    second = debt_manager.mark_debts_as_paid(debt_ids, '01-2030')
+
+    assert [result['sucesso'] for result in first] == [True, True]
+    assert [result['erro'] for result in second] == ["Dívida já paga.", "Dívida já paga."]
+    assert _payment_count(debt_manager.core) == 2
+
+
+def test_overdue_sweep_sees_writes_from_any_path(debt_manager, monkeypatch):
+    from src.modules import core
+    monkeypatch.setattr(core, 'EXTERNAL_WRITES_CHECK_INTERVAL', 0)
+    sweeps = []
+    mark_overdue_debts = debt_manager.core.mark_overdue_debts
+    monkeypatch.setattr(debt_manager.core, 'mark_overdue_debts', lambda today: sweeps.append(today) or mark_overdue_debts(today))
+
+    debt_manager.sweep_overdue_debts()
+    debt_manager.sweep_overdue_debts()
+    assert len(sweeps) == 1  # nada foi escrito em Dividas: a varredura do dia não se repete
+
+    # Escrita pelo CoreManager, sem passar pelo DebtManager
+    assert debt_manager.core.add_debt({'Descricao': 'Luz', 'Valor': 80.0, 'DataVencimento': '2020-01-10', 'Status': 'Aberto',
+                                       'Recorrencia': 'Unica', 'RecorrenciaMeses': 0, 'Categoria': 'Casa'})
+    assert debt_manager.sweep_overdue_debts() == 1
+
+    # Escrita de outro processo (ex.: a API enquanto o desktop está aberto)
+    other = sqlite3.connect(debt_manager.core._pool.db_file, isolation_level=None)
+    other.execute("INSERT INTO Dividas (ID, Descricao, Valor, DataVencimento, Status, Recorrencia, RecorrenciaMeses, Categoria) "
+                  "VALUES ('externa', 'Água', 40.0, '2020-02-10', 'Aberto', 'Unica', 0, 'Casa');")
+    other.close()
+    assert debt_manager.sweep_overdue_debts() == 1
+    assert len(sweeps) == 3
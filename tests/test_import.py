@@ -0,0 +1,23 @@
+# tests/test_import.py
+
+def _statement_row(hash_value, **extra):
+    row = {'ID': hash_value + '-id', 'MesAno': '01-2025', 'Data': '2025-01-10', 'Tipo': 'Despesa',
+           'Descricao': 'Padaria', 'Categoria': None, 'Valor': 4.5, 'MeioPagamento': 'Conta',
+           'HashConteudo': hash_value}
+    row.update(extra)
+    return row
+
+
+def test_import_ignores_only_key_conflicts(core_manager):
+    assert core_manager.import_rows('Transacoes', [_statement_row('a')]) == (1, {})
+
+    chunk = [
+        _statement_row('a', ID='outro-id'),  # HashConteudo repetido: linha de extrato já importada
+        _statement_row('b', ID='a-id'),  # ID repetido: linha da planilha já importada
+        _statement_row('c', ID=None),  # ID NOT NULL: erro, não duplicada
+        _statement_row('d'),
+    ]
+    inserted, errors = core_manager.import_rows('Transacoes', chunk)
+    assert inserted == 1
+    assert list(errors) == [2]
+    assert 'NOT NULL' in errors[2]
@@ -0,0 +1,43 @@
+# tests/test_listing.py
+
+import pytest
+
+
+@pytest.fixture
+def listed_core(core_manager):
+    rows = [{'MesAno': '01-2025', 'Data': f"2025-01-{day % 28 + 1:02d}", 'Tipo': 'Despesa', 'Descricao': f"L{day}",
+             'Categoria': 'Mercado' if day % 2 else None, 'Valor': float(day % 7), 'MeioPagamento': 'Conta'}
+             for day in range(40)]
+    assert all(result['sucesso'] for result in core_manager.add_transactions_bulk(rows))
+
+    # Linhas antigas, gravadas antes da validação, com DataDia ou ValorCentavos NULL
+    conn = core_manager._create_connection()
+    for index in range(5):
+        conn.execute("INSERT INTO Transacoes (ID, MesAno, Data, Tipo, Descricao, Categoria, Valor, MeioPagamento, "
+                     "ValorCentavos, DataDia, MesAnoChave) VALUES (?, '01-2025', 'bad', 'Despesa', ?, ?, ?, 'Conta', "
+                     "?, NULL, 202501);",
+                     (f"antiga-{index}", f"A{index}", 'Mercado' if index % 2 else None,
+                      None if index < 3 else 1.0, None if index < 3 else 100))
+    return core_manager
+
+
+def _all_pages(core_manager, **kwargs):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = core_manager.list_transactions(limit=3, cursor=cursor, **kwargs)
+        ids.extend(row['ID'] for row in rows)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize('sort', ['data_desc', 'data_asc', 'valor_desc', 'valor_asc'])
+@pytest.mark.parametrize('category', [None, 'Mercado'])
+def test_pagination_includes_rows_with_null_keys(listed_core, sort, category):
+    column, direction = {'data_desc': ('DataDia', 'DESC'), 'data_asc': ('DataDia', 'ASC'),
+                         'valor_desc': ('ValorCentavos', 'DESC'), 'valor_asc': ('ValorCentavos', 'ASC')}[sort]
+    conn = listed_core._create_connection()
+    expected = [row[0] for row in conn.execute(
+        f"SELECT ID FROM Transacoes WHERE :categoria IS NULL OR Categoria = :categoria "
+        f"ORDER BY {column} {direction}, ID {direction};", {'categoria': category})]
+
+    assert _all_pages(listed_core, sort=sort, category=category) == expected
@@ -0,0 +1,50 @@
+# tests/test_monthly_control.py
+
+from src.modules.monthly_control import MonthlyControlManager
+
+
+def test_add_transaction_rejects_unknown_type(core_manager):
+    manager = MonthlyControlManager(core_manager)
+    assert not manager.add_transaction('01-2025', '2025-01-10', 'Transferência', 'X', 'Outros', 10.0)
+    assert manager.add_transaction('01-2025', '2025-01-10', 'Despesa', 'X', 'Outros', 10.0)
+
+
+def test_bulk_reports_invalid_rows_individually(core_manager):
+    manager = MonthlyControlManager(core_manager)
+    rows = [
+        {'Data': '2025-01-10', 'Tipo': 'Despesa', 'Descricao': 'A', 'Categoria': 'Outros', 'Valor': 10.0},
+        {'Data': '2025-01-11', 'Tipo': 'Outro', 'Descricao': 'B', 'Categoria': 'Outros', 'Valor': 5.0},
+        {'Data': '11/01/2025', 'Tipo': 'Ganho', 'Descricao': 'C', 'Categoria': 'Outros', 'Valor': 5.0},
+    ]
+    results = manager.add_transactions_bulk(rows)
+    assert [r['sucesso'] for r in results] == [True, False, False]
+    assert results[1]['erro'] == "Tipo de transação inválido."
+    assert len(manager.get_transactions_for_month('01-2025')) == 1
+
+
+def test_invalid_dates_are_rejected_on_every_write_path(core_manager):
+    manager = MonthlyControlManager(core_manager)
+    assert not manager.add_transaction('01-2025', 'bad', 'Despesa', 'X', 'Outros', 10.0)
+    assert not manager.add_transaction('13-2025', '2025-01-10', 'Despesa', 'X', 'Outros', 10.0)
+
+    rows = [{'MesAno': '01-2025', 'Data': '2025-02-30', 'Tipo': 'Despesa', 'Descricao': 'A', 'Categoria': 'Outros', 'Valor': 1.0}]
+    assert manager.add_transactions_bulk(rows)[0]['erro'] == "Data inválida (use YYYY-MM-DD)."
+
+    # A camada de dados também recusa, mesmo sem passar pela validação do gestor
+    results = core_manager.add_transactions_bulk([dict(rows[0], Data='2025-01-10', MeioPagamento='Conta'),
+                                                  dict(rows[0], MeioPagamento='Conta')])
+    assert [r['sucesso'] for r in results] == [True, False]
+    assert 'Data inválida' in results[1]['erro']
+
+    transaction_id = results[0]['ID']
+    assert not manager.update_transaction('01-2025', transaction_id, {'Data': 'bad'})
+    assert core_manager.get_transaction(transaction_id)['Data'] == '2025-01-10'
+
+    record = {'ID': 'importada', 'MesAno': '01-2025', 'Data': None, 'Tipo': 'Despesa', 'Descricao': 'B',
+              'Categoria': None, 'Valor': 1.0, 'MeioPagamento': 'Conta'}
+    inserted, errors = core_manager.import_rows('Transacoes', [record])
+    assert inserted == 0 and list(errors) == [0]
+
+    conn = core_manager._create_connection()
+    assert conn.execute("SELECT COUNT(*) FROM Transacoes WHERE DataDia IS NULL OR MesAnoChave IS NULL;").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM Transacoes;").fetchone()[0] == 1
@@ -0,0 +1,19 @@
+# tests/test_query_plans.py
+
+from src.modules.migrations import SCHEMA_VERSION
+
+
+def test_schema_is_up_to_date(core_manager):
+    conn = core_manager._create_connection()
+    assert conn.execute("PRAGMA user_version;").fetchone()[0] == SCHEMA_VERSION
+
+
+def test_hot_queries_use_indexes(core_manager):
+    # Uma consulta de HOT_QUERIES que passe a fazer SCAN de uma tabela inteira aparece aqui
+    assert core_manager.verify_query_plans() == {}
+
+
+def test_full_scan_is_reported(core_manager, monkeypatch):
+    from src.modules import core
+    monkeypatch.setitem(core.HOT_QUERIES, 'sem_indice', ("SELECT ID FROM Dividas WHERE Descricao = ?;", ('',)))
+    assert core_manager.verify_query_plans() == {'sem_indice': ['SCAN Dividas']}
@@ -0,0 +1,54 @@
+# tests/test_reports.py
+
+from datetime import datetime
+
+import pytest
+
+from src.modules.core import UNCATEGORIZED_LABEL
+from src.modules.monthly_control import MonthlyControlManager
+from src.modules.reports import ReportManager
+
+START, END = datetime(2025, 1, 1), datetime(2025, 3, 31)
+
+
+@pytest.fixture
+def report_manager(core_manager):
+    rows = [
+        ('01-2025', '2025-01-05', 'Ganho', 'Salário', 'Salário', 3000.0),
+        ('01-2025', '2025-01-10', 'Despesa', 'Mercado', 'Mercado', 250.35),
+        ('01-2025', '2025-01-12', 'Despesa', 'Feira', 'mercado', 40.1),
+        ('02-2025', '2025-02-01', 'Despesa', 'Sem categoria', None, 19.99),
+        ('02-2025', '2025-02-03', 'Ganho', 'Reembolso', None, 0.1),
+        ('02-2025', '2025-02-20', 'despesa', 'Luz', 'Contas', 120.0),
+        ('03-2025', '2025-03-31', 'Despesa', 'Água', 'Contas', 0.2),
+        ('04-2025', '2025-04-01', 'Despesa', 'Fora do período', 'Contas', 999.0),
+    ]
+    results = core_manager.add_transactions_bulk([
+        {'MesAno': m, 'Data': d, 'Tipo': t, 'Descricao': desc, 'Categoria': c, 'Valor': v, 'MeioPagamento': 'Conta'}
+        for m, d, t, desc, c, v in rows
+    ])
+    assert all(r['sucesso'] for r in results)
+    return ReportManager(core_manager, MonthlyControlManager(core_manager))
+
+
+def _normalized(summary):
+    return {
+        key: ({cat: round(val, 2) for cat, val in value.items()} if hasattr(value, 'items') else round(value, 2))
+        for key, value in summary.items()
+    }
+
+
+@pytest.mark.parametrize('category', [None, 'Todas', 'Mercado', 'CONTAS', UNCATEGORIZED_LABEL, 'Inexistente'])
+def test_sql_and_dataframe_summaries_match(report_manager, category):
+    from_sql = report_manager._generate_summary_from_sql(START, END, category)
+    from_dataframe = report_manager._generate_summary_from_dataframe(START, END, category)
+    assert from_sql is not None
+    assert _normalized(from_sql) == _normalized(from_dataframe)
+
+
+def test_summary_totals(report_manager):
+    summary = _normalized(report_manager.generate_financial_summary(START, END))
+    assert summary['Ganhos Totais'] == 3000.1
+    assert summary['Despesas Totais'] == 430.64
+    assert summary['Despesas por Categoria'][UNCATEGORIZED_LABEL] == 19.99
+    assert 'None' not in summary['Despesas por Categoria'] and 'nan' not in summary['Despesas por Categoria']
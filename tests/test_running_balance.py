@@ -0,0 +1,69 @@
+# tests/test_running_balance.py
+
+from datetime import date, timedelta
+
+from src.modules.monthly_control import MonthlyControlManager
+
+
+def _days(start, end):
+    current = start
+    while current <= end:
+        yield current
+        current += timedelta(days=1)
+
+
+def _expected(core_manager, as_of):
+    query = """
+    SELECT MeioPagamento, SUM(CASE lower(Tipo) WHEN 'ganho' THEN ValorCentavos ELSE -ValorCentavos END)
+    FROM Transacoes WHERE Data <= ? GROUP BY 1;
+    """
+    rows = core_manager._create_connection().execute(query, (as_of.isoformat(),)).fetchall()
+    return {method: total for method, total in rows}
+
+
+def test_transfer_booked_under_another_month(core_manager):
+    manager = MonthlyControlManager(core_manager)
+    assert manager.add_transaction('01-2025', '2025-01-05', 'Ganho', 'Salário', 'Salário', 1000.0, 'Conta')
+    # Transferência lançada sob 01-2025 (mês selecionado na interface) mas com a data do dia em que foi feita
+    assert manager.add_transaction('01-2025', '2025-02-10', 'Despesa', 'Saque', 'Transferência', 100.0, 'Conta')
+    assert manager.add_transaction('01-2025', '2025-02-10', 'Ganho', 'Saque', 'Transferência', 100.0, 'Dinheiro em Mãos')
+
+    assert manager.get_running_balance('2025-01-31')['Saldos'] == {'Conta': 1000.0}
+    assert manager.get_running_balance('2025-02-09')['Saldos'] == {'Conta': 1000.0}
+    assert manager.get_running_balance('2025-02-15')['Saldos'] == {'Conta': 900.0, 'Dinheiro em Mãos': 100.0}
+    assert manager.get_running_balance('2025-02-15')['Total'] == 1000.0
+
+
+def test_balance_is_monotonic_when_mesano_differs_from_data(core_manager):
+    manager = MonthlyControlManager(core_manager)
+    # Só ganhos, com MesAno adiantado, atrasado e igual ao mês da Data
+    for month_year, day, value in [('02-2025', '2025-01-20', 50.0), ('01-2025', '2025-02-03', 30.0),
+                                   ('12-2024', '2025-01-31', 20.0), ('03-2025', '2025-03-01', 10.0),
+                                   ('01-2025', '2025-03-15', 5.0)]:
+        assert manager.add_transaction(month_year, day, 'Ganho', 'X', 'Outros', value, 'Conta')
+
+    previous = 0
+    for day in _days(date(2024, 12, 25), date(2025, 3, 31)):
+        totals = core_manager.get_running_balance_totals(day.isoformat())
+        assert totals == _expected(core_manager, day)
+        assert totals.get('Conta', 0) >= previous
+        previous = totals.get('Conta', 0)
+    assert previous == 11500
+
+
+def test_checkpoints_follow_updates_and_rebuild(core_manager):
+    manager = MonthlyControlManager(core_manager)
+    assert manager.add_transaction('01-2025', '2025-01-10', 'Despesa', 'X', 'Outros', 40.0, 'Conta')
+    transaction_id = manager.get_transactions_for_month('01-2025')['ID'].iloc[0]
+    assert manager.update_transaction('01-2025', transaction_id, {
+        'Data': '2025-03-02', 'Tipo': 'Despesa', 'Descricao': 'X', 'Categoria': 'Outros', 'Valor': 40.0
+    })
+    def check_balances():
+        for as_of in (date(2025, 2, 28), date(2025, 3, 1), date(2025, 3, 2), date(2025, 4, 30)):
+            # Um checkpoint pode ficar com saldo 0 (o de janeiro, após a mudança de data)
+            totals = core_manager.get_running_balance_totals(as_of.isoformat())
+            assert {method: cents for method, cents in totals.items() if cents} == _expected(core_manager, as_of)
+
+    check_balances()
+    assert core_manager.rebuild_running_balances()
+    check_balances()
@@ -0,0 +1,30 @@
+# tests/test_search.py
+
+def _found(core_manager, text):
+    return [row['Descricao'] for row in core_manager.search_transactions(text)]
+
+
+def test_search_index_follows_transaction_ids_not_rowids(core_manager):
+    ids = {}
+    for description in ('Mercado', 'Farmacia', 'Padaria'):
+        data = {'Data': '2025-01-10', 'Tipo': 'Despesa', 'Descricao': description,
+                'Categoria': None, 'Valor': 10.0, 'MeioPagamento': 'Conta'}
+        assert core_manager.add_transaction('01-2025', data)
+        ids[description] = data['ID']
+
+    # Simula um VACUUM que renumerou os rowids de Transacoes em relação ao índice
+    conn = core_manager._create_connection()
+    conn.execute("UPDATE TransacoesBusca SET rowid = rowid + 1000;")
+
+    assert core_manager.delete_transaction('01-2025', ids['Mercado'])
+    assert core_manager.update_transaction('01-2025', ids['Farmacia'], {'Descricao': 'Drogaria'})
+
+    assert _found(core_manager, 'farmacia') == []
+    assert _found(core_manager, 'drogaria') == ['Drogaria']
+    assert _found(core_manager, 'padaria') == ['Padaria']
+    assert conn.execute("SELECT COUNT(*) FROM TransacoesBusca;").fetchone()[0] == 2
+
+    # Inserir depois da renumeração não colide com um rowid já usado pelo índice
+    assert core_manager.add_transaction('01-2025', {'Data': '2025-01-11', 'Tipo': 'Despesa', 'Descricao': 'Mercado',
+                                                    'Categoria': None, 'Valor': 5.0, 'MeioPagamento': 'Conta'})
+    assert _found(core_manager, 'mercado') == ['Mercado']
@@ -0,0 +1,20 @@
+# tests/test_startup.py
+
+import pytest
+
+from src.startup_benchmark import ENTRY_POINTS, HEAVY_MODULES, measure_import
+
+# Dependências de cada ponto de entrada que podem não estar instaladas no ambiente de testes
+ENTRY_POINT_REQUIREMENTS = {
+    'api_main': ('fastapi', 'uvicorn'),
+    'src.ui.main_window': ('tkinter', 'tkcalendar'),
+}
+
+
+@pytest.mark.parametrize('module', sorted(ENTRY_POINTS))
+def test_entry_points_do_not_import_heavy_modules(module, tmp_path):
+    for requirement in ENTRY_POINT_REQUIREMENTS.get(module, ()):
+        pytest.importorskip(requirement)
+    # Processo novo: os módulos já carregados por outros testes não contam
+    _, imported = measure_import(module, str(tmp_path / 'financas.db'))
+    assert sorted(name for name in HEAVY_MODULES if name in imported) == []